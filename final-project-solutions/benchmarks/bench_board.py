@@ -0,0 +1,32 @@
+import numpy as np
+
+from questing import Board, Position, Warrior
+
+
+class BoardCreate:
+    """Creating boards of different sizes and densities of enemies"""
+    params = ([10, 100, 300], [0.05, 0.3], [False, True])
+    param_names = ("size", "density", "compact")
+
+    def time_create(self, size: int, density: float, compact: bool):
+        Board.create(hero=Warrior(name="Hero"), width=size, height=size, num_enemies=int(size * size * density),
+                     rng=np.random.default_rng(0), compact=compact)
+
+
+class EnemiesInRange:
+    """Looking for enemies around 100 positions of a 200x200 board with 4000 enemies"""
+    params = ([1, 3, 10, 50],)
+    param_names = ("radius",)
+
+    def setup(self, radius: int):
+        rng = np.random.default_rng(0)
+        self.board = Board.create(hero=Warrior(name="Hero"), width=200, height=200, num_enemies=4000, rng=rng)
+        self.positions = [Position(x, y) for x, y in rng.integers(200, size=(100, 2)).tolist()]
+
+    def time_has_enemies_in_range(self, radius: int):
+        for position in self.positions:
+            self.board.has_enemies_in_range(position, radius)
+
+    def time_enemies_in_range(self, radius: int):
+        for position in self.positions:
+            self.board.enemies_in_range(position, radius)
@@ -0,0 +1,45 @@
+import numpy as np
+
+from questing import Apprentice, Mage, Position, Swordsman, Warrior
+from questing.combat import ARMORED, BARRIER, MAGIC, resolve
+
+
+class CombatChains:
+    """Units taking hits until they are destroyed, through the armor of the defense classes"""
+    params = (["barrier", "armored"],)
+    param_names = ("defense",)
+
+    def setup(self, defense: str):
+        self.create = {"barrier": lambda: Apprentice.create(level=30), "armored": lambda: Swordsman.create(level=30)}[defense]
+
+    def time_take_damage_until_destroyed(self, defense: str):
+        unit = self.create()
+
+        # Hits need to be stronger than the armor of the swordsmen, which is 7 at this level
+        while not unit.take_damage(10):
+            pass
+
+    def time_duel(self, defense: str):
+        # The heroes with the same kind of defense attack each other until one of them is destroyed
+        first, second = (Mage(name="Hero"), Mage(name="Rival")) if defense == "barrier" else (Warrior(name="Hero"), Warrior(name="Rival"))
+        first.health = second.health = 1000
+        first.position, second.position = Position(0, 0), Position(0, 1)
+
+        while not first.attack(second) and not second.attack(first):
+            pass
+
+
+class BatchCombat:
+    """Resolving many hits on a few targets at once with the batch combat engine"""
+    params = ([1000, 100000],)
+    param_names = ("hits",)
+
+    def setup(self, hits: int):
+        rng = np.random.default_rng(0)
+        self.arguments = dict(kind=np.full(hits, MAGIC), power=rng.integers(1, 10, size=hits), attack_range=np.full(hits, 2),
+                              distance=np.ones(hits, dtype=np.int64), target=rng.integers(100, size=hits),
+                              defense=np.where(np.arange(100) % 2, BARRIER, ARMORED), health=np.full(100, 1e6),
+                              armor=np.full(100, 5.0))
+
+    def time_resolve(self, hits: int):
+        resolve(**self.arguments)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from questing import Game, GameActions, Mage, Warrior
+from questing.game import ACTION_BITS
+from questing.sim import greedy_policy, play_game, random_policy, simulate
+
+
+class AvailableActions:
+    """Computing the actions available in the middle of a crowded board"""
+    def setup(self):
+        self.game = Game(hero=Mage(name="Hero"), width=50, height=50, num_enemies=500, rng=np.random.default_rng(0))
+
+    def time_available_actions(self):
+        self.game.available_actions()
+
+    def time_available_actions_mask(self):
+        self.game.available_actions_mask()
+
+    def time_available_actions_uncached(self):
+        # Dropping the cached actions, to measure how long it takes to compute them
+        self.game._available_actions = None
+        self.game.available_actions()
+
+
+class DoAction:
+    """Performing actions, by enum and by bit: moving right and back left in an empty board"""
+    def setup(self):
+        self.game = Game(hero=Warrior(name="Hero"), width=10, height=10, num_enemies=0, rng=np.random.default_rng(0))
+        self.right, self.left = ACTION_BITS[GameActions.MOVE_RIGHT], ACTION_BITS[GameActions.MOVE_LEFT]
+
+    def time_do(self):
+        self.game.do(GameActions.MOVE_RIGHT)
+        self.game.do(GameActions.MOVE_LEFT)
+
+    def time_do_masked(self):
+        self.game.do_masked(self.right)
+        self.game.do_masked(self.left)
+
+
+class Playthrough:
+    """Playing whole games with the random policy, from start to end"""
+    params = ([10, 30],)
+    param_names = ("size",)
+
+    def time_random_game(self, size: int):
+        play_game(np.random.SeedSequence(0), policy=random_policy, hero_cls=Warrior, width=size, height=size,
+                  num_enemies=size * size // 10, max_steps=200)
+
+
+class Simulation:
+    """Headless throughput of questing.sim on 10x10 boards with 10 enemies, in a single process. The original
+    target of 10k games per second per core is out of reach for Game, since setting up a game alone takes
+    longer than 100 us, so the reduced target is not to regress from the baseline: about 850 games per second
+    with the greedy policy (14 steps per game) and 350 with the random one (100 steps per game) on the machine
+    that recorded it. Agents that need more games than that should use VectorGame."""
+    params = (["greedy", "random"],)
+    param_names = ("policy",)
+
+    def time_simulate(self, policy: str):
+        simulate(50, policy=greedy_policy if policy == "greedy" else random_policy, seed=0)
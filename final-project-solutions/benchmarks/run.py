@@ -0,0 +1,189 @@
+"""Runs the benchmarks of this directory, and compares them with a baseline.
+
+Benchmarks follow the conventions of asv (airspeed velocity): they are the time_* methods of the classes
+in the bench_*.py modules, which can have a setup method, and params and param_names attributes, in which
+case they run for every combination of parameters. So the suite can also be run with asv, but this runner
+doesn't need anything besides the package itself:
+
+    python -m benchmarks.run                 # runs everything, and compares it with baseline.json
+    python -m benchmarks.run -k Board        # only the benchmarks with Board in their name
+    python -m benchmarks.run --save          # runs everything, and stores the results as the new baseline
+
+Benchmarks that are slower than the baseline by more than the threshold (25% by default) are reported as
+regressions, and make the runner exit with an error. Timings depend on the machine, so the baseline should
+be saved on the same machine that runs the comparison.
+"""
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from questing.logger import quiet
+
+BENCHMARKS_DIR = pathlib.Path(__file__).parent
+BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+
+
+class Benchmark(NamedTuple):
+    """One of the time_* methods of a benchmark class, with one combination of its parameters"""
+    name: str
+    cls: type
+    method: str
+    params: tuple
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def discover(pattern: Optional[str] = None, modules: Optional[Sequence[str]] = None) -> List[Benchmark]:
+    """Finds the benchmarks of the bench_*.py modules (or the ones provided) whose name contains the pattern"""
+    if modules is None:
+        modules = [f"benchmarks.{path.stem}" for path in sorted(BENCHMARKS_DIR.glob("bench_*.py"))]
+
+    benchmarks = []
+
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        short_name = module_name.rsplit(".", 1)[-1]
+
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+
+            params = getattr(cls, "params", ())
+            # asv allows a single list of parameters instead of a tuple of lists
+            if params and not isinstance(params, tuple):
+                params = (params,)
+            combinations = list(itertools.product(*params)) if params else [()]
+
+            for method in sorted(name for name in dir(cls) if name.startswith("time_")):
+                for combination in combinations:
+                    arguments = f"({', '.join(map(repr, combination))})" if combination else ""
+                    name = f"{short_name}.{cls_name}.{method}{arguments}"
+
+                    if pattern is None or pattern in name:
+                        benchmarks.append(Benchmark(name=name, cls=cls, method=method, params=combination))
+
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int = 5, min_time: float = 0.05) -> float:
+    """Returns the time that a call to the benchmark takes, in seconds. Calls are timed in batches that
+    take at least min_time, and the result is the median of repeat batches."""
+    instance = benchmark.cls()
+    function: Callable = getattr(instance, benchmark.method)
+    timer = timeit.Timer(lambda: function(*benchmark.params))
+
+    with quiet():
+        if hasattr(instance, "setup"):
+            instance.setup(*benchmark.params)
+
+        try:
+            number = _calls_per_batch(timer, min_time)
+            times = timer.repeat(repeat=repeat, number=number)
+        finally:
+            if hasattr(instance, "teardown"):
+                instance.teardown(*benchmark.params)
+
+    return statistics.median(times) / number
+
+
+def _calls_per_batch(timer: timeit.Timer, min_time: float) -> int:
+    number = 1
+
+    while True:
+        if timer.timeit(number) >= min_time:
+            return number
+
+        number *= 2
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float]) -> List[Comparison]:
+    """Pairs the results with the baseline, for the benchmarks that are in both"""
+    return [Comparison(name=name, baseline=baseline[name], current=current)
+            for name, current in results.items() if name in baseline]
+
+
+def regressions(comparisons: List[Comparison], threshold: float) -> List[Comparison]:
+    """The comparisons where the benchmark got slower than the baseline by more than the threshold"""
+    return [comparison for comparison in comparisons if comparison.ratio > 1 + threshold]
+
+
+def load_baseline(path: pathlib.Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+
+    with open(path) as baseline_file:
+        return json.load(baseline_file)["results"]
+
+
+def save_baseline(path: pathlib.Path, results: Dict[str, float]):
+    """Saves the results as the baseline. Results of benchmarks that weren't run are kept."""
+    baseline = load_baseline(path)
+    baseline.update(results)
+    data = dict(machine=platform.machine(), python=platform.python_version(), results=dict(sorted(baseline.items())))
+
+    with open(path, "w") as baseline_file:
+        json.dump(data, baseline_file, indent=2)
+        baseline_file.write("\n")
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f}{unit}"
+
+    return f"{seconds / 1e-9:8.2f}ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Runs the benchmarks of the questing package")
+    parser.add_argument("-k", dest="pattern", help="only run the benchmarks with this in their name")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH, help="path of the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown reported as a regression (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed batches of every benchmark")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results: Dict[str, float] = {}
+
+    for benchmark in discover(args.pattern):
+        results[benchmark.name] = measure(benchmark, repeat=args.repeat)
+        line = f"{benchmark.name:<75} {_format_time(results[benchmark.name])}"
+
+        if benchmark.name in baseline:
+            line += f"  {results[benchmark.name] / baseline[benchmark.name]:6.2f}x baseline"
+
+        print(line, flush=True)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    slower = regressions(compare(results, baseline), args.threshold)
+
+    for comparison in slower:
+        print(f"REGRESSION {comparison.name}: {_format_time(comparison.baseline).strip()} -> "
+              f"{_format_time(comparison.current).strip()} ({comparison.ratio:.2f}x)")
+
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
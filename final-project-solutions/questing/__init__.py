@@ -1,5 +1,5 @@
 from .logger import Logger
-from .types import Position
+from .types import AttackKind, CellKind, DefenseKind, Position
 from .board import Board
 from .game import Game, GameActions, GameStatus
 from .hero import Hero, Mage, Rogue, Warrior
@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
 import math
 
-from .logger import Logger
+from .logger import DEBUG
+from .slots import UnitSlots
 
 
-class Attack(ABC, Logger):
+class Attack(ABC, UnitSlots):
     """
     This is the interface for game elements that can attack other units.
     """
+    __slots__ = ()
+
     def __init__(self, power: int, **kwargs):
         super().__init__(**kwargs)
         self.power = power
@@ -23,14 +26,16 @@ class MeleeAttack(Attack):
     This type of attack represents close range attacks, meaning that this type of attack
     can only reach targets at a distance of 1.
     """
+    __slots__ = ()
+
     def attack(self, target: "Unit") -> bool:
         distance = self.position.distance(target.position)
 
         if distance > 1:
-            self.log("Target is out of reach, can't attack!")
+            self.log("Target is out of reach, can't attack!", level=DEBUG)
             return False
         else:
-            self.log(f"Attacking {target.name}!")
+            self.log("Attacking %s!", target.name, level=DEBUG)
             return target.take_damage(self.power)
 
 class RangedAttack(Attack):
@@ -38,6 +43,8 @@ class RangedAttack(Attack):
     Ranged attacks can hit targets that are within range.
     However, when the target is too close, attacks happen with half of the power instead.
     """
+    __slots__ = ("attack_range",)
+
     def __init__(self, attack_range: int, **kwargs):
         super().__init__(**kwargs)
         self.attack_range = attack_range
@@ -46,17 +53,17 @@ class RangedAttack(Attack):
         distance = self.position.distance(target.position)
 
         if distance > self.attack_range:
-            self.log("Target is out of reach, can't attack!")
+            self.log("Target is out of reach, can't attack!", level=DEBUG)
             return False
 
         power = self.power
 
         if distance <= 1:
-            self.log("Target is too close, will attack with half power")
+            self.log("Target is too close, will attack with half power", level=DEBUG)
             power = self.melee_range_power
 
 
-        self.log(f"Attacking {target.name} with power {power}")
+        self.log("Attacking %s with power %s", target.name, power, level=DEBUG)
 
         return target.take_damage(power)
 
@@ -69,6 +76,8 @@ class MagicAttack(RangedAttack):
     Magic attacks are just like ranged attacks, except that they don't suffer the
     power penalty when they attack at short range.
     """
+    __slots__ = ()
+
     @property
     def melee_range_power(self) -> int:
         return self.power
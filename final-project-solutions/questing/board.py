@@ -1,12 +1,68 @@
-from typing import List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
 from .hero import Hero
-from .logger import Logger
-from .types import Position
+from .logger import DEBUG, WARNING, Logger
+from .types import CellKind, Position
 from .enemy import Enemy
-from .game_element import ExitPortal
+from .game_element import ExitPortal, Wall
+from .distance_field import DistanceField
+from .pathfinding import Pathfinder
+from .spatial import BucketGrid, OccupancyGrid
+from .unit_table import UnitTable, UnitView
+
+# Plain int copies of the CellKind codes, which are much cheaper to use in the hot paths
+EMPTY, HERO, ENEMY, EXIT, WALL, OTHER = map(int, CellKind)
+# Kinds of the positions that can be walked through on the way to the exit
+PASSABLE = (EMPTY, HERO, EXIT)
+# Whether every kind is passable, to look up the passable positions of a kinds grid at once
+PASSABLE_KINDS = np.isin(np.arange(len(CellKind)), PASSABLE)
+# Maximum number of reachable sets kept in the cache of the board
+REACHABLE_CACHE_SIZE = 256
+# Ranges up to this distance (at most 60 positions) are checked position by position instead of with NumPy
+SMALL_RANGE = 5
+
+
+def cell_kind(element: Optional["GameElement"]) -> CellKind:
+    """Returns the CellKind code that represents a game element (or an empty cell) in the board"""
+    if element is None:
+        return CellKind.EMPTY
+    elif isinstance(element, Enemy):
+        return CellKind.ENEMY
+    elif isinstance(element, Hero):
+        return CellKind.HERO
+    elif isinstance(element, ExitPortal):
+        return CellKind.EXIT
+    elif isinstance(element, Wall):
+        return CellKind.WALL
+    else:
+        return CellKind.OTHER
+
+
+@lru_cache(maxsize=None)
+def diamond_offsets(distance: int) -> Tuple[Tuple[int, int], ...]:
+    """Returns the offsets (dx, dy) of the positions within the given (Manhattan) distance of a position,
+    excluding the position itself, from the closest to the furthest"""
+    offsets = [(dx, dy) for dx in range(-distance, distance + 1) for dy in range(-distance, distance + 1)
+               if 0 < abs(dx) + abs(dy) <= distance]
+
+    return tuple(sorted(offsets, key=lambda offset: abs(offset[0]) + abs(offset[1])))
+
+
+@lru_cache(maxsize=None)
+def diamond_mask(distance: int) -> np.ndarray:
+    """Returns a (2 * distance + 1) square mask with the positions that are within the given
+    (Manhattan) distance of its center, excluding the center itself. Masks are cached, since
+    the same few distances (i.e. the attack ranges) are requested over and over again."""
+    offsets = np.abs(np.arange(-distance, distance + 1))
+    mask = offsets[:, None] + offsets[None, :] <= distance
+    mask[distance, distance] = False
+    mask.flags.writeable = False
+
+    return mask
 
 
 class Board(Logger):
@@ -20,29 +76,105 @@ class Board(Logger):
         self.height = height
 
         self._board = np.full(shape=(width, height), fill_value=None, dtype=object)
+        # Parallel grid with the CellKind of every position, used for the bulk queries
+        self._kinds = np.zeros(shape=(width, height), dtype=np.uint8)
+        # Spatial index with the positions of the enemies, for range and nearest neighbour queries. Boards
+        # with a unit table switch to an OccupancyGrid, which doesn't need any object per enemy.
+        self._enemies = BucketGrid(width=width, height=height)
+        self._listeners = []
+        # Enemies stored in a UnitTable (see Board.create) are not kept in the object grid, but
+        # referenced by their row in the table; the grid of rows is only allocated when needed
+        self._units: Optional[UnitTable] = None
+        self._unit_rows: Optional[np.ndarray] = None
+
+        # The empty slots are kept in an array of flat indices (x * height + y), where only
+        # the first _num_empty_slots entries are meaningful. _empty_slot_idx maps every flat
+        # index to its location in that array (or -1 if the slot is occupied), so adding and
+        # removing slots is O(1), and so is picking a random one.
+        self._empty_slots = np.arange(width * height, dtype=np.int32)
+        self._empty_slot_idx = np.arange(width * height, dtype=np.int32)
+        self._num_empty_slots = width * height
+
+        # Distances to the exit, computed on the first query and then repaired on every change
+        self._exit_field: Optional[DistanceField] = None
+        self._pathfinder: Optional[Pathfinder] = None
+        # Reachable positions by (position, speed), dropped when a position within reach changes. The
+        # keys are also indexed by the slots within their reach, so a change only looks at its own slot.
+        self._reachable: "OrderedDict[Tuple[Position, int], List[Position]]" = OrderedDict()
+        self._reachable_by_slot: Dict[int, Set[Tuple[Position, int]]] = {}
 
     @property
     def num_empty_slots(self) -> int:
         """Returns the number of empty positions in the board"""
-        return sum(sum(self._board == None))
+        return self._num_empty_slots
 
     @property
     def empty_slots(self) -> List[Position]:
         """Returns all the empty positions in the board"""
-        empty_slots = np.argwhere(self._board == None)
+        xs, ys = np.divmod(self._empty_slots[:self._num_empty_slots], self.height)
 
-        empty_slots = list(map(lambda s: Position(x=s[0], y=s[1]), empty_slots))
+        return list(map(Position, xs.tolist(), ys.tolist()))
 
-        return empty_slots
+    @property
+    def kinds(self) -> np.ndarray:
+        """Returns a read-only view of the grid with the CellKind of every position in the board"""
+        kinds = self._kinds.view()
+        kinds.flags.writeable = False
+
+        return kinds
+
+    def count(self, kind: CellKind) -> int:
+        """Returns the number of positions in the board with the given kind of element"""
+        return int(np.count_nonzero(self._kinds == kind))
+
+    def positions(self, kind: CellKind) -> List[Position]:
+        """Returns all the positions in the board with the given kind of element"""
+        xs, ys = np.nonzero(self._kinds == kind)
+
+        return list(map(Position, xs.tolist(), ys.tolist()))
+
+    @property
+    def units(self) -> Optional[UnitTable]:
+        """Returns the table with the enemies of the board, if they are stored in a UnitTable"""
+        return self._units
+
+    @property
+    def unit_rows(self) -> Optional[np.ndarray]:
+        """Returns a read-only view of the grid with the row of the UnitTable of the enemy in every position
+        (-1 where there isn't any), if the enemies are stored in a UnitTable"""
+        if self._unit_rows is None:
+            return None
+
+        rows = self._unit_rows.view()
+        rows.flags.writeable = False
+
+        return rows
 
     def __getitem__(self, position: Position) -> Optional["GameElement"]:
-        """Allows to access positions by using board[position] instead of board.get(position)"""
-        return self._board[position]
+        """Allows to access positions by using board[position] instead of board.get(position). Columns
+        can also be accessed with board[x], so that board[x][y] works too."""
+        if isinstance(position, tuple):
+            return self.get(position)
+        elif self._units is None:
+            return self._board[position]
+        elif isinstance(position, (int, np.integer)):
+            # The enemies of a unit table aren't in the object grid, so elements are looked up one by one
+            return _BoardColumn(self, int(position))
+
+        raise TypeError(f"Boards with a unit table can only be indexed by position or column, not by {position!r}")
 
     def get(self, position: Position) -> Optional["GameElement"]:
         """Returns the game element at a certain position in the board.
         Note that the position might be empty; in such case, None will be returned."""
-        return self._board[position]
+        element = self._board[position]
+
+        if element is None and self._units is not None:
+            row = self._unit_rows.item(position)
+
+            if row >= 0:
+                return self._units.view(row)
+
+        return element
 
     def move(self, unit: "Unit", destination: Position) -> bool:
         """Moves the unit to the given position. It returns True if the move is successful,
@@ -50,55 +182,196 @@ class Board(Logger):
         current_position = unit.position
 
         if not self.is_valid(destination):
-            self.log(f"Target position {destination} is not valid!")
+            self.log("Target position %s is not valid!", destination, level=WARNING)
             return False
         elif not self.is_empty(destination):
-            self.log(f"Can't move {unit.name} to position {destination}, it's not empty!")
+            self.log("Can't move %s to position %s, it's not empty!", unit.name, destination, level=WARNING)
             return False
         elif unit.move(destination):
             self.clear(current_position)
-            self._board[destination] = unit
-            self.log(f"Moved {unit.name} from {current_position} to position {destination}")
+            self._set(destination, unit)
+            self.log("Moved %s from %s to position %s", unit.name, current_position, destination, level=DEBUG)
             return True
         else:
-            self.log(f"Failed to move {unit.name} to position {destination}")
+            self.log("Failed to move %s to position %s", unit.name, destination, level=WARNING)
             return False
 
     def place(self, element: "GameElement", destination: Position) -> bool:
         """Places an element in the board. Note that the main difference is that this method
         does not depend on the ability of the element/unit to move."""
         if not self.is_valid(destination):
-            self.log(f"Target position {destination} is not valid!")
+            self.log("Target position %s is not valid!", destination, level=WARNING)
             return False
         elif not self.is_empty(destination):
-            self.log(f"Can't place element {element.name} at position {destination}, it's not empty!")
+            self.log("Can't place element %s at position %s, it's not empty!", element.name, destination, level=WARNING)
             return False
 
         element.position = destination
-        self._board[destination] = element
-        self.log(f"Placed {element.name} at position {destination}")
+        self._set(destination, element)
+        self.log("Placed %s at position %s", element.name, destination, level=DEBUG)
 
         return True
 
+    def _place_many(self, elements: List["GameElement"], slots: np.ndarray):
+        """Places many elements in the board at once. The slots are the flat indices (x * height + y)
+        of the destinations, and they must be different empty positions in the board."""
+        xs, ys = np.divmod(np.asarray(slots, dtype=np.int64), self.height)
+        positions = list(map(Position, xs.tolist(), ys.tolist()))
+        column = np.empty(len(elements), dtype=object)
+
+        for idx, (element, position) in enumerate(zip(elements, positions)):
+            element.position = position
+            column[idx] = element
+
+        kinds = np.fromiter(map(cell_kind, elements), dtype=np.uint8, count=len(elements))
+        self._board[xs, ys] = column
+        self._kinds[xs, ys] = kinds
+
+        self._enemies.add_many([p for p, kind in zip(positions, kinds.tolist()) if kind == ENEMY])
+        self._take_slots(slots)
+        # Recomputing the distances to the exit is cheaper than repairing them for every element
+        self._exit_field = None
+        self._reachable.clear()
+        self._reachable_by_slot.clear()
+
+        for listener in self._listeners:
+            for element, position in zip(elements, positions):
+                listener(position, None, element)
+
+        self.log("Placed %s elements in the board", len(elements), level=DEBUG)
+
+    def _place_units(self, units: UnitTable, rows: np.ndarray, slots: np.ndarray):
+        """Places many enemies from a UnitTable in the board at once. The slots are the flat indices
+        (x * height + y) of the destinations, and they must be different empty positions in the board.
+        A board can only hold enemies from a single table."""
+        if self._units is None:
+            self._units = units
+            self._unit_rows = np.full(shape=(self.width, self.height), fill_value=-1, dtype=np.int32)
+            # Keeping a Position object per enemy in the index would take more memory than the table itself
+            enemies = OccupancyGrid(width=self.width, height=self.height)
+            enemies.add_many(list(self._enemies))
+            self._enemies = enemies
+        elif self._units is not units:
+            raise ValueError("The board already has enemies from a different unit table")
+
+        xs, ys = np.divmod(np.asarray(slots, dtype=np.int64), self.height)
+        units.x[rows] = xs
+        units.y[rows] = ys
+        self._unit_rows[xs, ys] = rows
+        self._kinds[xs, ys] = ENEMY
+        self._enemies.add_arrays(xs, ys)
+        self._take_slots(slots)
+        self._exit_field = None
+        self._reachable.clear()
+        self._reachable_by_slot.clear()
+
+        for listener in self._listeners:
+            for row in rows.tolist():
+                view = units.view(row)
+                listener(view.position, None, view)
+
+        self.log("Placed %s enemies in the board", len(rows), level=DEBUG)
+
+    def _take_slots(self, slots: np.ndarray):
+        """Removes many slots from the empty slots index at once"""
+        taken = np.zeros(self.width * self.height, dtype=bool)
+        taken[slots] = True
+        empty = self._empty_slots[:self._num_empty_slots]
+        empty = empty[~taken[empty]]
+        self._num_empty_slots = len(empty)
+        self._empty_slots[:self._num_empty_slots] = empty
+        self._empty_slot_idx[empty] = np.arange(self._num_empty_slots)
+        self._empty_slot_idx[slots] = -1
+
+    def put(self, position: Position, element: Optional["GameElement"]):
+        """Writes an element (or None) at a position, replacing whatever was there, and updates the position
+        of the element. Unlike place and move, there are no checks at all, so this is meant for restoring
+        previous states of the board (see Game.restore)."""
+        if element is not None:
+            element.position = position
+
+        self._set(position, element)
+
     def clear(self, position: Optional[Position] = None) -> bool:
         """Clears a position in the board. This method is useful, e.g. when a unit has been destroyed."""
         if position is None:
             return False
         elif not self.is_valid(position):
-            self.log(f"Can't clear position {position}, it's not valid!")
+            self.log("Can't clear position %s, it's not valid!", position, level=WARNING)
             return False
 
-        self._board[position] = None
+        self._set(position, None)
 
         return True
 
+    def _set(self, position: Position, element: Optional["GameElement"]):
+        """Writes an element (or None) at a position, keeping the kinds grid and the indices up to date,
+        and notifying the listeners. All the changes to the board should go through this method."""
+        previous = self.get(position)
+
+        if self._units is None:
+            self._board[position] = element
+        elif isinstance(element, UnitView) and element.table is self._units:
+            self._board[position] = None
+            self._unit_rows[position] = element.row
+        else:
+            self._board[position] = element
+            self._unit_rows[position] = -1
+
+        kind = cell_kind(element)
+        previous_kind = self._kinds.item(position)
+        if previous_kind == ENEMY:
+            self._enemies.remove(position)
+        if kind == ENEMY:
+            self._enemies.add(position)
+        self._kinds[position] = kind
+
+        if self._exit_field is not None and kind != previous_kind:
+            if EXIT in (kind, previous_kind):
+                # The exits changed, so the distances need to be computed from scratch
+                self._exit_field = None
+            else:
+                self._exit_field.set_passable(position, kind in PASSABLE)
+
+        slot = position[0] * self.height + position[1]
+
+        if slot in self._reachable_by_slot:
+            for key in list(self._reachable_by_slot[slot]):
+                self._forget_reachable(key)
+
+        idx = self._empty_slot_idx[slot]
+
+        if element is None and idx < 0:
+            self._empty_slots[self._num_empty_slots] = slot
+            self._empty_slot_idx[slot] = self._num_empty_slots
+            self._num_empty_slots += 1
+        elif element is not None and idx >= 0:
+            # Swap the last empty slot into the place of the one being removed
+            last = self._empty_slots[self._num_empty_slots - 1]
+            self._empty_slots[idx] = last
+            self._empty_slot_idx[last] = idx
+            self._empty_slot_idx[slot] = -1
+            self._num_empty_slots -= 1
+
+        for listener in self._listeners:
+            listener(position, previous, element)
+
+    def subscribe(self, listener: Callable[[Position, Optional["GameElement"], Optional["GameElement"]], None]):
+        """Registers a function that will be called every time a position in the board changes, with the
+        position, the element that was there before and the new element (any of them can be None)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Position, Optional["GameElement"], Optional["GameElement"]], None]):
+        """Stops notifying a listener registered with subscribe"""
+        self._listeners.remove(listener)
+
     def is_empty(self, position: Position) -> bool:
         """Checks whether a position in the board is empty"""
-        return self._board[position] is None
+        return self._kinds.item(position) == EMPTY
 
     def is_enemy(self, position: Position) -> bool:
         """Checks whether a position in the board contains an enemy"""
-        return isinstance(self._board[position], Enemy)
+        return self._kinds.item(position) == ENEMY
 
     def is_valid(self, position: Position) -> bool:
         """Checks whether a position is a valid position in the board,
@@ -110,40 +383,201 @@ class Board(Logger):
         """This method checks if there are enemies at the specified distance,
         starting from the position provided. It can be used to determine whether
         an attack action can be taken or not."""
+        if not self._enemies or distance < 1:
+            return False
+
+        # There is no point in looking further than the whole board
+        distance = min(distance, self.width + self.height - 2)
+
+        if distance <= SMALL_RANGE:
+            # For the usual attack ranges, checking a few positions is much cheaper than slicing the grids
+            x, y = position
+            width, height, kinds = self.width, self.height, self._kinds
+
+            return any(0 <= x + dx < width and 0 <= y + dy < height and kinds.item(x + dx, y + dy) == ENEMY
+                       for dx, dy in diamond_offsets(distance))
+
         start_x = max(0, position.x - distance)
         end_x   = min(self.width - 1, position.x + distance) + 1
         start_y = max(0, position.y - distance)
         end_y   = min(self.height - 1, position.y + distance) + 1
 
-        x_range = range(start_x, end_x)
-        y_range = range(start_y, end_y)
-        positions = [Position(x=x, y=y) for x in x_range for y in y_range]
+        if start_x >= end_x or start_y >= end_y:
+            return False
+
+        # The diamond is centered at the position, so we need to crop it the same way as the board
+        mask_x = start_x - position.x + distance
+        mask_y = start_y - position.y + distance
+        mask = diamond_mask(distance)[mask_x:mask_x + end_x - start_x, mask_y:mask_y + end_y - start_y]
+        enemies = self._kinds[start_x:end_x, start_y:end_y] == ENEMY
+
+        return bool(np.any(enemies & mask))
+
+    def enemies_in_range(self, position: Position, distance: int) -> List[Position]:
+        """Returns the positions of the enemies within the specified distance of the position
+        provided (not including the position itself), sorted from the closest to the furthest."""
+        if distance <= SMALL_RANGE:
+            # Just like in has_enemies_in_range, the offsets are already sorted by distance (and then by
+            # position), so the enemies found come out sorted
+            x, y = position
+            width, height, kinds = self.width, self.height, self._kinds
+
+            return [Position(x + dx, y + dy) for dx, dy in diamond_offsets(distance)
+                    if 0 <= x + dx < width and 0 <= y + dy < height and kinds.item(x + dx, y + dy) == ENEMY]
+
+        return self._enemies.in_range(Position(*position), distance)
+
+    def count_enemies_in_range(self, position: Position, distance: int) -> int:
+        """Returns the number of enemies within the specified distance of the position provided
+        (not including the position itself)."""
+        return self._enemies.count_in_range(Position(*position), distance)
+
+    def nearest_enemies(self, position: Position, k: int = 1) -> List[Position]:
+        """Returns the positions of the k enemies that are closest to the position provided
+        (not including the position itself), sorted from the closest to the furthest."""
+        return self._enemies.nearest(Position(*position), k)
+
+    def distance_to_exit(self, position: Position) -> Optional[int]:
+        """Returns the number of steps (up, down, left or right) needed to get from the position to the
+        closest exit portal, walking only through empty positions (enemies and walls are obstacles).
+        Returns None if the position can't reach any exit, or if it is an obstacle itself."""
+        return self._distances_to_exit().distance(position)
+
+    def next_step_towards_exit(self, position: Position) -> Optional[Position]:
+        """Returns the position next to the given one that is one step closer to the exit portal, or None if
+        the position is the exit or can't reach it. Note that the last step is the exit portal itself."""
+        return self._distances_to_exit().next_step(position)
+
+    def _distances_to_exit(self) -> DistanceField:
+        """Returns the distance field of the exits, computing it if needed. Once computed, every change in
+        the board repairs it, so queries are just lookups."""
+        if self._exit_field is None:
+            self._exit_field = DistanceField(passable=PASSABLE_KINDS[self._kinds], sources=self.positions(CellKind.EXIT))
+            self.log("Computed the distances to the exit", level=DEBUG)
+
+        return self._exit_field
+
+    def reachable(self, unit: "Unit") -> List[Position]:
+        """Returns the positions the unit can get to within unit.speed steps (up, down, left or right),
+        going only through empty positions, so unlike Unit.move it doesn't jump over other elements. The
+        positions are sorted, and don't include the position of the unit.
+
+        The search grows the reachable area one step at a time over the window of the board within reach
+        of the unit. Results are cached until a position within reach changes."""
+        key = (Position(*unit.position), unit.speed)
+        reachable = self._reachable.get(key)
+
+        if reachable is None:
+            reachable = self._reachable[key] = self._compute_reachable(*key)
+
+            for slot in self._slots_within(*key):
+                self._reachable_by_slot.setdefault(slot, set()).add(key)
+
+            if len(self._reachable) > REACHABLE_CACHE_SIZE:
+                self._forget_reachable(next(iter(self._reachable)))
+        else:
+            self._reachable.move_to_end(key)
+
+        return list(reachable)
 
-        def position_has_enemy(pos: Position) -> bool:
-            return pos != position \
-                and position.distance(to=pos) <= distance \
-                and self.is_enemy(pos)
+    def _forget_reachable(self, key: Tuple[Position, int]):
+        """Drops a reachable set from the cache and from the index of the slots within its reach"""
+        del self._reachable[key]
 
-        positions = list(filter(position_has_enemy, positions))
-        self.log(f"Positions with enemies in attack range: {positions}")
+        for slot in self._slots_within(*key):
+            keys = self._reachable_by_slot[slot]
+            keys.discard(key)
 
-        return any(positions)
+            if not keys:
+                del self._reachable_by_slot[slot]
 
-    def get_empty_slot(self) -> Optional[Position]:
-        """Gets a random empty slot from the board, if there are any."""
+    def _slots_within(self, position: Position, speed: int) -> List[int]:
+        """The flat indices (x * height + y) of the positions of the board within speed steps of the position"""
+        slots = []
+
+        for x in range(max(position.x - speed, 0), min(position.x + speed + 1, self.width)):
+            reach = speed - abs(x - position.x)
+            slots.extend(range(x * self.height + max(position.y - reach, 0),
+                               x * self.height + min(position.y + reach + 1, self.height)))
+
+        return slots
+
+    def _compute_reachable(self, position: Position, speed: int) -> List[Position]:
+        start_x, start_y = max(position.x - speed, 0), max(position.y - speed, 0)
+        end_x, end_y = min(position.x + speed + 1, self.width), min(position.y + speed + 1, self.height)
+        empty = self._kinds[start_x:end_x, start_y:end_y] == EMPTY
+        center = position.x - start_x, position.y - start_y
+
+        reached = np.zeros_like(empty)
+        reached[center] = True
+
+        for _ in range(speed):
+            grown = reached.copy()
+            grown[1:] |= reached[:-1]
+            grown[:-1] |= reached[1:]
+            grown[:, 1:] |= reached[:, :-1]
+            grown[:, :-1] |= reached[:, 1:]
+            grown &= empty
+            grown[center] = True
+
+            if np.array_equal(grown, reached):
+                break
+
+            reached = grown
+
+        reached[center] = False
+        xs, ys = np.nonzero(reached)
+
+        return list(map(Position, (xs + start_x).tolist(), (ys + start_y).tolist()))
+
+    @property
+    def pathfinder(self) -> Pathfinder:
+        """Returns the pathfinder of the board, which is created the first time it's needed"""
+        if self._pathfinder is None:
+            self._pathfinder = Pathfinder(self)
+
+        return self._pathfinder
+
+    def find_path(self, start: Position, goal: Position, method: str = "astar",
+                  max_length: Optional[int] = None) -> Optional[List[Position]]:
+        """Returns a shortest path from start to goal through empty positions (excluding the start, including
+        the goal), or None if there is none with at most max_length steps. The method can be either "astar"
+        or "jps" (Jump Point Search, faster on large open maps). Recent paths are cached, see Pathfinder."""
+        return self.pathfinder.find_path(start, goal, method=method, max_length=max_length)
+
+    @property
+    def num_enemies(self) -> int:
+        """Returns the number of enemies in the board"""
+        return len(self._enemies)
+
+    def get_empty_slot(self, rng: Optional[np.random.Generator] = None) -> Optional[Position]:
+        """Gets a random empty slot from the board, if there are any. The slot is drawn from
+        the random generator provided, or from a new (unseeded) one otherwise."""
         if not self.num_empty_slots:
-            self.log("No more empty positions in the board!")
+            self.log("No more empty positions in the board!", level=WARNING)
             return None
 
-        empty_slots = self.empty_slots
-        slot_idx = np.random.randint(len(empty_slots))
+        if rng is None:
+            rng = np.random.default_rng()
 
-        return empty_slots[slot_idx]
+        slot_idx = rng.integers(self._num_empty_slots)
+        x, y = divmod(int(self._empty_slots[slot_idx]), self.height)
+
+        return Position(x=x, y=y)
 
     @classmethod
-    def create(cls, hero: Hero, width: int, height: int, num_enemies: int, min_level=1, max_level=3):
+    def create(cls, hero: Hero, width: int, height: int, num_enemies: int, min_level=1, max_level=3,
+               rng: Optional[np.random.Generator] = None, compact: bool = False):
         """Creates a board with the given width, height and number of enemies. The hero will always
-        be placed at position (0, 0), and the exit portal will be placed in the opposite corner."""
+        be placed at position (0, 0), and the exit portal will be placed in the opposite corner.
+        Enemies are drawn from the random generator provided, so that boards can be reproduced;
+        when no generator is provided, a new (unseeded) one is used.
+
+        When compact is True, enemies are stored in a UnitTable instead of being Python objects, and
+        indexed with an OccupancyGrid, which uses a fraction of the memory for large boards."""
+        if rng is None:
+            rng = np.random.default_rng()
+
         board = cls(width=width, height=height)
         board.place(hero, destination=Position(0, 0))
 
@@ -153,10 +587,39 @@ class Board(Logger):
         # Make sure that we don't create more enemies than slots
         num_enemies = min(num_enemies, board.num_empty_slots)
 
-        for _ in range(num_enemies):
-            pos = board.get_empty_slot()
-            level = np.random.randint(min_level, max_level + 1)
-            enemy = Enemy.random_enemy(level)
-            board.place(enemy, destination=pos)
+        # All the positions, levels and classes are drawn at once, instead of one enemy at a time
+        slots = rng.choice(board._empty_slots[:board.num_empty_slots], size=num_enemies, replace=False)
+        levels = rng.integers(min_level, max_level + 1, size=num_enemies)
+
+        if compact:
+            units = UnitTable(capacity=num_enemies)
+            rows = units.add(kinds=rng.integers(len(UnitTable.KINDS), size=num_enemies), levels=levels)
+            board._place_units(units, rows, slots)
+        else:
+            enemies = Enemy.random_enemies(levels, rng=rng)
+            board._place_many(enemies, slots)
 
         return board
+
+
+class _BoardColumn:
+    """A column of a board (all the positions with the same x), which looks up its elements with Board.get"""
+    __slots__ = ("board", "x")
+
+    def __init__(self, board: Board, x: int):
+        if not -board.width <= x < board.width:
+            raise IndexError(f"Column {x} is out of the board")
+
+        self.board = board
+        self.x = x % board.width
+
+    def __len__(self) -> int:
+        return self.board.height
+
+    def __getitem__(self, y: int) -> Optional["GameElement"]:
+        if not isinstance(y, (int, np.integer)):
+            raise TypeError(f"Columns can only be indexed by y, not by {y!r}")
+        elif not -self.board.height <= y < self.board.height:
+            raise IndexError(f"Row {y} is out of the board")
+
+        return self.board.get(Position(self.x, int(y) % self.board.height))
@@ -0,0 +1,134 @@
+from typing import NamedTuple, Tuple, Union
+
+import numpy as np
+
+from .attack import MagicAttack, MeleeAttack, RangedAttack
+from .defense import ArmoredDefense, Barrier, Defense
+from .types import AttackKind, DefenseKind
+from .unit_table import UnitTable
+
+# Plain int copies of the codes, which are much cheaper to use with NumPy
+MELEE, RANGED, MAGIC = map(int, AttackKind)
+PLAIN, ARMORED, BARRIER = map(int, DefenseKind)
+
+
+def attack_kind(unit: Union["Unit", type]) -> AttackKind:
+    """Returns the AttackKind code of a unit (or of a unit class)"""
+    cls = unit if isinstance(unit, type) else type(unit)
+
+    # MagicAttack is a RangedAttack, so it needs to be checked first
+    if issubclass(cls, MagicAttack):
+        return AttackKind.MAGIC
+    elif issubclass(cls, RangedAttack):
+        return AttackKind.RANGED
+    elif issubclass(cls, MeleeAttack):
+        return AttackKind.MELEE
+
+    raise ValueError(f"{cls.__name__} doesn't have any of the known attacks")
+
+def defense_kind(unit: Union["Unit", type]) -> DefenseKind:
+    """Returns the DefenseKind code of a unit (or of a unit class)"""
+    cls = unit if isinstance(unit, type) else type(unit)
+
+    # Barrier is an ArmoredDefense, which in turn is a Defense, so the order matters
+    if issubclass(cls, Barrier):
+        return DefenseKind.BARRIER
+    elif issubclass(cls, ArmoredDefense):
+        return DefenseKind.ARMORED
+    elif issubclass(cls, Defense):
+        return DefenseKind.PLAIN
+
+    raise ValueError(f"{cls.__name__} doesn't have any of the known defenses")
+
+
+# Codes of every kind of enemy in a UnitTable, indexed by the kind column
+TABLE_ATTACK_KINDS = np.array([attack_kind(cls) for cls in UnitTable.KINDS], dtype=np.uint8)
+TABLE_DEFENSE_KINDS = np.array([defense_kind(cls) for cls in UnitTable.KINDS], dtype=np.uint8)
+
+
+class CombatResult(NamedTuple):
+    """Outcome of a batch of attacks. hit and destroyed have one value per attack: whether the target
+    was within reach (i.e. whether attack returned True or False because of the distance) and whether it
+    ended up destroyed, which is what attack returns. health and armor are the updated arrays of the targets."""
+    hit: np.ndarray
+    destroyed: np.ndarray
+    health: np.ndarray
+    armor: np.ndarray
+
+
+def hit_power(kind: np.ndarray, power: np.ndarray, attack_range: np.ndarray, distance: np.ndarray) -> np.ndarray:
+    """Returns the power every attack hits its target with, or NaN when the target is out of reach.
+    This follows the attack classes: melee attacks only reach a distance of 1, ranged attacks hit with
+    half of the power (rounded up) when the target is at a distance of 1 or less, and magic attacks don't."""
+    kind = np.asarray(kind)
+    power = np.asarray(power, dtype=np.float64)
+    distance = np.asarray(distance)
+
+    reach = np.where(kind == MELEE, 1, attack_range)
+    power = np.where((kind == RANGED) & (distance <= 1), np.ceil(power / 2), power)
+
+    return np.where(distance <= reach, power, np.nan)
+
+def resolve(kind: np.ndarray, power: np.ndarray, attack_range: np.ndarray, distance: np.ndarray,
+            target: np.ndarray, defense: np.ndarray, health: np.ndarray, armor: np.ndarray) -> CombatResult:
+    """Resolves many attacks at once. The first five arrays have one value per attack: the AttackKind,
+    power and range of the attacker, its distance to the target and the index of the target. The last
+    three have one value per target: its DefenseKind, health and armor. The input arrays aren't modified.
+
+    The result is exactly the same as calling attack for every pair, in order: plain defenses take all
+    the damage, armored ones absorb up to their armor on every hit, and barriers absorb the first points
+    of damage until they break. Since hits on the same target depend on each other, attacks are resolved
+    in rounds, where every target takes at most one hit (its first pending one), so the number of NumPy
+    operations grows with the number of attacks on the same target, not with the number of attacks."""
+    target = np.asarray(target, dtype=np.intp)
+    defense = np.asarray(defense)
+    health = np.array(health, dtype=np.float64)
+    armor = np.array(armor, dtype=np.float64)
+
+    damage = hit_power(kind, power, attack_range, distance)
+    hit = ~np.isnan(damage)
+    destroyed = np.zeros(len(target), dtype=bool)
+
+    # Hits sorted by target (keeping their order), and the rank of every hit among the hits on its target
+    attacks = np.flatnonzero(hit)
+    attacks = attacks[np.argsort(target[attacks], kind="stable")]
+    positions = np.arange(len(attacks))
+    starts = np.r_[True, target[attacks][1:] != target[attacks][:-1]]
+    rank = positions - np.maximum.accumulate(np.where(starts[:len(attacks)], positions, 0))
+    # Hits grouped by rank, so the n-th round has the n-th hit on every target
+    rounds = np.split(attacks[np.argsort(rank, kind="stable")], np.cumsum(np.bincount(rank))[:-1])
+
+    for batch in rounds:
+        idx = target[batch]
+        health[idx], armor[idx] = take_damage(defense[idx], health[idx], armor[idx], damage[batch])
+        destroyed[batch] = health[idx] <= 0
+
+    return CombatResult(hit=hit, destroyed=destroyed, health=health, armor=armor)
+
+def take_damage(defense: np.ndarray, health: np.ndarray, armor: np.ndarray, damage: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the health and armor of many units after every one of them takes one hit, following the
+    defense classes: plain defenses take all the damage, armored ones absorb up to their armor, and
+    barriers absorb it too, but lose as much armor as the damage they take"""
+    health = health - np.where(defense == PLAIN, damage, np.maximum(damage - armor, 0))
+    armor = np.where(defense == BARRIER, np.maximum(armor - damage, 0), armor)
+
+    return health, armor
+
+def resolve_table(table: UnitTable, attackers: np.ndarray, targets: np.ndarray) -> CombatResult:
+    """Resolves the attacks of the enemies in the given rows of a UnitTable on the enemies in the rows
+    of targets (one target per attacker), writing the new health and armor back to the table.
+    Distances are computed from the positions of the enemies, which need to be placed."""
+    attackers = np.asarray(attackers, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+    size = len(table)
+
+    distance = np.abs(table.x[attackers] - table.x[targets]) + np.abs(table.y[attackers] - table.y[targets])
+    result = resolve(kind=TABLE_ATTACK_KINDS[table.kind[attackers]], power=table.power[attackers],
+                     attack_range=table.attack_range[attackers], distance=distance, target=targets,
+                     defense=TABLE_DEFENSE_KINDS[table.kind[:size]], health=table.health[:size],
+                     armor=table.armor[:size])
+
+    table.health[:size] = result.health
+    table.armor[:size] = result.armor
+
+    return result
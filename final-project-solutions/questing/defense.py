@@ -2,13 +2,16 @@ from abc import ABC, abstractmethod
 import math
 from typing import Optional
 
-from .logger import Logger
+from .logger import DEBUG
+from .slots import UnitSlots
 
 
-class Defense(Logger):
+class Defense(UnitSlots):
     """Implements the basic interface for units that can be destroyed. Such units
     have a 'health' attribute, and can recive damage via the 'take_damage' method.
     Their health can also be restored via the 'heal' method."""
+    __slots__ = ()
+
     def __init__(self, health: int, **kwargs):
         super().__init__(**kwargs)
         self.health = health
@@ -19,13 +22,13 @@ class Defense(Logger):
         provided, the health is restored to full health. Note that (at least in the default
         implementation), health can never be restored above the original amount."""
         if points:
-            self.log(f"Restoring {points} points of health")
+            self.log("Restoring %s points of health", points, level=DEBUG)
             # Prevent health from going over the original health
             new_health = min(self.health + points, self._original_health)
-            self.log(f"Health after healing: {new_health} (before: {self.health})")
+            self.log("Health after healing: %s (before: %s)", new_health, self.health, level=DEBUG)
             self.health = new_health
         else:
-            self.log(f"Restoring to full health ({self._original_health} points)")
+            self.log("Restoring to full health (%s points)", self._original_health, level=DEBUG)
             self.health = self._original_health
 
     def take_damage(self, damage: int) -> bool:
@@ -37,10 +40,10 @@ class Defense(Logger):
         self.health -= damage
 
         if self.health <= 0:
-            self.log(f"I took {damage} damage, and I've been destroyed!")
+            self.log("I took %s damage, and I've been destroyed!", damage, level=DEBUG)
             return True
         else:
-            self.log(f"I took {damage} damage, I have {self.health} health points left")
+            self.log("I took %s damage, I have %s health points left", damage, self.health, level=DEBUG)
             return False
 
     @property
@@ -51,6 +54,8 @@ class Defense(Logger):
 class ArmoredDefense(Defense):
     """This type of defense represents the case where the unit is armored,
     so everytime the unit takes damage, part of it (or all of it!) is absorved."""
+    __slots__ = ()
+
     def __init__(self, armor: int, **kwargs):
         super().__init__(**kwargs)
         self.armor = armor
@@ -65,7 +70,7 @@ class ArmoredDefense(Defense):
     def _absorb(self, damage: int) -> int:
         new_damage = max(damage - self.armor, 0)
         absorved_damage = min(damage, self.armor)
-        self.log(f"Armor absorved {absorved_damage} damage, taking {new_damage} damage instead of {damage}")
+        self.log("Armor absorved %s damage, taking %s damage instead of %s", absorved_damage, new_damage, damage, level=DEBUG)
 
         return new_damage
 
@@ -75,6 +80,8 @@ class Barrier(ArmoredDefense):
     and at some point the barrier will be broken. In other words, a barrier will absorb the N first points
     of damage, where N is the armor value.
     """
+    __slots__ = ()
+
     def _absorb(self, damage: int) -> int:
         if not self.armor:
             return damage
@@ -84,6 +91,6 @@ class Barrier(ArmoredDefense):
         self.armor = max(self.armor - damage, 0)
 
         if not self.armor:
-            self.log("My armor has been broken!")
+            self.log("My armor has been broken!", level=DEBUG)
 
         return new_damage
@@ -0,0 +1,198 @@
+from collections import deque
+import heapq
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .types import Position
+
+# Distance of the positions that can't reach any source
+INF = np.iinfo(np.int32).max
+# Grids with more positions than this compute the distances with NumPy
+VECTORIZED_BFS_SIZE = 10000
+
+
+class DistanceField:
+    """Distances (in steps up, down, left or right) from every position of a grid to the closest of a set
+    of sources, e.g. the exit portal, moving only through passable positions. Distances are computed once
+    with a breadth first search, and then repaired incrementally when positions become passable or blocked,
+    which only touches the positions whose distance actually changes.
+
+    Positions are handled as flat indices (x * height + y), just like the slots of the board."""
+    def __init__(self, passable: np.ndarray, sources: List[Position]):
+        self.width, self.height = passable.shape
+        self._passable = passable.reshape(-1).copy()
+        self._sources = {x * self.height + y for x, y in sources}
+        self._distances = np.full(self.width * self.height, INF, dtype=np.int32)
+        self._compute()
+
+    def distance(self, position: Position) -> Optional[int]:
+        """Returns the distance from the position to the closest source, or None if it can't reach any"""
+        distance = self._distances.item(position[0] * self.height + position[1])
+
+        return None if distance == INF else distance
+
+    def next_step(self, position: Position) -> Optional[Position]:
+        """Returns the neighbour of the position that is one step closer to a source, or None if the
+        position is a source or can't reach any. Up and right are preferred over down and left."""
+        cell = position[0] * self.height + position[1]
+        distance = self._distances.item(cell)
+
+        if distance == INF or distance == 0:
+            return None
+
+        for neighbour in self._neighbours(cell):
+            if self._distances.item(neighbour) == distance - 1:
+                return Position(*divmod(neighbour, self.height))
+
+        return None # pragma: no cover
+
+    def set_passable(self, position: Position, passable: bool):
+        """Updates the passability of a position, repairing the distances affected by the change"""
+        cell = position[0] * self.height + position[1]
+
+        if self._passable[cell] == passable:
+            return
+
+        self._passable[cell] = passable
+
+        if passable:
+            self._unblock(cell)
+        else:
+            self._block(cell)
+
+    def as_array(self) -> np.ndarray:
+        """Returns the grid of distances, with -1 for the positions that can't reach any source"""
+        distances = self._distances.reshape(self.width, self.height).astype(np.int64)
+        distances[distances == INF] = -1
+
+        return distances
+
+    def _compute(self):
+        """Breadth first search from the sources. On large grids, the whole frontier is expanded at once with
+        NumPy; on small ones the overhead of the NumPy calls is higher than a plain search (up to ~10k cells)."""
+        sources = sorted(cell for cell in self._sources if self._passable[cell])
+
+        if len(self._distances) <= VECTORIZED_BFS_SIZE:
+            # The whole grid is visited, so it's worth searching on lists, which are much cheaper to index
+            distances = self._distances.tolist()
+
+            for source in sources:
+                distances[source] = 0
+
+            self._search(deque(sources), self._passable.tolist(), distances)
+            self._distances[:] = distances
+            return
+
+        frontier = np.array(sources, dtype=np.int64)
+        self._distances[frontier] = 0
+        distance = 0
+
+        while len(frontier):
+            distance += 1
+            xs, ys = np.divmod(frontier, self.height)
+            candidates = np.concatenate([frontier[xs > 0] - self.height, frontier[xs < self.width - 1] + self.height,
+                                         frontier[ys > 0] - 1, frontier[ys < self.height - 1] + 1])
+            candidates = candidates[self._passable[candidates] & (self._distances[candidates] == INF)]
+            frontier = np.unique(candidates)
+            self._distances[frontier] = distance
+
+    def _search(self, queue: deque, passable: Sequence[bool], distances: Sequence[int]):
+        """Breadth first search from the positions in the queue, lowering the distances of the positions
+        around them until no distance can be lowered any more. This is the inner loop of every computation
+        and repair, so the neighbours are inlined instead of going through _neighbours. The passable positions
+        and the distances can be the arrays of the field or lists with their values."""
+        width, height = self.width, self.height
+
+        while queue:
+            current = queue.popleft()
+            distance = distances[current] + 1
+            x, y = divmod(current, height)
+
+            for neighbour, inside in ((current + 1, y < height - 1), (current + height, x < width - 1),
+                                      (current - 1, y > 0), (current - height, x > 0)):
+                if inside and passable[neighbour] and distances[neighbour] > distance:
+                    distances[neighbour] = distance
+                    queue.append(neighbour)
+
+    def _unblock(self, cell: int):
+        """A position became passable, so it (and the positions around it) can only get closer"""
+        if cell in self._sources:
+            self._distances[cell] = 0
+        else:
+            closest = min((self._distances.item(n) for n in self._neighbours(cell) if self._passable[n]), default=INF)
+
+            if closest == INF:
+                return
+
+            self._distances[cell] = closest + 1
+
+        self._search(deque([cell]), self._passable, self._distances)
+
+    def _block(self, cell: int):
+        """A position was blocked, so the positions whose shortest paths all went through it need new
+        distances. These are found layer by layer from the blocked position: a position is affected when
+        none of its neighbours one step closer to the sources is left unaffected. Then, their distances are
+        recomputed from the unaffected positions around them with Dijkstra's algorithm."""
+        previous = self._distances.item(cell)
+        self._distances[cell] = INF
+
+        if previous == INF:
+            return
+
+        affected = {cell}
+        queue = deque([cell])
+
+        while queue:
+            current = queue.popleft()
+            distance = previous if current == cell else self._distances.item(current)
+
+            for neighbour in self._neighbours(current):
+                if neighbour in affected or not self._passable[neighbour] or neighbour in self._sources \
+                        or self._distances.item(neighbour) != distance + 1:
+                    continue
+
+                supported = any(n not in affected and self._passable[n] and self._distances.item(n) == distance
+                                for n in self._neighbours(neighbour))
+
+                if not supported:
+                    affected.add(neighbour)
+                    queue.append(neighbour)
+
+        affected.discard(cell)
+        heap = []
+
+        for current in affected:
+            self._distances[current] = INF
+
+        for current in affected:
+            distance = min((self._distances.item(n) for n in self._neighbours(current)
+                            if self._passable[n] and n not in affected), default=INF)
+
+            if distance != INF:
+                heapq.heappush(heap, (distance + 1, current))
+
+        while heap:
+            distance, current = heapq.heappop(heap)
+
+            if distance >= self._distances.item(current):
+                continue
+
+            self._distances[current] = distance
+
+            for neighbour in self._neighbours(current):
+                if neighbour in affected and self._distances.item(neighbour) > distance + 1:
+                    heapq.heappush(heap, (distance + 1, neighbour))
+
+    def _neighbours(self, cell: int) -> Iterator[int]:
+        """Iterates over the flat indices of the positions up, right, down and left of a position"""
+        x, y = divmod(cell, self.height)
+
+        if y < self.height - 1:
+            yield cell + 1
+        if x < self.width - 1:
+            yield cell + self.height
+        if y > 0:
+            yield cell - 1
+        if x > 0:
+            yield cell - self.height
@@ -1,16 +1,19 @@
 from math import ceil
-from typing import List
+from typing import List, Optional, Sequence
 
 import numpy as np
 
 from .unit import Unit
 from .attack import MagicAttack, MeleeAttack, RangedAttack
 from .defense import ArmoredDefense, Barrier, Defense
+from .logger import DEBUG
 from .types import Position
 
 
 class Enemy(Unit):
     """Base class for enemy units"""
+    __slots__ = ()
+
     def __init__(self, level: int, **kwargs):
         super().__init__(**kwargs)
         self.level = level
@@ -19,17 +22,38 @@ class Enemy(Unit):
         return f"{self.short_text}({self.level})"
 
     @staticmethod
-    def random_enemy(level: int) -> "Enemy":
-        """Creates a random enemy of the specified level."""
+    def random_enemy(level: int, rng: Optional[np.random.Generator] = None) -> "Enemy":
+        """Creates a random enemy of the specified level, drawing its class from the random generator
+        provided (or from a new, unseeded one)."""
         enemy_classes = [Archer, Swordsman, Apprentice]
 
-        enemy_class = np.random.choice(enemy_classes)
+        if rng is None:
+            rng = np.random.default_rng()
+
+        enemy_class = rng.choice(enemy_classes)
 
         return enemy_class.create(level=level)
 
+    @staticmethod
+    def random_enemies(levels: Sequence[int], rng: Optional[np.random.Generator] = None) -> List["Enemy"]:
+        """Creates a random enemy for each one of the levels provided. The classes of
+        all the enemies are drawn at once from the random generator provided (or from
+        a new, unseeded one)."""
+        enemy_classes = [Archer, Swordsman, Apprentice]
+
+        if rng is None:
+            rng = np.random.default_rng()
+
+        class_indices = rng.integers(len(enemy_classes), size=len(levels))
+
+        return [enemy_classes[idx].create(level=level)
+                for idx, level in zip(class_indices.tolist(), np.asarray(levels).tolist())]
+
 
 class Archer(RangedAttack, Defense, Enemy):
     """Archers are a type of enemy that have ranged attack"""
+    __slots__ = ()
+
     NUM_UNITS = 0
     BASE_HEALTH = 3
     BASE_RANGE = 2
@@ -37,16 +61,22 @@ class Archer(RangedAttack, Defense, Enemy):
     BASE_SPEED = 1
 
     @classmethod
-    def create(cls, level: int) -> "Archer":
-        """Creates a new Archer instance of the specified level."""
+    def stats(cls, level: int) -> dict:
+        """Returns the stats of an Archer of the specified level."""
         health = cls.BASE_HEALTH * level
         attack_range = ceil(cls.BASE_RANGE + level * .2)
         power = cls.BASE_POWER + level
         speed = ceil(cls.BASE_SPEED + level * .1)
+
+        return dict(health=health, power=power, attack_range=attack_range, speed=speed)
+
+    @classmethod
+    def create(cls, level: int) -> "Archer":
+        """Creates a new Archer instance of the specified level."""
         cls.NUM_UNITS += 1
         name = f"{cls.__name__} {cls.NUM_UNITS}"
 
-        return cls(name=name, level=level, health=health, power=power, attack_range=attack_range, speed=speed)
+        return cls(name=name, level=level, **cls.stats(level))
 
     @property
     def short_text(self) -> str:
@@ -54,6 +84,8 @@ class Archer(RangedAttack, Defense, Enemy):
 
 class Swordsman(MeleeAttack, ArmoredDefense, Enemy):
     """Swordsmen are a type of enemy that have melee attack and armored defense"""
+    __slots__ = ()
+
     NUM_UNITS = 0
     BASE_HEALTH = 4
     BASE_ARMOR = 1
@@ -61,16 +93,22 @@ class Swordsman(MeleeAttack, ArmoredDefense, Enemy):
     BASE_SPEED = 1
 
     @classmethod
-    def create(cls, level: int) -> "Swordsman":
-        """Create a Swordsman of the specified level"""
+    def stats(cls, level: int) -> dict:
+        """Returns the stats of a Swordsman of the specified level"""
         health = ceil(cls.BASE_HEALTH * level * 1.1)
         armor = ceil(cls.BASE_ARMOR + level * .2)
         power = cls.BASE_POWER + level
         speed = ceil(cls.BASE_SPEED + level * .05)
+
+        return dict(health=health, power=power, armor=armor, speed=speed)
+
+    @classmethod
+    def create(cls, level: int) -> "Swordsman":
+        """Create a Swordsman of the specified level"""
         cls.NUM_UNITS += 1
         name = f"{cls.__name__} {cls.NUM_UNITS}"
 
-        return cls(name=name, level=level, health=health, power=power, armor=armor, speed=speed)
+        return cls(name=name, level=level, **cls.stats(level))
 
     @property
     def short_text(self) -> str:
@@ -78,6 +116,8 @@ class Swordsman(MeleeAttack, ArmoredDefense, Enemy):
 
 class Apprentice(MagicAttack, Barrier, Enemy):
     """Apprentices are a type of enemy that have magic attack and a barrier defense"""
+    __slots__ = ()
+
     NUM_UNITS = 0
     BASE_HEALTH = 4
     BASE_RANGE = 2
@@ -86,17 +126,23 @@ class Apprentice(MagicAttack, Barrier, Enemy):
     BASE_ARMOR = 1
 
     @classmethod
-    def create(cls, level: int) -> "Apprentice":
-        """Creates a new Apprentice of the specified level"""
+    def stats(cls, level: int) -> dict:
+        """Returns the stats of an Apprentice of the specified level"""
         health = ceil(cls.BASE_HEALTH * level * .8)
         attack_range = ceil(cls.BASE_RANGE + level * .25)
         power = cls.BASE_POWER + level * 1.1
         speed = ceil(cls.BASE_SPEED + level * .08)
         armor = level * cls.BASE_ARMOR
+
+        return dict(health=health, power=power, attack_range=attack_range, speed=speed, armor=armor)
+
+    @classmethod
+    def create(cls, level: int) -> "Apprentice":
+        """Creates a new Apprentice of the specified level"""
         cls.NUM_UNITS += 1
         name = f"{cls.__name__} {cls.NUM_UNITS}"
 
-        return cls(name=name, level=level, health=health, power=power, attack_range=attack_range, speed=speed, armor=armor)
+        return cls(name=name, level=level, **cls.stats(level))
 
     @property
     def short_text(self):
@@ -112,6 +158,8 @@ class Army(Enemy):
     - When the army moves, the position of all units in the army will be updated too.
     - When the army attacks, all units in the army will try to attack the target
     - When the army is attacked, the first unit in the army will take the damage.
+
+    Unlike the rest of the units, armies don't declare __slots__: they are few, and need to hold their units.
     """
     def __init__(self, units: List[Enemy], **kwargs):
         self.units = units
@@ -166,11 +214,11 @@ class Army(Enemy):
 
     def take_damage(self, damage: int) -> bool:
         if self.units[0].take_damage(damage):
-            self.log(f"{self.units[0].name} has been destroyed!")
+            self.log("%s has been destroyed!", self.units[0].name, level=DEBUG)
             self.units.pop(0)
 
         if not self.is_alive:
-            self.log("All units in the army have been destroyed!")
+            self.log("All units in the army have been destroyed!", level=DEBUG)
 
         # Result should be true when unit has been destroyed
         return not self.is_alive
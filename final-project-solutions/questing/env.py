@@ -0,0 +1,151 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .board import EXIT, HERO, Board
+from .game import Game, GameActions, GameStatus
+from .hero import Warrior
+from .logger import quiet
+from .types import CellKind
+from .unit_table import UnitTable
+from .vector import ACTIONS
+
+
+class QuestingEnv:
+    """Gym-style environment for playing games with reinforcement learning. Observations are integer
+    tensors with one grid (width x height) per channel (see CHANNELS):
+    - hero, exit: 1 in the position of the hero, or the exit portal, and 0 everywhere else
+    - enemy_kind: the index of the class of the enemy in UnitTable.KINDS plus 1, or 0 without enemy
+    - enemy_level: the level of the enemies
+    - health: the health of the hero and the enemies, rounded up (so units alive never have 0)
+
+    Actions are encoded as their index in ACTIONS, and attacks target the closest enemy in range. Every step
+    also returns the mask of the actions available in the info dict (under "action_mask").
+
+    Observations are built from the arrays of the board: the grid of kinds, and, with compact boards (the
+    default), the grid of rows of the unit table and its columns, so nothing is done per position. With
+    regular boards, the stats of the enemies are read from the enemies themselves, one by one."""
+    CHANNELS = ("hero", "exit", "enemy_kind", "enemy_level", "health")
+
+    # Rewards for winning and losing the game
+    WIN_REWARD = 1.0
+    LOSS_REWARD = -1.0
+
+    def __init__(self, hero_cls: type = Warrior, width: int = 10, height: int = 10, num_enemies: int = 10,
+                 min_level: int = 1, max_level: int = 3, max_steps: Optional[int] = None, compact: bool = True):
+        self.hero_cls = hero_cls
+        self.width = width
+        self.height = height
+        self.num_enemies = num_enemies
+        self.min_level = min_level
+        self.max_level = max_level
+        self.max_steps = max_steps
+        self.compact = compact
+        self.game: Optional[Game] = None
+        self.steps = 0
+
+        self._seed = np.random.SeedSequence()
+        # Codes of the enemy classes, for the boards without a unit table
+        self._kind_codes = {cls: code for code, cls in enumerate(UnitTable.KINDS, start=1)}
+        # Codes of the enemies in a unit table, indexed by its kind column
+        self._table_kind_codes = np.arange(1, len(UnitTable.KINDS) + 1, dtype=np.int32)
+        # The bit of every action in the masks of the game is its index in ACTIONS
+        self._action_bits = np.arange(len(ACTIONS))
+
+    @property
+    def observation_shape(self) -> Tuple[int, int, int]:
+        return len(self.CHANNELS), self.width, self.height
+
+    @property
+    def num_actions(self) -> int:
+        return len(ACTIONS)
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, dict]:
+        """Starts a new game, and returns its observation and info. With a seed, the game (and the ones
+        after it, until the next seed) are reproducible."""
+        if seed is not None:
+            self._seed = np.random.SeedSequence(seed)
+
+        game_seed, = self._seed.spawn(1)
+
+        with quiet():
+            self.game = Game(hero=self.hero_cls(name="Hero"), width=self.width, height=self.height,
+                             num_enemies=self.num_enemies, min_level=self.min_level, max_level=self.max_level,
+                             rng=np.random.default_rng(game_seed), compact=self.compact)
+
+        self.steps = 0
+
+        return self.observation(), self._info()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        """Performs an action, and returns the observation after it, the reward, whether the game has
+        finished (won or lost), whether it was cut short after max_steps steps, and the info. Actions that
+        aren't available don't change anything (info["success"] tells whether the action was performed), and
+        neither do the ones out of range, just like in VectorGame.step."""
+        if self.game is None:
+            raise RuntimeError("The environment needs to be reset before the first step")
+
+        game = self.game
+        previous_status = game.status
+        success = False
+
+        if 0 <= action < len(ACTIONS):
+            game_action = ACTIONS[action]
+            target = None
+
+            if game_action == GameActions.ATTACK:
+                targets = game.attack_targets()
+                target = targets[0] if targets else None
+
+            with quiet():
+                success = game.do(game_action, target)
+
+        self.steps += 1
+        reward = 0.0
+
+        if game.status != previous_status:
+            reward = self.WIN_REWARD if game.status == GameStatus.WON else self.LOSS_REWARD
+
+        terminated = game.status != GameStatus.PLAYING
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+
+        return self.observation(), reward, terminated, truncated, self._info(success=success)
+
+    def action_mask(self) -> np.ndarray:
+        """Returns a mask with the actions available, indexed like ACTIONS"""
+        return (self.game.available_actions_mask() >> self._action_bits) & 1 == 1
+
+    def observation(self) -> np.ndarray:
+        """Encodes the board of the game as a tensor of shape (channels, width, height)"""
+        board, hero = self.game.board, self.game.hero
+        kinds = board.kinds
+        observation = np.zeros(self.observation_shape, dtype=np.int32)
+        enemy_kind, enemy_level, health = observation[2], observation[3], observation[4]
+
+        np.equal(kinds, HERO, out=observation[0], casting="unsafe")
+        np.equal(kinds, EXIT, out=observation[1], casting="unsafe")
+
+        if board.units is not None:
+            enemies = board.unit_rows >= 0
+            rows = board.unit_rows[enemies]
+            table = board.units
+            enemy_kind[enemies] = self._table_kind_codes[table.kind[rows]]
+            enemy_level[enemies] = table.level[rows]
+            health[enemies] = np.ceil(table.health[rows])
+        else:
+            self._encode_enemies(board, enemy_kind, enemy_level, health)
+
+        if hero.position is not None:
+            health[hero.position] = np.ceil(max(hero.health, 0))
+
+        return observation
+
+    def _encode_enemies(self, board: Board, enemy_kind: np.ndarray, enemy_level: np.ndarray, health: np.ndarray):
+        for position in board.positions(CellKind.ENEMY):
+            enemy = board.get(position)
+            enemy_kind[position] = self._kind_codes[type(enemy)]
+            enemy_level[position] = enemy.level
+            health[position] = np.ceil(enemy.health)
+
+    def _info(self, **info) -> dict:
+        return dict(info, action_mask=self.action_mask(), status=self.game.status)
@@ -1,11 +1,14 @@
 from enum import Enum
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Set, Tuple
 
-from .logger import Logger
+import numpy as np
+
+from .logger import DEBUG, WARNING, Logger
 from .hero import Hero
 from .types import Position
 from .board import Board
 from .enemy import Enemy
+from .scheduler import EnemyScheduler
 
 
 class GameActions(Enum):
@@ -17,6 +20,19 @@ class GameActions(Enum):
     ATTACK = "Attack"
     EXIT = "Exit"
 
+# Every action has a bit in the masks of available actions (see Game.available_actions_mask), which is
+# given by its position in GameActions
+ACTION_BITS = {action: 1 << idx for idx, action in enumerate(GameActions)}
+_ACTIONS_BY_BIT = {bit: action for action, bit in ACTION_BITS.items()}
+_UP, _DOWN, _LEFT, _RIGHT, _ATTACK, _EXIT = (ACTION_BITS[action] for action in GameActions)
+# Direction (dx, dy) of the moves, by bit
+_MOVES = {_UP: (0, 1), _DOWN: (0, -1), _LEFT: (-1, 0), _RIGHT: (1, 0)}
+# The list of available actions for every mask, in the order in which they are listed
+_LIST_ORDER = (GameActions.MOVE_UP, GameActions.MOVE_DOWN, GameActions.MOVE_LEFT, GameActions.MOVE_RIGHT,
+               GameActions.EXIT, GameActions.ATTACK)
+_ACTIONS_BY_MASK = tuple(tuple(action for action in _LIST_ORDER if mask & ACTION_BITS[action])
+                         for mask in range(1 << len(GameActions)))
+
 class GameStatus(Enum):
     """Represents the game status"""
     PLAYING = "Playing"
@@ -24,16 +40,63 @@ class GameStatus(Enum):
     WON = "You Won!"
 
 
+class GameSnapshot(NamedTuple):
+    """A saved state of a game, which can be restored with Game.restore. Snapshots don't hold a copy of the
+    game, just the point of the journal of changes of the game where they were taken."""
+    serial: int
+    mark: int
+    status: GameStatus
+
+
+# Kinds of entries in the journal of changes of a game
+_CELL, _UNIT = 0, 1
+
+
 class Game(Logger):
     """This class puts together all the different pieces (the hero, board, enemies, etc), and implements
     all the logic required for these pieces to work together, such as determining what actions are available
-    for the hero at every moment or performing the actions and updating the board accordingly."""
-    def __init__(self, hero: Hero, width: int, height: int, num_enemies: int, min_level: int=1, max_level: int=3, board_cls: type = Board, **kwargs):
+    for the hero at every moment or performing the actions and updating the board accordingly.
+
+    By default, enemies only act when they retaliate against the hero's attacks. With enemy_phase=True,
+    after every action of the hero the enemies within activity_radius of the hero attack it or move
+    towards it (see EnemyScheduler).
+
+    With undo_limit, the game keeps the history of the last undo_limit actions (all of them if it's None),
+    which can be rolled back with Game.undo and performed again with Game.redo."""
+    def __init__(self, hero: Hero, width: int, height: int, num_enemies: int, min_level: int=1, max_level: int=3, board_cls: type = Board,
+                 rng: Optional[np.random.Generator] = None, compact: bool = False, enemy_phase: bool = False,
+                 activity_radius: int = 5, undo_limit: Optional[int] = 0, **kwargs):
         self.hero = hero
-        self.board = board_cls.create(hero=hero, width=width, height=height, num_enemies=num_enemies, min_level=min_level, max_level=max_level)
+        # All the randomness in the game comes from this generator, so games with the same seed are the same
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.board = board_cls.create(hero=hero, width=width, height=height, num_enemies=num_enemies, min_level=min_level, max_level=max_level, rng=self.rng, compact=compact)
         self.status = GameStatus.PLAYING
+        self.scheduler = EnemyScheduler(self.board, activity_radius=activity_radius) if enemy_phase else None
         super().__init__(name="game", *kwargs)
 
+        # The available actions are cached for the hero position they were computed for, and
+        # invalidated whenever the board changes close enough to the hero to affect them
+        self._available_actions: Optional[int] = None
+        self._available_actions_position: Optional[Position] = None
+        self.board.subscribe(self._on_board_change)
+
+        # Journal with the previous values of everything that changed since the oldest snapshot that is still
+        # alive, and the positions and units already saved since the last snapshot (see Game.snapshot).
+        # Marks are absolute, the journal only holds the entries from _journal_base on
+        self._snapshots: List[GameSnapshot] = []
+        self._journal: List[tuple] = []
+        self._journal_base = 0
+        self._saved_cells: Set[Position] = set()
+        self._saved_units: Set["Unit"] = set()
+        self._restoring = False
+        self._next_serial = 0
+
+        # Every action in the history has the snapshot taken right before it, and undone actions can be redone
+        self.undo_limit = undo_limit
+        self._history: List[Tuple[GameSnapshot, GameActions, Optional[Position]]] = []
+        self._redo: List[Tuple[GameActions, Optional[Position]]] = []
+        self._redoing = False
+
     def available_actions(self) -> List[GameActions]:
         """
         Calculates the available actions.
@@ -43,85 +106,296 @@ class Game(Logger):
 
         Note that if the game is in a status other than PLAYING, no action can be taken.
         """
+        return list(_ACTIONS_BY_MASK[self.available_actions_mask()])
+
+    def available_actions_mask(self) -> int:
+        """Returns the available actions (see Game.available_actions) as a bitmask, where the bit of every
+        action is given by ACTION_BITS. Agents that only need to check or pick actions can use the mask
+        (together with Game.do_masked) instead of the list, to avoid creating lists and comparing enums."""
         if self.status != GameStatus.PLAYING:
-            return []
+            return 0
+
+        if self._available_actions is None or self._available_actions_position != self.hero.position:
+            self._available_actions = self._compute_available_actions()
+            self._available_actions_position = self.hero.position
 
-        available_actions = []
+        return self._available_actions
+
+    def _compute_available_actions(self) -> int:
+        available_actions = 0
         current_pos = self.hero.position
         up    = Position(x=current_pos.x, y=current_pos.y+1)
         down  = Position(x=current_pos.x, y=current_pos.y-1)
         left  = Position(x=current_pos.x-1, y=current_pos.y)
         right = Position(x=current_pos.x+1, y=current_pos.y)
-        if hasattr(self.hero, 'attack_range'):
-            dist = self.hero.attack_range
-        else:
-            dist = 1
-
-        can_attack = self.board.has_enemies_in_range(self.hero.position, dist)
+        can_attack = self.board.has_enemies_in_range(self.hero.position, self._hero_attack_range)
 
         if self.board.is_valid(up) and self.board.is_empty(up):
-            available_actions.append(GameActions.MOVE_UP)
+            available_actions |= _UP
 
         if self.board.is_valid(down) and self.board.is_empty(down):
-            available_actions.append(GameActions.MOVE_DOWN)
+            available_actions |= _DOWN
 
         if self.board.is_valid(left) and self.board.is_empty(left):
-            available_actions.append(GameActions.MOVE_LEFT)
+            available_actions |= _LEFT
 
         if self.board.is_valid(right) and self.board.is_empty(right):
-            available_actions.append(GameActions.MOVE_RIGHT)
+            available_actions |= _RIGHT
 
         exit_position = Position(x=self.board.width - 1, y=self.board.height - 1)
 
         if self.hero.position.distance(exit_position) <= self.hero.speed:
-            available_actions.append(GameActions.EXIT)
+            available_actions |= _EXIT
 
         if can_attack:
-            available_actions.append(GameActions.ATTACK)
+            available_actions |= _ATTACK
 
         return available_actions
 
+    def attack_targets(self) -> List[Position]:
+        """Returns the positions of the enemies within the attack range of the hero, sorted from the
+        closest to the furthest. Any of them can be used as the target of the attack action."""
+        if self.status != GameStatus.PLAYING:
+            return []
+
+        return self.board.enemies_in_range(self.hero.position, self._hero_attack_range)
+
+    def _on_board_change(self, position: Position, previous: Optional["GameElement"], element: Optional["GameElement"]):
+        """Invalidates the available actions when a change in the board can affect them, i.e. when it
+        happens within the attack range of the hero (or next to it, for the movement actions)."""
+        if self._available_actions is None:
+            return
+
+        hero_x, hero_y = self._available_actions_position
+
+        if abs(position[0] - hero_x) + abs(position[1] - hero_y) <= max(self._hero_attack_range, 1):
+            self._available_actions = None
+
+    @property
+    def _hero_attack_range(self) -> int:
+        if hasattr(self.hero, 'attack_range'):
+            return self.hero.attack_range
+        else:
+            return 1
+
+    def snapshot(self) -> GameSnapshot:
+        """Saves the current state of the game, so it can be restored later on with Game.restore, e.g. to try
+        different actions from the same state. Taking a snapshot doesn't copy anything: from then on, the
+        game keeps a journal with the previous value of every position of the board and of the health and
+        armor of every unit, the first time they change after the snapshot (copy on write). Restoring the
+        snapshot undoes the journal, so both operations are O(changes) instead of O(board size).
+
+        Snapshots can be nested: restoring a snapshot discards the ones taken after it, but the snapshot
+        itself can be restored as many times as needed. Use Game.discard when a snapshot isn't needed any
+        more, since the game keeps journaling changes while there is any snapshot alive."""
+        if not self._snapshots:
+            self.board.subscribe(self._record_change)
+
+        snapshot = GameSnapshot(serial=self._next_serial, mark=self._journal_base + len(self._journal), status=self.status)
+        self._next_serial += 1
+        self._snapshots.append(snapshot)
+        self._saved_cells = set()
+        self._saved_units = set()
+
+        return snapshot
+
+    def restore(self, snapshot: GameSnapshot):
+        """Restores the state of the game when the snapshot was taken. The actions performed since then
+        can't be undone or redone any more."""
+        self._rollback(snapshot)
+        self._history = [entry for entry in self._history if entry[0].serial <= snapshot.serial]
+        self._redo.clear()
+
+    def discard(self, snapshot: GameSnapshot):
+        """Forgets a snapshot (and the ones taken after it), which can't be restored any more. The changes
+        made since then are kept, but the actions performed since then can't be undone any more. When no
+        snapshots are left, the game stops journaling changes."""
+        index = self._snapshot_index(snapshot)
+        del self._snapshots[index:]
+        self._history = [entry for entry in self._history if entry[0].serial < snapshot.serial]
+
+        if not self._snapshots:
+            self._stop_journaling()
+
+    def undo(self, steps: int = 1) -> int:
+        """Rolls back the last actions performed, and returns how many were undone, which can be less
+        than steps when the history doesn't have that many (see undo_limit)"""
+        undone = 0
+
+        while undone < steps and self._history:
+            snapshot, action, target = self._history.pop()
+            self._rollback(snapshot)
+            self._forget(snapshot)
+            self._redo.append((action, target))
+            undone += 1
+
+        return undone
+
+    def redo(self, steps: int = 1) -> int:
+        """Performs again the last actions undone, and returns how many were redone. Performing any other
+        action drops the actions that could be redone."""
+        redone = 0
+        self._redoing = True
+
+        try:
+            while redone < steps and self._redo:
+                self.do(*self._redo.pop())
+                redone += 1
+        finally:
+            self._redoing = False
+
+        return redone
+
+    def _rollback(self, snapshot: GameSnapshot):
+        """Undoes the journal up to the snapshot, discarding the snapshots taken after it"""
+        index = self._snapshot_index(snapshot)
+        del self._snapshots[index + 1:]
+        self._restoring = True
+
+        try:
+            while self._journal_base + len(self._journal) > snapshot.mark:
+                entry = self._journal.pop()
+
+                if entry[0] == _CELL:
+                    self.board.put(entry[1], entry[2])
+                else:
+                    _, unit, health, armor = entry
+                    unit.health = health
+                    if armor is not None:
+                        unit.armor = armor
+        finally:
+            self._restoring = False
+
+        self.status = snapshot.status
+        self._saved_cells = set()
+        self._saved_units = set()
+        self.log("Restored snapshot %s", snapshot.serial, level=DEBUG)
+
+    def _forget(self, snapshot: GameSnapshot):
+        """Forgets a single snapshot, keeping the ones taken after it. When it was the oldest one, the
+        beginning of the journal isn't needed any more."""
+        index = self._snapshot_index(snapshot)
+        del self._snapshots[index]
+
+        if not self._snapshots:
+            self._stop_journaling()
+        elif index == 0:
+            mark = self._snapshots[0].mark
+            del self._journal[:mark - self._journal_base]
+            self._journal_base = mark
+
+    def _stop_journaling(self):
+        self._journal_base += len(self._journal)
+        self._journal.clear()
+        self.board.unsubscribe(self._record_change)
+
+    def _record_action(self, snapshot: GameSnapshot, action: GameActions, target: Optional[Position]):
+        """Adds an action that has been performed to the history, together with the snapshot taken right
+        before it, forgetting the oldest one if needed"""
+        self._history.append((snapshot, action, target))
+
+        if not self._redoing:
+            self._redo.clear()
+
+        if self.undo_limit is not None and len(self._history) > self.undo_limit:
+            self._forget(self._history.pop(0)[0])
+
+    def _snapshot_index(self, snapshot: GameSnapshot) -> int:
+        for index, alive in enumerate(self._snapshots):
+            if alive.serial == snapshot.serial:
+                return index
+
+        raise ValueError(f"Snapshot {snapshot.serial} has been discarded, it can't be used any more")
+
+    def _record_change(self, position: Position, previous: Optional["GameElement"], element: Optional["GameElement"]):
+        """Saves the previous element of a position the first time it changes after the last snapshot"""
+        if not self._restoring and position not in self._saved_cells:
+            self._saved_cells.add(position)
+            self._journal.append((_CELL, position, previous))
+
+    def _save_unit(self, unit: "Unit"):
+        """Saves the health and armor of a unit the first time it might change after the last snapshot.
+        Positions don't need to be saved, since they are restored with the positions of the board."""
+        if unit not in self._saved_units:
+            self._saved_units.add(unit)
+            self._journal.append((_UNIT, unit, unit.health, getattr(unit, "armor", None)))
+
+    def do_masked(self, bit: int, target: Optional[Position] = None) -> bool:
+        """Performs the action with the given bit (see ACTION_BITS), e.g. one of the bits of the mask
+        returned by Game.available_actions_mask. This is the same as Game.do, for agents that use masks,
+        without going through the GameActions enum at all."""
+        if bit not in _ACTIONS_BY_BIT:
+            raise ValueError(f"{bit} isn't the bit of any action")
+
+        return self._do(bit, target)
+
     def do(self, action: GameActions, target: Optional[Position]=None) -> bool:
         """Performs an action. This method has two main parts:
         - Check that the requested action can be taken, meaning that it is an available action,
           and that any extra parameters (e.g. the target of the attack) are also provided
         - If the action is valid, perform it and update the different game elements (e.g. remove
           units that have been destroyed, update positions in the board, etc)"""
-        if self.status != GameStatus.PLAYING:
-            self.log("The game has already finished, you can't keep playing!")
+        return self._do(ACTION_BITS[action], target)
+
+    def _do(self, bit: int, target: Optional[Position]) -> bool:
+        """Performs the action with the given bit. Actions are identified by their bits all the way
+        through, and the GameActions enum is only looked up for the log messages and the history."""
+        if self.status is not GameStatus.PLAYING:
+            self.log("The game has already finished, you can't keep playing!", level=WARNING)
             return False
-        elif action not in self.available_actions():
-            self.log(f"Action {action.value} is not available right now")
+        elif not self.available_actions_mask() & bit:
+            self.log("Action %s is not available right now", _ACTIONS_BY_BIT[bit].value, level=WARNING)
             return False
-        elif GameActions.ATTACK == action and target is None:
-            self.log(f"Action {action.value} requires a target position!")
+        elif bit == _ATTACK and target is None:
+            self.log("Action %s requires a target position!", GameActions.ATTACK.value, level=WARNING)
             return False
-        elif GameActions.ATTACK == action and not self.board.is_enemy(target):
-            self.log(f"Action {action.value} requires an enemy in the target position!")
+        elif bit == _ATTACK and not self.board.is_enemy(target):
+            self.log("Action %s requires an enemy in the target position!", GameActions.ATTACK.value, level=WARNING)
             return False
-        elif GameActions.EXIT == action:
+
+        # Failed moves don't change anything, so the action is only added to the history once it succeeds
+        before = self.snapshot() if self.undo_limit != 0 else None
+
+        if bit == _EXIT:
             self.log("You won!")
             self.status = GameStatus.WON
+            if before is not None:
+                self._record_action(before, GameActions.EXIT, target)
             return True
 
-        current_pos = self.hero.position
+        if self._snapshots:
+            # The hero can take damage or heal, and so can the target of an attack
+            self._save_unit(self.hero)
+            if bit == _ATTACK:
+                self._save_unit(self.board.get(target))
 
-        if GameActions.ATTACK == action:
+        if bit == _ATTACK:
             result = self._attack(target)
-            if not self.hero.is_alive:
-                self.status = GameStatus.GAME_OVER
-                self.log("You died, game over!")
-            return result
-        elif GameActions.MOVE_UP == action:
-            new_pos = Position(x=current_pos.x, y=current_pos.y+1)
-        elif GameActions.MOVE_DOWN == action:
-            new_pos = Position(x=current_pos.x, y=current_pos.y-1)
-        elif GameActions.MOVE_LEFT == action:
-            new_pos = Position(x=current_pos.x-1, y=current_pos.y)
         else:
-            new_pos = Position(x=current_pos.x+1, y=current_pos.y)
+            current_pos = self.hero.position
+            dx, dy = _MOVES[bit]
+            result = self.board.move(unit=self.hero, destination=Position(current_pos.x + dx, current_pos.y + dy))
+
+            # Moves that fail don't take a turn, so the enemies don't act either (and there is nothing to undo)
+            if not result:
+                if before is not None:
+                    self._forget(before)
+                return result
+
+        if before is not None:
+            self._record_action(before, _ACTIONS_BY_BIT[bit], target)
+
+        if bit != _ATTACK and self.scheduler is None:
+            return result
+
+        if self.hero.is_alive and self.scheduler is not None:
+            self.scheduler.run(self.hero)
+
+        if not self.hero.is_alive:
+            self.status = GameStatus.GAME_OVER
+            self.log("You died, game over!")
 
-        return self.board.move(unit=self.hero, destination=new_pos)
+        return result
 
     def _attack(self, position: Position) -> bool:
         enemy = self.board.get(position)
@@ -132,6 +406,6 @@ class Game(Logger):
             self.board.clear(position)
             return self.board.move(unit=self.hero, destination=position)
         else:
-            self.log(f"Enemy {enemy.name} is retaliating against the hero!")
+            self.log("Enemy %s is retaliating against the hero!", enemy.name, level=DEBUG)
             enemy.attack(self.hero)
             return True
@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
-from .logger import Logger
+from .slots import UnitSlots
 from .types import Position
 
 
-class GameElement(ABC, Logger):
+class GameElement(ABC, UnitSlots):
     """A game element is the base class for any object that can be placed on the board.
     Game elements can have a positions, and can be represented with a short text"""
+    __slots__ = ()
+
     def __init__(self, position: Optional[Position] = None, **kwargs):
         super().__init__(**kwargs)
         self.position = position
@@ -19,6 +21,8 @@ class GameElement(ABC, Logger):
 
 class Wall(GameElement):
     """Walls are just static elements that can be placed in the board"""
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(name="Wall", **kwargs)
 
@@ -29,6 +33,8 @@ class Wall(GameElement):
 class ExitPortal(GameElement):
     """The exit portal is where the heroes need to get to win the game,
     it's the exit from the dungeon."""
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         super().__init__(name="Exit portal", **kwargs)
 
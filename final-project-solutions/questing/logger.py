@@ -1,14 +1,127 @@
-from typing import Optional
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+import logging
+from typing import Callable, List, Optional, Union
+
+# Log levels, which are the same ones used by the standard logging module
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+
+
+class Sink(ABC):
+    """A sink is where log messages end up. Sinks receive the name of the entity logging
+    the message, the level of the message and the (already formatted) message."""
+    @abstractmethod
+    def emit(self, name: str, level: int, message: str): # pragma: no cover
+        pass
+
+    def flush(self):
+        """Writes any buffered messages. By default sinks don't buffer anything."""
+        pass
+
+
+class StdoutSink(Sink):
+    """Prints the messages to the standard output. This is the default sink."""
+    def emit(self, name: str, level: int, message: str):
+        print(f"[{name}] {message}")
+
+
+class MemorySink(Sink):
+    """Keeps the last 'capacity' messages in memory (a ring buffer), so they can be
+    inspected later on, e.g. when a simulation fails."""
+    def __init__(self, capacity: int = 1000):
+        self.messages = deque(maxlen=capacity)
+
+    def emit(self, name: str, level: int, message: str):
+        self.messages.append(f"[{name}] {message}")
+
+
+class FileSink(Sink):
+    """Appends the messages to a file. Writes are buffered, so messages might not be in
+    the file until the sink is flushed or closed."""
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        self._file = open(path, "a", buffering=buffer_size)
+
+    def emit(self, name: str, level: int, message: str):
+        self._file.write(f"[{name}] {message}\n")
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class LoggingSink(Sink):
+    """Bridge to the standard logging module. Every entity logs to a child of the
+    base logger, e.g. 'questing.board' for the board."""
+    def __init__(self, base_name: str = "questing"):
+        self.base_name = base_name
+
+    def emit(self, name: str, level: int, message: str):
+        logging.getLogger(f"{self.base_name}.{name}").log(level, message)
 
 
 class Logger:
     """This class centralises all log messages, and allows to easily change where these messages
-    go to. The simplest implementation will just print the messages to the standard output."""
+    go to. The simplest implementation will just print the messages to the standard output.
+
+    The configuration (whether logging is enabled, the minimum level and the sinks) is shared by
+    all the loggers, and can be changed with Logger.configure. Messages can be built lazily, either
+    by passing %-style arguments or a callable that returns the message, so that disabled or
+    filtered out messages don't pay for the formatting."""
+    __slots__ = ("name",)
+
+    enabled: bool = True
+    min_level: int = DEBUG
+    sinks: List[Sink] = [StdoutSink()]
+
     def __init__(self, name: Optional[str] = None, **kwargs):
         super().__init__(**kwargs)
 
         self.name = name or self.__class__.__name__
 
-    def log(self, message: str):
+    def log(self, message: Union[str, Callable[[], str]], *args, level: int = INFO):
         """Logs a message, formatting it with the name of the entity"""
-        print(f"[{self.name}] {message}")
+        if not Logger.enabled or level < Logger.min_level:
+            return
+
+        if callable(message):
+            message = message()
+        elif args:
+            message = message % args
+
+        for sink in Logger.sinks:
+            sink.emit(self.name, level, message)
+
+    @staticmethod
+    def configure(enabled: Optional[bool] = None, min_level: Optional[int] = None, sinks: Optional[List[Sink]] = None):
+        """Changes the logging configuration for all the loggers. Only the values provided are changed."""
+        if enabled is not None:
+            Logger.enabled = enabled
+        if min_level is not None:
+            Logger.min_level = min_level
+        if sinks is not None:
+            Logger.flush()
+            Logger.sinks = list(sinks)
+
+    @staticmethod
+    def flush():
+        """Flushes all the configured sinks"""
+        for sink in Logger.sinks:
+            sink.flush()
+
+
+@contextmanager
+def quiet():
+    """Context manager that disables logging within its block, restoring the previous
+    configuration afterwards. Useful for simulations, where nobody reads the messages."""
+    enabled = Logger.enabled
+    Logger.configure(enabled=False)
+
+    try:
+        yield
+    finally:
+        Logger.configure(enabled=enabled)
@@ -0,0 +1,237 @@
+from concurrent.futures import ProcessPoolExecutor
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .game import Game, GameActions, GameStatus
+from .logger import DEBUG, Logger, quiet
+from .sim import Policy, greedy_policy
+from .types import Position
+
+# An action of the hero together with its target (None for everything but attacks)
+Decision = Tuple[GameActions, Optional[Position]]
+
+
+class _Node:
+    """A node of the search tree, i.e. the state reached by taking the decisions from the root to it"""
+    __slots__ = ("parent", "decision", "children", "untried", "visits", "value")
+
+    def __init__(self, parent: Optional["_Node"], decision: Optional[Decision], untried: List[Decision]):
+        self.parent = parent
+        self.decision = decision
+        self.children: List["_Node"] = []
+        self.untried = untried
+        self.visits = 0
+        self.value = 0.0
+
+    def select(self, exploration: float) -> "_Node":
+        """Picks the child with the highest upper confidence bound (UCB1)"""
+        log_visits = math.log(self.visits)
+
+        return max(self.children, key=lambda child: child.value / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+
+class MCTSAgent(Logger):
+    """Chooses the actions of the hero with Monte Carlo Tree Search. Every iteration of the search walks
+    down the tree of decisions taken so far (picking the most promising ones with UCB1), tries a new
+    decision, and then plays the game with the rollout policy for up to rollout_depth steps to estimate
+    how good the result is. Rewards are discounted by the number of steps taken to get them, so quicker
+    wins are preferred. The decision taken is the one explored the most.
+
+    The search is bounded by a number of rollouts, a time budget in milliseconds, or both (whichever runs
+    out first). Decisions are played on the game itself, which is brought back to the state it was in
+    with a snapshot after every iteration, so the search doesn't copy any game (see Game.snapshot).
+
+    With workers greater than 1, the game is sent to a pool of processes that search independently
+    (root parallelisation) with their share of the rollouts, and the statistics of their roots are merged.
+    Agents can be used as policies (see questing.sim), so they can play whole games."""
+    def __init__(self, rollouts: Optional[int] = 200, time_budget_ms: Optional[float] = None, rollout_depth: int = 50,
+                 discount: float = 0.95, exploration: float = math.sqrt(2), rollout_policy: Policy = greedy_policy, workers: int = 1,
+                 rng: Optional[np.random.Generator] = None, **kwargs):
+        if rollouts is None and time_budget_ms is None:
+            raise ValueError("The search needs a budget, either of rollouts or of time")
+
+        super().__init__(name="mcts", **kwargs)
+        self.rollouts = rollouts
+        self.time_budget_ms = time_budget_ms
+        self.rollout_depth = rollout_depth
+        self.discount = discount
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy
+        self.workers = workers
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # Number of rollouts played to choose the last decision
+        self.last_rollouts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __call__(self, game: Game, rng: np.random.Generator) -> Optional[Decision]:
+        return self.choose(game, rng=rng)
+
+    def choose(self, game: Game, rng: Optional[np.random.Generator] = None) -> Optional[Decision]:
+        """Returns the decision (action and target) to take next, or None if the hero can't do anything.
+        The game is left in the same state, but actions undone before can't be redone afterwards."""
+        rng = rng if rng is not None else self.rng
+        decisions = self._decisions(game)
+        self.last_rollouts = 0
+
+        if len(decisions) <= 1:
+            return decisions[0] if decisions else None
+
+        if self.workers > 1:
+            stats = self._search_in_parallel(game, rng)
+        else:
+            deadline = None if self.time_budget_ms is None else time.perf_counter() + self.time_budget_ms / 1000
+            stats = self._search(game, self.rollouts, deadline, rng)
+
+        self.last_rollouts = sum(visits for visits, _ in stats.values())
+        decision = max(stats, key=lambda d: stats[d][0])
+        self.log(lambda: f"Chose {decision[0].value} after {self.last_rollouts} rollouts", level=DEBUG)
+
+        return decision
+
+    def close(self):
+        """Shuts down the pool of processes, if any"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "MCTSAgent":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self) -> tuple:
+        # The pool of processes stays in the process that created it. The name lives in a slot of Logger.
+        return dict(self.__dict__, _executor=None), {"name": self.name}
+
+    def _search(self, game: Game, rollouts: Optional[int], deadline: Optional[float],
+                rng: np.random.Generator) -> Dict[Decision, Tuple[int, float]]:
+        """Runs the search from the current state of the game, and returns the visits and total reward
+        of every decision at the root"""
+        root = _Node(None, None, self._shuffled_decisions(game, rng))
+        # The decisions tried aren't kept in the history of the game, so they don't push older actions out
+        undo_limit, game.undo_limit = game.undo_limit, 0
+        snapshot = game.snapshot()
+        done = 0
+
+        try:
+            with quiet():
+                while (rollouts is None or done < rollouts) and (deadline is None or time.perf_counter() < deadline):
+                    node = root
+                    steps = 0
+
+                    while not node.untried and node.children:
+                        node = node.select(self.exploration)
+                        game.do(*node.decision)
+                        steps += 1
+
+                    if node.untried:
+                        decision = node.untried.pop()
+                        game.do(*decision)
+                        steps += 1
+                        child = _Node(node, decision, self._shuffled_decisions(game, rng))
+                        node.children.append(child)
+                        node = child
+
+                    reward = self._rollout(game, rng, steps)
+
+                    while node is not None:
+                        node.visits += 1
+                        node.value += reward
+                        node = node.parent
+
+                    game.restore(snapshot)
+                    done += 1
+        finally:
+            game.discard(snapshot)
+            game.undo_limit = undo_limit
+
+        return {child.decision: (child.visits, child.value) for child in root.children}
+
+    def _search_in_parallel(self, game: Game, rng: np.random.Generator) -> Dict[Decision, Tuple[int, float]]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        if self.rollouts is None:
+            shares = [None] * self.workers
+        else:
+            shares = [self.rollouts // self.workers + (idx < self.rollouts % self.workers) for idx in range(self.workers)]
+
+        seeds = np.random.SeedSequence(int(rng.integers(2 ** 63))).spawn(self.workers)
+        futures = [self._executor.submit(_search_worker, self, game, share, seed) for share, seed in zip(shares, seeds)]
+        stats: Dict[Decision, Tuple[int, float]] = {}
+
+        for future in futures:
+            for decision, (visits, value) in future.result().items():
+                total_visits, total_value = stats.get(decision, (0, 0.0))
+                stats[decision] = (total_visits + visits, total_value + value)
+
+        return stats
+
+    def _rollout(self, game: Game, rng: np.random.Generator, steps: int) -> float:
+        """Plays the game with the rollout policy, and returns how good the outcome is, discounted by the
+        number of steps taken since the root (including the given ones, taken down the tree)"""
+        for _ in range(self.rollout_depth):
+            if game.status != GameStatus.PLAYING:
+                break
+
+            decision = self.rollout_policy(game, rng)
+
+            if decision is None:
+                break
+
+            game.do(*decision)
+            steps += 1
+
+        return self._evaluate(game) * self.discount ** steps
+
+    @staticmethod
+    def _evaluate(game: Game) -> float:
+        """Rewards winning with 1 and dying with 0. Games that are still being played get up to 0.5,
+        depending on how many steps the hero is from the exit, walking around walls and enemies. If the
+        exit can't be reached at the moment, the straight (Manhattan) distance is used instead."""
+        if game.status == GameStatus.WON:
+            return 1.0
+        elif game.status == GameStatus.GAME_OVER:
+            return 0.0
+
+        board, position = game.board, game.hero.position
+        distance = board.distance_to_exit(position)
+
+        if distance is None:
+            distance = (board.width - 1 - position.x) + (board.height - 1 - position.y)
+
+        # Detours can be longer than crossing the board, so the reward decreases without reaching 0
+        longest = board.width + board.height - 2
+        return 0.5 * longest / (longest + distance) if longest else 0.5
+
+    @staticmethod
+    def _decisions(game: Game) -> List[Decision]:
+        """Every action available, with every possible target for the attacks"""
+        decisions = []
+
+        for action in game.available_actions():
+            if action == GameActions.ATTACK:
+                decisions.extend((action, target) for target in game.attack_targets())
+            else:
+                decisions.append((action, None))
+
+        return decisions
+
+    def _shuffled_decisions(self, game: Game, rng: np.random.Generator) -> List[Decision]:
+        decisions = self._decisions(game)
+        rng.shuffle(decisions)
+
+        return decisions
+
+
+def _search_worker(agent: MCTSAgent, game: Game, rollouts: Optional[int],
+                   seed: np.random.SeedSequence) -> Dict[Decision, Tuple[int, float]]:
+    """Searches on a copy of the game in a process of the pool. The time budget starts counting here."""
+    deadline = None if agent.time_budget_ms is None else time.perf_counter() + agent.time_budget_ms / 1000
+
+    return agent._search(game, rollouts, deadline, np.random.default_rng(seed))
@@ -0,0 +1,295 @@
+from collections import OrderedDict
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .logger import DEBUG, Logger
+from .types import CellKind, Position
+
+EMPTY = int(CellKind.EMPTY)
+
+# Directions of the moves, as (dx, dy)
+UP, RIGHT, DOWN, LEFT = (0, 1), (1, 0), (0, -1), (-1, 0)
+
+
+class Pathfinder(Logger):
+    """Finds shortest paths between positions of a board, moving up, down, left or right through empty
+    positions (the start and the goal themselves can be occupied, e.g. by the unit moving and its target).
+
+    Two algorithms are available: A*, with the Manhattan distance as heuristic, and Jump Point Search,
+    which finds the same path lengths but skips over the open areas of the board in straight jumps, so it
+    shines on large, open maps. Paths are kept in an LRU cache, and the pathfinder listens to the changes
+    of the board to drop the cached paths that a change can affect: paths going through a position that
+    gets blocked, and paths that could get shorter through a position that gets freed."""
+    METHODS = ("astar", "jps")
+
+    def __init__(self, board: "Board", cache_size: int = 256, **kwargs):
+        super().__init__(name="pathfinder", **kwargs)
+        self.board = board
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+        self._kinds = board.kinds
+        # Cached paths (None when there is no path) by (start, goal, method, max_length)
+        self._cache: "OrderedDict[Tuple, Optional[List[Position]]]" = OrderedDict()
+        board.subscribe(self._on_board_change)
+
+    def find_path(self, start: Position, goal: Position, method: str = "astar",
+                  max_length: Optional[int] = None) -> Optional[List[Position]]:
+        """Returns the positions (excluding the start, including the goal) of a shortest path from start to
+        goal, or None if there is no path, or no path with at most max_length steps (or if the start or the
+        goal aren't positions of the board)."""
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown pathfinding method {method}, it should be one of {self.METHODS}")
+
+        key = (Position(*start), Position(*goal), method, max_length)
+
+        if not self.board.is_valid(key[0]) or not self.board.is_valid(key[1]):
+            return None
+
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            path = self._cache[key]
+
+            return None if path is None else list(path)
+
+        self.misses += 1
+        search = self.astar if method == "astar" else self.jps
+        path = search(key[0], key[1], max_length=max_length)
+        self._cache[key] = path
+
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return None if path is None else list(path)
+
+    def clear_cache(self):
+        """Drops all the cached paths"""
+        self._cache.clear()
+
+    def astar(self, start: Position, goal: Position, max_length: Optional[int] = None) -> Optional[List[Position]]:
+        """A* search with the Manhattan distance as heuristic. Ties are broken in favour of the positions
+        closer to the goal, so on open maps the search goes straight to it. The result is not cached."""
+        width, height = self.board.width, self.board.height
+        kinds = self._kinds
+        start_cell, goal_cell = start.x * height + start.y, goal.x * height + goal.y
+        limit = max_length if max_length is not None else width * height
+
+        costs: Dict[int, int] = {start_cell: 0}
+        parents: Dict[int, int] = {}
+        heap = [(start.distance(goal), start.distance(goal), start_cell)]
+
+        while heap:
+            _, _, cell = heapq.heappop(heap)
+
+            if cell == goal_cell:
+                return self._cells_to_path(parents, goal_cell)
+
+            cost = costs[cell] + 1
+            x, y = divmod(cell, height)
+
+            for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+
+                neighbour = nx * height + ny
+
+                if neighbour != goal_cell and kinds.item(neighbour) != EMPTY:
+                    continue
+                if cost >= costs.get(neighbour, limit + 1):
+                    continue
+
+                remaining = abs(goal.x - nx) + abs(goal.y - ny)
+
+                if cost + remaining > limit:
+                    continue
+
+                costs[neighbour] = cost
+                parents[neighbour] = cell
+                heapq.heappush(heap, (cost + remaining, remaining, neighbour))
+
+        return None
+
+    def jps(self, start: Position, goal: Position, max_length: Optional[int] = None) -> Optional[List[Position]]:
+        """Jump Point Search for grids without diagonal moves. Instead of adding every neighbour to the open
+        list, the search jumps in straight lines and only stops at the positions where the shortest paths
+        may turn: the goal, positions with a forced neighbour (one that only becomes reachable there,
+        because of an obstacle behind it), and, when moving vertically, positions from which a horizontal
+        jump finds one of those. The result is not cached."""
+        search = _JumpPointSearch(self._kinds, start, goal)
+        limit = max_length if max_length is not None else self.board.width * self.board.height
+
+        costs: Dict[Position, int] = {start: 0}
+        parents: Dict[Position, Position] = {}
+        heap = [(start.distance(goal), start.distance(goal), start, None)]
+
+        while heap:
+            _, _, position, direction = heapq.heappop(heap)
+
+            if position == goal:
+                return self._jump_points_to_path(parents, goal)
+
+            for dx, dy in search.directions(position, direction):
+                jump_point = search.jump(position.x + dx, position.y + dy, dx, dy)
+
+                if jump_point is None:
+                    continue
+
+                cost = costs[position] + position.distance(jump_point)
+                remaining = jump_point.distance(goal)
+
+                if cost + remaining > limit or cost >= costs.get(jump_point, limit + 1):
+                    continue
+
+                costs[jump_point] = cost
+                parents[jump_point] = position
+                heapq.heappush(heap, (cost + remaining, remaining, jump_point, (dx, dy)))
+
+        return None
+
+    def _cells_to_path(self, parents: Dict[int, int], cell: int) -> List[Position]:
+        path = []
+
+        while cell in parents:
+            path.append(Position(*divmod(cell, self.board.height)))
+            cell = parents[cell]
+
+        return path[::-1]
+
+    @staticmethod
+    def _jump_points_to_path(parents: Dict[Position, Position], position: Position) -> List[Position]:
+        """Fills in the straight lines between the jump points"""
+        path = []
+
+        while position in parents:
+            parent = parents[position]
+            dx = (position.x > parent.x) - (position.x < parent.x)
+            dy = (position.y > parent.y) - (position.y < parent.y)
+
+            for step in range(position.distance(parent), 0, -1):
+                path.append(Position(parent.x + dx * step, parent.y + dy * step))
+
+            position = parent
+
+        return path[::-1]
+
+    def _on_board_change(self, position: Position, previous: Optional["GameElement"], element: Optional["GameElement"]):
+        """Drops the cached paths affected by a change in the board. When a position is blocked, only the
+        paths going through it are affected. When it's freed, a path of length L from s to g can only get
+        shorter if d(s, position) + d(position, g) < L (paths through positions with an equal detour are
+        as long as the cached one, which stays a shortest path), and missing paths can only appear within
+        max_length."""
+        if (previous is None) == (element is None) or not self._cache:
+            return
+
+        position = Position(*position)
+        blocked = element is not None
+        stale = []
+
+        for key, path in self._cache.items():
+            start, goal, _, max_length = key
+
+            if blocked:
+                if path is not None and position in path[:-1]:
+                    stale.append(key)
+                continue
+
+            # Only the positions within this ellipse can be part of a path shorter than the current one
+            detour = start.distance(position) + position.distance(goal)
+
+            if path is not None:
+                if detour < len(path):
+                    stale.append(key)
+            elif max_length is None or detour <= max_length:
+                stale.append(key)
+
+        for key in stale:
+            del self._cache[key]
+
+        if stale:
+            self.log("Dropped %s cached paths after a change at %s", len(stale), position, level=DEBUG)
+
+
+class _JumpPointSearch:
+    """Jumps of the Jump Point Search, on a padded grid of walkable positions (the start and goal included)"""
+    def __init__(self, kinds: np.ndarray, start: Position, goal: Position):
+        width, height = kinds.shape
+        # Padding the grid with blocked positions avoids checking the boundaries
+        self.walkable = np.zeros((width + 2, height + 2), dtype=bool)
+        self.walkable[1:-1, 1:-1] = kinds == EMPTY
+        self.walkable[start.x + 1, start.y + 1] = True
+        self.walkable[goal.x + 1, goal.y + 1] = True
+        self.goal = goal
+
+    @staticmethod
+    def directions(position: Position, direction: Optional[Tuple[int, int]]) -> Tuple[Tuple[int, int], ...]:
+        """Directions to jump to from a jump point, depending on the direction the search arrived from.
+        Going back is never useful, so only going straight on and turning are considered."""
+        if direction is None:
+            return UP, RIGHT, DOWN, LEFT
+        elif direction[0]:
+            return direction, UP, DOWN
+
+        return direction, RIGHT, LEFT
+
+    def jump(self, x: int, y: int, dx: int, dy: int) -> Optional[Position]:
+        """Moves from (x, y) in the given direction until reaching a jump point, which is returned, or an
+        obstacle, in which case there is no jump point in this direction."""
+        if dx:
+            jump_x = self._jump_horizontally(x, y, dx)
+            return None if jump_x is None else Position(jump_x, y)
+
+        walkable, goal = self.walkable, self.goal
+
+        while walkable[x + 1, y + 1]:
+            if x == goal.x and y == goal.y:
+                return Position(x, y)
+
+            # Forced neighbours: left or right are open, but they weren't in the previous position
+            if (walkable[x, y + 1] and not walkable[x, y + 1 - dy]) \
+                    or (walkable[x + 2, y + 1] and not walkable[x + 2, y + 1 - dy]):
+                return Position(x, y)
+
+            if self._jump_horizontally(x + 1, y, 1) is not None or self._jump_horizontally(x - 1, y, -1) is not None:
+                return Position(x, y)
+
+            y += dy
+
+        return None
+
+    def _jump_horizontally(self, x: int, y: int, dx: int) -> Optional[int]:
+        """Horizontal jumps, which don't need to look for other jumps on the way, so the whole row is
+        checked at once with NumPy. Returns the x of the jump point, if any."""
+        walkable = self.walkable
+        row = y + 1
+        column = x + 1
+
+        # Walkable positions of the row from (x, y) in the direction of the jump, up to the first obstacle
+        line = walkable[column::dx, row]
+        blocked = np.flatnonzero(~line)
+        length = blocked[0] if len(blocked) else len(line)
+
+        if not length:
+            return None
+
+        columns = column + dx * np.arange(length)
+
+        if self.goal.y == y and 0 <= (self.goal.x - x) * dx < length:
+            goal_step = (self.goal.x - x) * dx
+        else:
+            goal_step = length
+
+        # Forced neighbours: up or down are open, but they weren't in the previous position
+        forced = (walkable[columns, row + 1] & ~walkable[columns - dx, row + 1]) \
+            | (walkable[columns, row - 1] & ~walkable[columns - dx, row - 1])
+        forced = np.flatnonzero(forced[:goal_step])
+
+        if len(forced):
+            return x + dx * forced[0].item()
+        elif goal_step < length:
+            return self.goal.x
+
+        return None
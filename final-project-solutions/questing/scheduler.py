@@ -0,0 +1,80 @@
+from typing import List, Optional
+
+from .board import Board
+from .logger import DEBUG, Logger
+from .types import Position
+
+
+class EnemyScheduler(Logger):
+    """Runs the enemy phase of the game: after every action of the hero, the enemies close to the hero
+    either attack it, if it is within their reach, or move towards it.
+
+    Only the enemies within the activity radius of the hero are woken up, which are found with the
+    spatial index of the board, so the cost of the phase depends on the number of enemies around the
+    hero, and not on the number of enemies in the board. Enemies act from the closest to the furthest."""
+    def __init__(self, board: Board, activity_radius: int = 5, **kwargs):
+        super().__init__(name="scheduler", **kwargs)
+        self.board = board
+        self.activity_radius = activity_radius
+
+    def active_enemies(self, hero: "Hero") -> List[Position]:
+        """Returns the positions of the enemies that act in this turn, sorted from the closest to the hero
+        to the furthest"""
+        return self.board.enemies_in_range(hero.position, self.activity_radius)
+
+    def run(self, hero: "Hero") -> int:
+        """Runs the enemy phase, and returns the number of enemies that acted. The phase stops as soon
+        as the hero is destroyed."""
+        positions = self.active_enemies(hero)
+        self.log("Waking up %s enemies", len(positions), level=DEBUG)
+
+        for acted, position in enumerate(positions):
+            if not hero.is_alive:
+                return acted
+
+            self.act(self.board.get(position), hero)
+
+        return len(positions)
+
+    def act(self, enemy: "Enemy", hero: "Hero"):
+        """Makes the enemy attack the hero if the hero is within its reach, or move towards it otherwise"""
+        if enemy.position.distance(hero.position) <= self.reach(enemy):
+            self.log("%s attacks the hero!", enemy.name, level=DEBUG)
+            enemy.attack(hero)
+            return
+
+        destination = self.step_towards(enemy, hero.position)
+
+        if destination is not None:
+            self.board.move(unit=enemy, destination=destination)
+
+    @staticmethod
+    def reach(enemy: "Enemy") -> int:
+        """Maximum distance from which the enemy can attack"""
+        return getattr(enemy, "attack_range", 1)
+
+    def step_towards(self, enemy: "Enemy", target: Position) -> Optional[Position]:
+        """Returns the position the enemy moves to in order to get closer to the target, or None if it
+        can't get any closer. The enemy walks up to its speed through empty positions, every step reducing
+        its distance to the target, and stops as soon as the target is within its reach."""
+        position = enemy.position
+        reach = self.reach(enemy)
+
+        for _ in range(enemy.speed):
+            if position.distance(target) <= reach:
+                break
+
+            dx, dy = target.x - position.x, target.y - position.y
+            step_x = Position(position.x + (1 if dx > 0 else -1), position.y) if dx else None
+            step_y = Position(position.x, position.y + (1 if dy > 0 else -1)) if dy else None
+            # Try to reduce the largest difference first
+            steps = (step_x, step_y) if abs(dx) >= abs(dy) else (step_y, step_x)
+            step = next((step for step in steps
+                         if step is not None and self.board.is_valid(step) and self.board.is_empty(step)), None)
+
+            if step is None:
+                break
+
+            position = step
+
+        return position if position != enemy.position else None
@@ -0,0 +1,208 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import math
+import os
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .game import Game, GameActions, GameStatus
+from .hero import Hero, Warrior
+from .logger import quiet
+from .types import Position
+
+# A policy decides which action the hero takes next (and its target, for attacks).
+# It returns None when there is nothing the hero can do.
+Policy = Callable[[Game, np.random.Generator], Optional[Tuple[GameActions, Optional[Position]]]]
+
+
+# Action that moves the hero by every offset
+_MOVES = {(0, 1): GameActions.MOVE_UP, (0, -1): GameActions.MOVE_DOWN,
+          (-1, 0): GameActions.MOVE_LEFT, (1, 0): GameActions.MOVE_RIGHT}
+
+
+def random_policy(game: Game, rng: np.random.Generator) -> Optional[Tuple[GameActions, Optional[Position]]]:
+    """Takes any of the available actions at random. Attacks target a random enemy in range."""
+    actions = game.available_actions()
+
+    if not actions:
+        return None
+
+    action = actions[int(rng.random() * len(actions))]
+    target = None
+
+    if action == GameActions.ATTACK:
+        targets = game.attack_targets()
+        target = targets[int(rng.random() * len(targets))]
+
+    return action, target
+
+
+def greedy_policy(game: Game, rng: np.random.Generator) -> Optional[Tuple[GameActions, Optional[Position]]]:
+    """Attacks the closest enemy in range, and otherwise heads to the exit following the shortest path
+    around the enemies, exiting as soon as possible. When there is no path to the exit, it moves at random,
+    preferring the moves that get it closer to the exit."""
+    actions = game.available_actions()
+
+    if not actions:
+        return None
+    elif GameActions.EXIT in actions:
+        return GameActions.EXIT, None
+    elif GameActions.ATTACK in actions:
+        return GameActions.ATTACK, game.attack_targets()[0]
+
+    position = game.hero.position
+    step = game.board.next_step_towards_exit(position)
+
+    if step is not None:
+        action = _MOVES[(step[0] - position.x, step[1] - position.y)]
+
+        if action in actions:
+            return action, None
+
+    # Moving up or right always gets the hero closer to the exit, which is in the top right corner
+    closer = [a for a in (GameActions.MOVE_UP, GameActions.MOVE_RIGHT) if a in actions]
+    actions = closer or actions
+
+    return actions[int(rng.random() * len(actions))], None
+
+
+class GameResult(NamedTuple):
+    """Outcome of a single simulated game"""
+    status: GameStatus
+    steps: int
+    enemies_killed: int
+    hero_health: int
+
+
+class SimulationStats:
+    """Aggregated outcome of many simulated games. Stats from different runs can be merged."""
+    def __init__(self):
+        self.games = 0
+        self.steps = 0
+        self.enemies_killed = 0
+        self.statuses: Dict[GameStatus, int] = {status: 0 for status in GameStatus}
+
+    def add(self, result: GameResult):
+        """Adds the result of a game to the stats"""
+        self.games += 1
+        self.steps += result.steps
+        self.enemies_killed += result.enemies_killed
+        self.statuses[result.status] += 1
+
+    def merge(self, other: "SimulationStats") -> "SimulationStats":
+        """Adds the stats of another simulation to these ones"""
+        self.games += other.games
+        self.steps += other.steps
+        self.enemies_killed += other.enemies_killed
+
+        for status, count in other.statuses.items():
+            self.statuses[status] += count
+
+        return self
+
+    @property
+    def wins(self) -> int:
+        return self.statuses[GameStatus.WON]
+
+    @property
+    def losses(self) -> int:
+        return self.statuses[GameStatus.GAME_OVER]
+
+    @property
+    def unfinished(self) -> int:
+        """Games that were still being played when they reached the maximum number of steps"""
+        return self.statuses[GameStatus.PLAYING]
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def mean_steps(self) -> float:
+        return self.steps / self.games if self.games else 0.0
+
+    def __repr__(self) -> str:
+        return f"SimulationStats(games={self.games}, wins={self.wins}, losses={self.losses}, " \
+               f"unfinished={self.unfinished}, mean_steps={self.mean_steps:.2f})"
+
+
+def play_game(seed: np.random.SeedSequence, policy: Policy = random_policy, hero_cls: type = Warrior,
+              width: int = 10, height: int = 10, num_enemies: int = 10, min_level: int = 1, max_level: int = 3,
+              max_steps: int = 1000) -> GameResult:
+    """Plays a single game until it finishes or reaches the maximum number of steps. Everything random
+    in the game (the board and the policy decisions) is derived from the seed, so the same seed
+    always produces the same game."""
+    rng = np.random.default_rng(seed)
+    hero: Hero = hero_cls(name="Hero")
+    game = Game(hero=hero, width=width, height=height, num_enemies=num_enemies, min_level=min_level, max_level=max_level, rng=rng)
+    num_enemies = game.board.num_enemies
+    steps = 0
+
+    while game.status == GameStatus.PLAYING and steps < max_steps:
+        decision = policy(game, rng)
+
+        if decision is None:
+            break
+
+        game.do(*decision)
+        steps += 1
+
+    return GameResult(status=game.status, steps=steps, enemies_killed=num_enemies - game.board.num_enemies,
+                      hero_health=hero.health)
+
+
+def _simulate_chunk(master_seed: np.random.SeedSequence, start: int, num_games: int, policy: Policy, hero_cls: type,
+                    game_kwargs: dict) -> SimulationStats:
+    """Plays the games from start to start + num_games. Every game gets the seed that master_seed.spawn would
+    give it (the one at its index), so the games don't depend on how they are split in chunks."""
+    stats = SimulationStats()
+
+    with quiet():
+        for idx in range(start, start + num_games):
+            game_seed = np.random.SeedSequence(master_seed.entropy, spawn_key=master_seed.spawn_key + (idx,))
+            stats.add(play_game(game_seed, policy=policy, hero_cls=hero_cls, **game_kwargs))
+
+    return stats
+
+
+def simulate(num_games: int, policy: Policy = random_policy, hero_cls: type = Warrior, seed: Optional[int] = None,
+             workers: Optional[int] = 1, chunk_size: Optional[int] = None, **game_kwargs) -> SimulationStats:
+    """Plays num_games games with logging disabled, and returns the aggregated stats. Any extra keyword
+    arguments (width, height, num_enemies, min_level, max_level, max_steps) are passed to play_game.
+
+    Every game gets its own seed, derived from the master seed and the index of the game, so whole
+    simulations are reproducible. When workers is greater than 1 (or None, to use all the cores), games
+    are split in chunks of chunk_size games that are played in a pool of processes, and their stats are
+    merged as soon as they finish. By default, there are about 4 chunks per worker, so that small runs are
+    spread across the pool too. Since the seeds only depend on the games, the result is the same regardless
+    of the number of workers and the size of the chunks. Note that policies need to be picklable (e.g.
+    module level functions) to use workers."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 1:
+        raise ValueError(f"The number of workers should be at least 1, not {workers}")
+
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(num_games / (workers * 4)))
+    elif chunk_size < 1:
+        raise ValueError(f"The size of the chunks should be at least 1, not {chunk_size}")
+
+    master_seed = np.random.SeedSequence(seed)
+    chunks = [(start, min(chunk_size, num_games - start)) for start in range(0, num_games, chunk_size)]
+    stats = SimulationStats()
+
+    if workers == 1:
+        for start, games in chunks:
+            stats.merge(_simulate_chunk(master_seed, start, games, policy, hero_cls, game_kwargs))
+
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_simulate_chunk, master_seed, start, games, policy, hero_cls, game_kwargs)
+                   for start, games in chunks]
+
+        for future in as_completed(futures):
+            stats.merge(future.result())
+
+    return stats
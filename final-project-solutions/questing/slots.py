@@ -0,0 +1,15 @@
+from .logger import Logger
+
+
+class UnitSlots(Logger):
+    """Common base of the game elements and of the attack and defense mixins, which declares the slots
+    for all of their attributes. Slots can't be spread across the mixins, because Python doesn't allow
+    combining several bases that add slots of their own (e.g. MeleeAttack and ArmoredDefense). Declaring
+    all of them here gives every combination the same layout, so units don't need an instance dict,
+    which is most of their memory footprint. Every subclass must declare __slots__ (even if empty),
+    otherwise its instances get a dict again.
+
+    The only exception is attack_range, which is declared by RangedAttack: the game checks whether the
+    hero has an attack range to know if it can attack from afar, so it can't be an attribute of every
+    unit. Only one branch of a combination can add slots, so the rest of the attributes stay here."""
+    __slots__ = ("position", "speed", "level", "health", "_original_health", "power", "armor")
@@ -0,0 +1,318 @@
+import heapq
+from typing import Dict, Iterator, List, Set, Tuple
+
+import numpy as np
+
+from .types import Position
+
+
+class BucketGrid:
+    """Spatial index for positions in the board. The board is split in square buckets of
+    bucket_size x bucket_size positions, and every bucket keeps the set of positions inside it,
+    so range queries only need to look at the buckets that overlap the range, instead of
+    scanning every position in the board."""
+    def __init__(self, width: int, height: int, bucket_size: int = 8):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+
+        self._buckets: Dict[Tuple[int, int], Set[Position]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, position: Position) -> bool:
+        bucket = self._buckets.get(self._bucket(position))
+
+        return bucket is not None and Position(*position) in bucket
+
+    def __iter__(self) -> Iterator[Position]:
+        for bucket in self._buckets.values():
+            yield from bucket
+
+    def add(self, position: Position):
+        """Adds a position to the index. Adding a position twice has no effect."""
+        key = self._bucket(position)
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            bucket = self._buckets[key] = set()
+
+        if position not in bucket:
+            bucket.add(Position(*position))
+            self._size += 1
+
+    def add_many(self, positions: List[Position]):
+        """Adds many positions to the index at once. This is equivalent to calling add for every
+        position, but avoids the overhead of the method call when adding thousands of them."""
+        size = self.bucket_size
+        buckets = self._buckets
+
+        for position in positions:
+            key = (position[0] // size, position[1] // size)
+            bucket = buckets.get(key)
+
+            if bucket is None:
+                bucket = buckets[key] = set()
+
+            if position not in bucket:
+                bucket.add(position)
+                self._size += 1
+
+    def remove(self, position: Position):
+        """Removes a position from the index, if it was there."""
+        key = self._bucket(position)
+        bucket = self._buckets.get(key)
+
+        if bucket is not None and position in bucket:
+            bucket.remove(position)
+            self._size -= 1
+
+            if not bucket:
+                del self._buckets[key]
+
+    def in_range(self, position: Position, distance: int) -> List[Position]:
+        """Returns the positions in the index that are within the given (Manhattan) distance of
+        the position provided, excluding the position itself. They are sorted by distance."""
+        result = []
+
+        for bucket, fully_inside in self._buckets_in_range(position, distance):
+            if fully_inside:
+                result.extend(bucket)
+            else:
+                result.extend(p for p in bucket if position.distance(p) <= distance)
+
+        result = [p for p in result if p != position]
+        result.sort(key=lambda p: (position.distance(p), p))
+
+        return result
+
+    def count_in_range(self, position: Position, distance: int) -> int:
+        """Returns how many positions in the index are within the given (Manhattan) distance
+        of the position provided, excluding the position itself."""
+        count = 0
+
+        for bucket, fully_inside in self._buckets_in_range(position, distance):
+            if fully_inside:
+                count += len(bucket)
+            else:
+                count += sum(1 for p in bucket if position.distance(p) <= distance)
+
+        return count - (position in self)
+
+    def nearest(self, position: Position, k: int = 1) -> List[Position]:
+        """Returns the k positions in the index that are closest to the position provided
+        (excluding the position itself), sorted by distance. The search goes through rings of
+        buckets around the position, and stops as soon as no bucket further away can contain
+        a position closer than the k-th one found so far."""
+        if k < 1 or not self._size:
+            return []
+
+        size = self.bucket_size
+        center_x, center_y = self._bucket(position)
+        max_ring = max(center_x, center_y,
+                       (self.width - 1) // size - center_x,
+                       (self.height - 1) // size - center_y)
+        # Max heap (using negated keys) with the k best candidates found so far
+        best: List[Tuple[int, Position]] = []
+
+        for ring in range(max_ring + 1):
+            # Any position in a bucket of this ring is at least this far from the position
+            min_distance = (ring - 1) * size + 1 if ring else 0
+
+            if len(best) == k and -best[0][0][0] < min_distance:
+                break
+
+            for key in self._ring(center_x, center_y, ring):
+                for p in self._buckets.get(key, ()):
+                    if p == position:
+                        continue
+
+                    item = ((-position.distance(p), -p.x, -p.y), p)
+
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+
+        return [p for _, p in sorted(best, reverse=True)]
+
+    def _bucket(self, position: Position) -> Tuple[int, int]:
+        return position[0] // self.bucket_size, position[1] // self.bucket_size
+
+    def _ring(self, center_x: int, center_y: int, ring: int) -> Iterator[Tuple[int, int]]:
+        """Iterates over the keys of the buckets at a Chebyshev distance of 'ring' buckets"""
+        if not ring:
+            yield center_x, center_y
+            return
+
+        for bx in range(center_x - ring, center_x + ring + 1):
+            yield bx, center_y - ring
+            yield bx, center_y + ring
+
+        for by in range(center_y - ring + 1, center_y + ring):
+            yield center_x - ring, by
+            yield center_x + ring, by
+
+    def _buckets_in_range(self, position: Position, distance: int) -> Iterator[Tuple[Set[Position], bool]]:
+        """Iterates over the non-empty buckets that overlap the diamond around the position. Every
+        bucket comes with a flag indicating whether the bucket is completely inside the diamond,
+        in which case there is no need to check the positions one by one."""
+        size = self.bucket_size
+        start_x, start_y = self._bucket(Position(max(0, position.x - distance), max(0, position.y - distance)))
+        end_x, end_y = self._bucket(Position(min(self.width - 1, position.x + distance),
+                                             min(self.height - 1, position.y + distance)))
+
+        for bx in range(start_x, end_x + 1):
+            # Range of x coordinates covered by the bucket, and their closest/furthest distance on x
+            low_x, high_x = bx * size, bx * size + size - 1
+            near_x = max(low_x - position.x, 0, position.x - high_x)
+            far_x = max(abs(low_x - position.x), abs(high_x - position.x))
+
+            for by in range(start_y, end_y + 1):
+                bucket = self._buckets.get((bx, by))
+
+                if bucket is None:
+                    continue
+
+                low_y, high_y = by * size, by * size + size - 1
+                near_y = max(low_y - position.y, 0, position.y - high_y)
+
+                if near_x + near_y > distance:
+                    continue
+
+                far_y = max(abs(low_y - position.y), abs(high_y - position.y))
+
+                yield bucket, far_x + far_y <= distance
+
+
+class OccupancyGrid:
+    """Spatial index with the same interface as BucketGrid, but backed by arrays instead of Python objects:
+    a grid of booleans with the positions in the index, and the number of positions in every bucket of
+    bucket_size x bucket_size positions. It takes a couple of bytes per position of the board no matter
+    how many positions are in the index, so it's meant for boards with many enemies (see UnitTable).
+
+    Range queries scan the part of the grid covered by the range. Nearest neighbour queries grow a range
+    around the position until it has enough positions, skipping the ranges whose buckets can't have enough
+    without scanning them."""
+    def __init__(self, width: int, height: int, bucket_size: int = 8):
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+
+        self._occupied = np.zeros((width, height), dtype=bool)
+        self._counts = np.zeros((-(-width // bucket_size), -(-height // bucket_size)), dtype=np.int32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, position: Position) -> bool:
+        x, y = position
+        return 0 <= x < self.width and 0 <= y < self.height and self._occupied.item(x, y)
+
+    def __iter__(self) -> Iterator[Position]:
+        xs, ys = np.nonzero(self._occupied)
+
+        return map(Position, xs.tolist(), ys.tolist())
+
+    def add(self, position: Position):
+        """Adds a position to the index. Adding a position twice has no effect."""
+        x, y = position
+
+        if not self._occupied.item(x, y):
+            self._occupied[x, y] = True
+            self._counts[x // self.bucket_size, y // self.bucket_size] += 1
+            self._size += 1
+
+    def add_many(self, positions: List[Position]):
+        """Adds many positions to the index at once"""
+        if len(positions):
+            xs, ys = np.asarray(positions, dtype=np.int64).T
+            self.add_arrays(xs, ys)
+
+    def add_arrays(self, xs: np.ndarray, ys: np.ndarray):
+        """Adds many positions to the index at once, given as arrays with their x and y coordinates"""
+        cells = np.unique(np.asarray(xs, dtype=np.int64) * self.height + np.asarray(ys, dtype=np.int64))
+        xs, ys = np.divmod(cells, self.height)
+        new = ~self._occupied[xs, ys]
+        xs, ys = xs[new], ys[new]
+
+        self._occupied[xs, ys] = True
+        np.add.at(self._counts, (xs // self.bucket_size, ys // self.bucket_size), 1)
+        self._size += len(xs)
+
+    def remove(self, position: Position):
+        """Removes a position from the index, if it was there."""
+        x, y = position
+
+        if self._occupied.item(x, y):
+            self._occupied[x, y] = False
+            self._counts[x // self.bucket_size, y // self.bucket_size] -= 1
+            self._size -= 1
+
+    def in_range(self, position: Position, distance: int) -> List[Position]:
+        """Returns the positions in the index that are within the given (Manhattan) distance of
+        the position provided, excluding the position itself. They are sorted by distance."""
+        xs, ys, distances = self._scan(position, distance)
+        order = np.lexsort((ys, xs, distances))
+
+        return list(map(Position, xs[order].tolist(), ys[order].tolist()))
+
+    def count_in_range(self, position: Position, distance: int) -> int:
+        """Returns how many positions in the index are within the given (Manhattan) distance
+        of the position provided, excluding the position itself."""
+        return len(self._scan(position, distance)[0])
+
+    def nearest(self, position: Position, k: int = 1) -> List[Position]:
+        """Returns the k positions in the index that are closest to the position provided
+        (excluding the position itself), sorted by distance"""
+        if k < 1 or not self._size:
+            return []
+
+        others = self._size - (position in self)
+        k = min(k, others)
+        longest = max(position[0], self.width - 1 - position[0]) + max(position[1], self.height - 1 - position[1])
+        distance = self.bucket_size
+
+        # The square around the range is a cheap upper bound of the positions in the range
+        while distance < longest and self._count_in_square(position, distance) - (others < self._size) < k:
+            distance *= 2
+
+        while True:
+            xs, ys, distances = self._scan(position, min(distance, longest))
+
+            if len(xs) >= k:
+                order = np.lexsort((ys, xs, distances))[:k]
+                return list(map(Position, xs[order].tolist(), ys[order].tolist()))
+
+            distance *= 2
+
+    def _count_in_square(self, position: Position, distance: int) -> int:
+        """Number of positions in the buckets that overlap the square around the position"""
+        size = self.bucket_size
+        start_x, start_y = max(0, position[0] - distance) // size, max(0, position[1] - distance) // size
+        end_x = min(self.width - 1, position[0] + distance) // size + 1
+        end_y = min(self.height - 1, position[1] + distance) // size + 1
+
+        return int(self._counts[start_x:end_x, start_y:end_y].sum())
+
+    def _scan(self, position: Position, distance: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Coordinates and distances of the positions in the index within the distance of the position,
+        excluding the position itself"""
+        x, y = position
+        start_x, end_x = max(0, x - distance), min(self.width - 1, x + distance) + 1
+        start_y, end_y = max(0, y - distance), min(self.height - 1, y + distance) + 1
+
+        if distance < 0 or start_x >= end_x or start_y >= end_y:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+
+        xs, ys = np.nonzero(self._occupied[start_x:end_x, start_y:end_y])
+        xs += start_x
+        ys += start_y
+        distances = np.abs(xs - x) + np.abs(ys - y)
+        inside = (distances <= distance) & (distances > 0)
+
+        return xs[inside], ys[inside], distances[inside]
@@ -1,3 +1,4 @@
+from enum import IntEnum
 from typing import NamedTuple
 
 class Position(NamedTuple):
@@ -11,3 +12,29 @@ class Position(NamedTuple):
         """Calculates the distance between two points, using the Manhattan distance. This means that the
         distance between (0, 0) and (1, 1) is 2, instead of sqrt(2), which would be the distance in a straight line."""
         return abs(self.x - to.x) + abs(self.y - to.y)
+
+
+class CellKind(IntEnum):
+    """Compact code for the kind of game element that occupies a cell of the board. The board keeps
+    a grid of these codes next to the grid of game elements, so that queries over the whole board
+    can be done with NumPy operations instead of comparing Python objects one by one."""
+    EMPTY = 0
+    HERO = 1
+    ENEMY = 2
+    EXIT = 3
+    WALL = 4
+    OTHER = 5
+
+
+class AttackKind(IntEnum):
+    """Compact code for the attack classes, used by the batch combat engine (see questing.combat)"""
+    MELEE = 0
+    RANGED = 1
+    MAGIC = 2
+
+
+class DefenseKind(IntEnum):
+    """Compact code for the defense classes, used by the batch combat engine (see questing.combat)"""
+    PLAIN = 0
+    ARMORED = 1
+    BARRIER = 2
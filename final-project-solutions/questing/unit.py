@@ -1,6 +1,7 @@
 from abc import abstractmethod
 
 from .game_element import GameElement
+from .logger import DEBUG
 from .types import Position
 
 
@@ -10,6 +11,8 @@ class Unit(GameElement):
     and receive damage. In general, the attack and take damage method will be implemented by using
     one of the Attack classes (e.g. MeleeAttack, RangedAttack, etc...) and the take_damage by using
     one of the Defense classes"""
+    __slots__ = ()
+
     def __init__(self, speed: int, **kwargs):
         super().__init__(**kwargs)
         self.speed = speed
@@ -21,10 +24,10 @@ class Unit(GameElement):
         target_dist = self.position.distance(destination)
 
         if target_dist > self.speed:
-            self.log(f"Target position {destination} is at a distance of {target_dist} and my speed is {self.speed}, I can't reach it!")
+            self.log("Target position %s is at a distance of %s and my speed is %s, I can't reach it!", destination, target_dist, self.speed, level=DEBUG)
             return False
         else:
-            self.log(f"Moving to new position ({destination})")
+            self.log("Moving to new position (%s)", destination, level=DEBUG)
             self.position = destination
             return True
 
@@ -0,0 +1,184 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .attack import MagicAttack, MeleeAttack, RangedAttack
+from .defense import ArmoredDefense, Barrier, Defense
+from .enemy import Apprentice, Archer, Enemy, Swordsman
+from .slots import UnitSlots
+from .types import Position
+
+
+class _Column:
+    """Descriptor that exposes a column of the unit table as an attribute of the unit views.
+    Numbers are returned as Python numbers (ints whenever possible), just like the attributes
+    of the regular units, so that views behave exactly like them."""
+    def __init__(self, column: str):
+        self.column = column
+
+    def __get__(self, view: Optional["UnitView"], owner: type = None):
+        if view is None:
+            return self
+
+        value = getattr(view.table, self.column).item(view.row)
+
+        return int(value) if isinstance(value, float) and value.is_integer() else value
+
+    def __set__(self, view: "UnitView", value):
+        getattr(view.table, self.column)[view.row] = value
+
+
+class UnitView(UnitSlots):
+    """A lightweight view of one of the rows of a UnitTable. Views don't hold any state of their own,
+    every attribute is read from (and written to) the table. The subclasses below combine the views
+    with the same attack and defense classes as the regular enemies, so they satisfy the Unit interface
+    and behave exactly like them (they derive from UnitSlots so that their layout is compatible with those
+    classes, but the descriptors below take precedence over its slots). Views are cheap to create, and two
+    views of the same row are equal. The views of each kind declare the slots for the table and the row,
+    since RangedAttack adds a slot of its own."""
+    __slots__ = ()
+
+    health = _Column("health")
+    _original_health = _Column("original_health")
+    power = _Column("power")
+    speed = _Column("speed")
+    level = _Column("level")
+
+    def __init__(self, table: "UnitTable", row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def position(self) -> Optional[Position]:
+        x = self.table.x.item(self.row)
+
+        return None if x < 0 else Position(x, self.table.y.item(self.row))
+
+    @position.setter
+    def position(self, position: Optional[Position]):
+        self.table.x[self.row], self.table.y[self.row] = (-1, -1) if position is None else position
+
+    @property
+    def name(self) -> str:
+        return f"{UnitTable.KINDS[self.table.kind.item(self.row)].__name__} #{self.row}"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UnitView) and self.table is other.table and self.row == other.row
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.row))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name})"
+
+
+# Only the views of the enemies that have armor or attack range expose those columns
+class ArcherView(UnitView, RangedAttack, Defense, Enemy):
+    __slots__ = ("table", "row")
+    attack_range = _Column("attack_range")
+    short_text = Archer.short_text
+
+
+class SwordsmanView(UnitView, MeleeAttack, ArmoredDefense, Enemy):
+    __slots__ = ("table", "row")
+    armor = _Column("armor")
+    short_text = Swordsman.short_text
+
+
+class ApprenticeView(UnitView, MagicAttack, Barrier, Enemy):
+    __slots__ = ("table", "row")
+    attack_range = _Column("attack_range")
+    armor = _Column("armor")
+    short_text = Apprentice.short_text
+
+
+class UnitTable:
+    """Columnar (structure of arrays) store for enemies. Instead of one Python object per enemy,
+    the stats of all the enemies are kept in NumPy arrays, one per attribute, and every enemy is
+    just a row in the table. Views of the rows (see UnitView) can be used wherever a Unit is expected.
+
+    This takes ~50 bytes per enemy, so it's the way to go for boards with millions of enemies."""
+    # The kind column holds the index of the enemy class in this tuple
+    KINDS = (Archer, Swordsman, Apprentice)
+    VIEWS = (ArcherView, SwordsmanView, ApprenticeView)
+
+    _COLUMNS = dict(
+        health=np.float64,
+        original_health=np.float64,
+        armor=np.float64,
+        power=np.float64,
+        attack_range=np.int16,
+        speed=np.int16,
+        level=np.int16,
+        kind=np.uint8,
+        x=np.int32,
+        y=np.int32,
+    )
+
+    def __init__(self, capacity: int = 16):
+        self._size = 0
+
+        for column, dtype in self._COLUMNS.items():
+            setattr(self, column, np.zeros(capacity, dtype=dtype))
+
+        self.x.fill(-1)
+        self.y.fill(-1)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, row: int) -> UnitView:
+        return self.view(row)
+
+    def view(self, row: int) -> UnitView:
+        """Returns a view of the enemy in the given row"""
+        if not 0 <= row < self._size:
+            raise IndexError(f"Row {row} is out of range, the table has {self._size} units")
+
+        return self.VIEWS[self.kind.item(row)](self, row)
+
+    def add(self, kinds: Sequence[int], levels: Sequence[int]) -> np.ndarray:
+        """Adds new enemies to the table, and returns their rows. Kinds are indices in UnitTable.KINDS.
+        The stats are computed once for every different kind and level, and copied to all the rows."""
+        kinds = np.asarray(kinds, dtype=np.int64)
+        levels = np.asarray(levels, dtype=np.int64)
+        rows = np.arange(self._size, self._size + len(kinds))
+        self._reserve(self._size + len(kinds))
+
+        self.kind[rows] = kinds
+        self.level[rows] = levels
+
+        keys, inverse = np.unique(kinds * 65536 + levels, return_inverse=True)
+
+        for idx, key in enumerate(keys.tolist()):
+            kind, level = divmod(key, 65536)
+            stats = self.KINDS[kind].stats(level)
+            selected = rows[inverse.reshape(-1) == idx]
+
+            for column in ("health", "armor", "power", "attack_range", "speed"):
+                getattr(self, column)[selected] = stats.get(column, 0)
+
+            self.original_health[selected] = stats["health"]
+
+        self._size += len(kinds)
+
+        return rows
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the columns of the table, in bytes"""
+        return sum(getattr(self, column).nbytes for column in self._COLUMNS)
+
+    def _reserve(self, capacity: int):
+        """Makes sure that the columns can hold the given number of rows, doubling their size if needed"""
+        current = len(self.kind)
+
+        if capacity <= current:
+            return
+
+        new_capacity = max(capacity, 2 * current)
+
+        for column in self._COLUMNS:
+            array = getattr(self, column)
+            fill = -1 if column in ("x", "y") else 0
+            setattr(self, column, np.concatenate([array, np.full(new_capacity - current, fill, dtype=array.dtype)]))
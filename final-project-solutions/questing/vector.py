@@ -0,0 +1,302 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .board import EMPTY, ENEMY, EXIT, HERO
+from .combat import attack_kind, defense_kind, hit_power, take_damage
+from .game import Game, GameActions, GameStatus
+from .hero import Warrior
+from .logger import quiet
+from .types import CellKind
+
+# Actions are encoded as their index in this tuple, and statuses as their index in STATUSES
+ACTIONS = tuple(GameActions)
+STATUSES = tuple(GameStatus)
+MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, ATTACK, EXIT_ACTION = range(len(ACTIONS))
+PLAYING, GAME_OVER, WON = (STATUSES.index(status) for status in (GameStatus.PLAYING, GameStatus.GAME_OVER, GameStatus.WON))
+
+# Offsets of the moves, indexed by action
+_DX = np.array([0, 0, -1, 1, 0, 0])
+_DY = np.array([1, -1, 0, 0, 0, 0])
+
+
+class VectorGame:
+    """A batch of independent games that are played in lock-step. Instead of Python objects, the games are
+    stacked NumPy arrays: the grids of cell kinds (see CellKind), the grids with the stats of the enemies
+    (health, armor, power, attack range and the attack and defense kinds of questing.combat, kept in the
+    cell of every enemy, since enemies don't move), and one entry per game for the stats of the hero.
+
+    VectorGame.step performs one action in every game with a few NumPy operations, following exactly
+    the rules of Game.do and Game.available_actions: the same actions are available, and they have the
+    same effect on the board, the hero and the enemies (the enemies only act when they retaliate, i.e.
+    there is no enemy phase). Actions are encoded as their index in ACTIONS.
+
+    Games are usually created with VectorGame.create, from a seed, but any list of games of the same size
+    (with enemies of the regular kinds, not armies) can be converted with VectorGame.from_games."""
+    # Rewards for the step in which a game is won or lost
+    WIN_REWARD = 1.0
+    LOSS_REWARD = -1.0
+
+    # Channels of the observations
+    CHANNELS = ("hero", "hero_health", "enemy", "enemy_health", "enemy_armor", "enemy_power", "enemy_range", "exit")
+
+    def __init__(self, num_games: int, width: int, height: int):
+        self.num_games = num_games
+        self.width = width
+        self.height = height
+
+        grid = (num_games, width, height)
+        self.kinds = np.zeros(grid, dtype=np.uint8)
+        self.enemy_health = np.zeros(grid, dtype=np.float64)
+        self.enemy_armor = np.zeros(grid, dtype=np.float64)
+        self.enemy_power = np.zeros(grid, dtype=np.float64)
+        self.enemy_range = np.zeros(grid, dtype=np.int16)
+        self.enemy_attack = np.zeros(grid, dtype=np.uint8)
+        self.enemy_defense = np.zeros(grid, dtype=np.uint8)
+
+        self.hero_x = np.zeros(num_games, dtype=np.int64)
+        self.hero_y = np.zeros(num_games, dtype=np.int64)
+        self.hero_health = np.zeros(num_games, dtype=np.float64)
+        self.hero_original_health = np.zeros(num_games, dtype=np.float64)
+        self.hero_armor = np.zeros(num_games, dtype=np.float64)
+        self.hero_power = np.zeros(num_games, dtype=np.float64)
+        self.hero_range = np.zeros(num_games, dtype=np.int64)
+        self.hero_speed = np.zeros(num_games, dtype=np.int64)
+        self.hero_attack = np.zeros(num_games, dtype=np.uint8)
+        self.hero_defense = np.zeros(num_games, dtype=np.uint8)
+        self.status = np.full(num_games, PLAYING, dtype=np.int8)
+        # What Game.do returned in the last step
+        self.results = np.zeros(num_games, dtype=bool)
+
+        self._games = np.arange(num_games)
+        # Coordinates of every position, small enough to compute the distances to the heroes quickly
+        self._xs, self._ys = np.indices((width, height), dtype=np.int16)
+        self._seed: Optional[np.random.SeedSequence] = None
+        self._settings: dict = {}
+
+    @classmethod
+    def create(cls, num_games: int, hero_cls: type = Warrior, width: int = 10, height: int = 10, num_enemies: int = 10,
+               min_level: int = 1, max_level: int = 3, seed: Optional[int] = None) -> "VectorGame":
+        """Creates num_games games, each one with its own seed spawned from the master seed. Every game is
+        the same as Game(rng=np.random.default_rng(game_seed), compact=True) with the same settings."""
+        vector = cls(num_games, width, height)
+        vector._seed = np.random.SeedSequence(seed)
+        vector._settings = dict(hero_cls=hero_cls, width=width, height=height, num_enemies=num_enemies,
+                                min_level=min_level, max_level=max_level)
+        vector.reset()
+
+        return vector
+
+    @classmethod
+    def from_games(cls, games: Sequence[Game]) -> "VectorGame":
+        """Copies the state of the games provided, which need to have boards of the same size"""
+        width, height = games[0].board.width, games[0].board.height
+
+        if any((game.board.width, game.board.height) != (width, height) for game in games):
+            raise ValueError("All the games need to have boards of the same size")
+
+        vector = cls(len(games), width, height)
+
+        for idx, game in enumerate(games):
+            vector._load(idx, game)
+
+        return vector
+
+    def reset(self, mask: Optional[np.ndarray] = None):
+        """Starts new games in place of the ones selected by the mask (all of them by default), with new
+        seeds spawned from the master seed. Only games made with VectorGame.create can be reset."""
+        if self._seed is None:
+            raise ValueError("Only games made with VectorGame.create can be reset")
+
+        games = self._games if mask is None else np.flatnonzero(mask)
+        settings = dict(self._settings)
+        hero_cls = settings.pop("hero_cls")
+
+        with quiet():
+            for idx, seed in zip(games.tolist(), self._seed.spawn(len(games))):
+                game = Game(hero=hero_cls(name="Hero"), rng=np.random.default_rng(seed), compact=True, **settings)
+                self._load(idx, game)
+
+    def _load(self, idx: int, game: Game):
+        board, hero = game.board, game.hero
+        self.kinds[idx] = board.kinds
+        self.enemy_health[idx] = self.enemy_armor[idx] = self.enemy_power[idx] = 0
+        self.enemy_range[idx] = self.enemy_attack[idx] = self.enemy_defense[idx] = 0
+
+        for position in board.positions(CellKind.ENEMY):
+            enemy = board.get(position)
+            cell = (idx, *position)
+            self.enemy_health[cell] = enemy.health
+            self.enemy_armor[cell] = getattr(enemy, "armor", 0)
+            self.enemy_power[cell] = enemy.power
+            self.enemy_range[cell] = getattr(enemy, "attack_range", 1)
+            self.enemy_attack[cell] = attack_kind(enemy)
+            self.enemy_defense[cell] = defense_kind(enemy)
+
+        self.hero_x[idx], self.hero_y[idx] = hero.position
+        self.hero_health[idx] = hero.health
+        self.hero_original_health[idx] = hero._original_health
+        self.hero_armor[idx] = getattr(hero, "armor", 0)
+        self.hero_power[idx] = hero.power
+        self.hero_range[idx] = getattr(hero, "attack_range", 1)
+        self.hero_speed[idx] = hero.speed
+        self.hero_attack[idx] = attack_kind(hero)
+        self.hero_defense[idx] = defense_kind(hero)
+        self.status[idx] = STATUSES.index(game.status)
+        self.results[idx] = False
+
+    def available_actions(self) -> np.ndarray:
+        """Returns a mask with the actions available in every game, with one column per action (see
+        Game.available_actions). Nothing is available in the games that have finished."""
+        mask = np.zeros((self.num_games, len(ACTIONS)), dtype=bool)
+        x, y = self.hero_x, self.hero_y
+
+        for action in (MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT):
+            new_x, new_y = x + _DX[action], y + _DY[action]
+            inside = (new_x >= 0) & (new_x < self.width) & (new_y >= 0) & (new_y < self.height)
+            mask[:, action] = inside
+            mask[inside, action] = self.kinds[self._games[inside], new_x[inside], new_y[inside]] == EMPTY
+
+        mask[:, EXIT_ACTION] = np.abs(self.width - 1 - x) + np.abs(self.height - 1 - y) <= self.hero_speed
+        mask[:, ATTACK] = self._enemies_in_range(self._games).reshape(self.num_games, self.width * self.height).any(axis=1)
+        mask[self.status != PLAYING] = False
+
+        return mask
+
+    def attack_targets(self) -> np.ndarray:
+        """Returns the position of the closest enemy within the attack range of the hero in every game, as
+        an array of (x, y) rows, or (-1, -1) when there isn't any. This is the first of Game.attack_targets."""
+        targets = np.full((self.num_games, 2), -1, dtype=np.int64)
+        playing = self._games[self.status == PLAYING]
+        targets[playing] = self._closest_enemies(playing)
+
+        return targets
+
+    def step(self, actions: np.ndarray, targets: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Performs one action in every game, and returns the observations after it, the rewards and whether
+        every game has finished. Attacks are done on the targets provided, an array of (x, y) rows, or on
+        the closest enemy within range when there are no targets (see VectorGame.attack_targets).
+
+        Just like Game.do, actions that aren't available and attacks on positions without enemies don't
+        change anything, and the games that have finished don't change either. What Game.do would have
+        returned is kept in VectorGame.results."""
+        actions = np.asarray(actions, dtype=np.int64)
+        known = (actions >= 0) & (actions < len(ACTIONS))
+        valid = known & self.available_actions()[self._games, np.where(known, actions, 0)]
+        previous_status = self.status.copy()
+        self.results[:] = False
+
+        moves = self._games[valid & (actions <= MOVE_RIGHT)]
+        self._move_hero(moves, self.hero_x[moves] + _DX[actions[moves]], self.hero_y[moves] + _DY[actions[moves]])
+        self.results[moves] = True
+
+        exits = self._games[valid & (actions == EXIT_ACTION)]
+        self.status[exits] = WON
+        self.results[exits] = True
+
+        attacks = self._games[valid & (actions == ATTACK)]
+
+        if targets is None:
+            self._attack(attacks, self._closest_enemies(attacks))
+        else:
+            self._attack(attacks, np.asarray(targets, dtype=np.int64).reshape(self.num_games, 2)[attacks])
+
+        rewards = np.zeros(self.num_games, dtype=np.float64)
+        finished = self.status != previous_status
+        rewards[finished & (self.status == WON)] = self.WIN_REWARD
+        rewards[finished & (self.status == GAME_OVER)] = self.LOSS_REWARD
+
+        return self.observations(), rewards, self.status != PLAYING
+
+    def _attack(self, games: np.ndarray, targets: np.ndarray):
+        """Follows Game._attack: the hero attacks the target (one row of targets per game), and either takes
+        its position when it's destroyed (after healing), or suffers its retaliation"""
+        target_x, target_y = targets[:, 0], targets[:, 1]
+        inside = (target_x >= 0) & (target_x < self.width) & (target_y >= 0) & (target_y < self.height)
+        games, target_x, target_y = games[inside], target_x[inside], target_y[inside]
+        is_enemy = self.kinds[games, target_x, target_y] == ENEMY
+        games, target_x, target_y = games[is_enemy], target_x[is_enemy], target_y[is_enemy]
+        cells = (games, target_x, target_y)
+
+        distance = np.abs(self.hero_x[games] - target_x) + np.abs(self.hero_y[games] - target_y)
+        damage = hit_power(self.hero_attack[games], self.hero_power[games], self.hero_range[games], distance)
+        # Attacks out of reach (which are possible with explicit targets) don't do any damage
+        self.enemy_health[cells], self.enemy_armor[cells] = take_damage(
+            self.enemy_defense[cells], self.enemy_health[cells], self.enemy_armor[cells], np.nan_to_num(damage))
+        destroyed = self.enemy_health[cells] <= 0
+
+        # Destroyed enemies leave their position, and the hero moves there if it's fast enough
+        killers = games[destroyed]
+        self.hero_health[killers] = self.hero_original_health[killers]
+        self._clear_enemies(killers, target_x[destroyed], target_y[destroyed])
+        fast = distance[destroyed] <= self.hero_speed[killers]
+        self._move_hero(killers[fast], target_x[destroyed][fast], target_y[destroyed][fast])
+        self.results[killers[fast]] = True
+
+        # The others retaliate
+        alive = ~destroyed
+        survivors, cells = games[alive], (games[alive], target_x[alive], target_y[alive])
+        damage = hit_power(self.enemy_attack[cells], self.enemy_power[cells], self.enemy_range[cells], distance[alive])
+        self.hero_health[survivors], self.hero_armor[survivors] = take_damage(
+            self.hero_defense[survivors], self.hero_health[survivors], self.hero_armor[survivors], np.nan_to_num(damage))
+        self.results[survivors] = True
+        self.status[survivors[self.hero_health[survivors] <= 0]] = GAME_OVER
+
+    def _clear_enemies(self, games: np.ndarray, x: np.ndarray, y: np.ndarray):
+        """Removes enemies from the board. Their stats are zeroed, so the grids of stats are only set in
+        the positions of the enemies, which is what the observations need."""
+        self.kinds[games, x, y] = EMPTY
+
+        for grid in (self.enemy_health, self.enemy_armor, self.enemy_power, self.enemy_range, self.enemy_attack, self.enemy_defense):
+            grid[games, x, y] = 0
+
+    def _move_hero(self, games: np.ndarray, x: np.ndarray, y: np.ndarray):
+        self.kinds[games, self.hero_x[games], self.hero_y[games]] = EMPTY
+        self.kinds[games, x, y] = HERO
+        self.hero_x[games] = x
+        self.hero_y[games] = y
+
+    def _distances(self, games: np.ndarray) -> np.ndarray:
+        """Distances from the hero to every position of the board, in the games provided"""
+        x = self.hero_x[games].astype(np.int16)[:, None, None]
+        y = self.hero_y[games].astype(np.int16)[:, None, None]
+
+        return np.abs(self._xs - x) + np.abs(self._ys - y)
+
+    def _enemies_in_range(self, games: np.ndarray, distances: Optional[np.ndarray] = None) -> np.ndarray:
+        """Mask of the positions with enemies within the attack range of the hero, in the games provided"""
+        distances = self._distances(games) if distances is None else distances
+
+        return (self.kinds[games] == ENEMY) & (distances <= self.hero_range[games, None, None])
+
+    def _closest_enemies(self, games: np.ndarray) -> np.ndarray:
+        """Position of the closest enemy within the attack range of the hero, in the games provided, or
+        (-1, -1) if there isn't any. Ties are broken by position, just like in Board.enemies_in_range."""
+        targets = np.full((len(games), 2), -1, dtype=np.int64)
+        distances = self._distances(games)
+        in_range = self._enemies_in_range(games, distances).reshape(len(games), self.width * self.height)
+        found = in_range.any(axis=1)
+
+        cells = self.width * self.height
+        keys = np.where(in_range, distances.reshape(len(games), self.width * self.height).astype(np.int64) * cells + np.arange(cells), cells * cells * 2)
+        closest = np.argmin(keys, axis=1)
+        targets[found, 0], targets[found, 1] = np.divmod(closest[found], self.height)
+
+        return targets
+
+    def observations(self) -> np.ndarray:
+        """Returns the state of every game as a stack of grids, one per channel (see CHANNELS), with shape
+        (num_games, channels, width, height). Stats are only set in the positions of the units."""
+        observations = np.empty((self.num_games, len(self.CHANNELS), self.width, self.height), dtype=np.float32)
+
+        np.equal(self.kinds, HERO, out=observations[:, 0])
+        observations[:, 1] = 0
+        observations[self._games, 1, self.hero_x, self.hero_y] = self.hero_health
+        np.equal(self.kinds, ENEMY, out=observations[:, 2])
+        observations[:, 3] = self.enemy_health
+        observations[:, 4] = self.enemy_armor
+        observations[:, 5] = self.enemy_power
+        observations[:, 6] = self.enemy_range
+        np.equal(self.kinds, EXIT, out=observations[:, 7])
+
+        return observations
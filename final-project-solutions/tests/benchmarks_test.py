@@ -0,0 +1,56 @@
+import json
+
+from benchmarks.run import Comparison, compare, discover, load_baseline, main, measure, regressions, save_baseline
+
+
+def test_discover():
+    benchmarks = discover()
+    names = [benchmark.name for benchmark in benchmarks]
+
+    assert len(names) == len(set(names)), "Benchmark names should be unique"
+    assert all(name.startswith("bench_") for name in names), f"Every benchmark should come from a bench_ module: {names}"
+    assert "bench_board.BoardCreate.time_create(10, 0.05, False)" in names, \
+        f"Every combination of parameters should be a benchmark: {names}"
+
+    combat = discover("Combat")
+    assert combat and all("Combat" in benchmark.name for benchmark in combat), "Only matching benchmarks should be found"
+    assert discover("no benchmark has this name") == [], "Nothing should match an unknown pattern"
+
+def test_measure():
+    benchmark = discover("time_resolve(1000)")[0]
+    seconds = measure(benchmark, repeat=2, min_time=0.001)
+
+    assert 0 < seconds < 1, f"Resolving 1000 hits should take less than a second, not {seconds}"
+
+def test_regressions():
+    comparisons = compare({"a": 1.0, "b": 2.0, "c": 1.0}, {"a": 1.0, "b": 1.0, "d": 5.0})
+
+    assert comparisons == [Comparison("a", 1.0, 1.0), Comparison("b", 1.0, 2.0)], \
+        f"Only benchmarks in the baseline should be compared, not {comparisons}"
+    assert comparisons[1].ratio == 2.0, "The ratio should be the current time over the baseline"
+    assert regressions(comparisons, 0.25) == [comparisons[1]], "Benchmarks twice as slow should be regressions"
+    assert regressions(comparisons, 1.5) == [], "Nothing should be a regression with a large threshold"
+
+def test_baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+
+    assert load_baseline(path) == {}, "A missing baseline should be empty"
+
+    save_baseline(path, {"a": 1.0, "b": 2.0})
+    save_baseline(path, {"b": 3.0})
+
+    assert load_baseline(path) == {"a": 1.0, "b": 3.0}, "Saving should update the results, and keep the rest"
+    assert "machine" in json.loads(path.read_text()), "The machine should be stored with the results"
+
+def test_main(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+
+    assert main(["-k", "time_resolve(1000)", "--repeat", "1", "--baseline", str(path), "--save"]) == 0
+    assert list(load_baseline(path)) == ["bench_combat.BatchCombat.time_resolve(1000)"], "The result should be saved"
+
+    save_baseline(path, {"bench_combat.BatchCombat.time_resolve(1000)": 1e-12})
+    capsys.readouterr()
+
+    assert main(["-k", "time_resolve(1000)", "--repeat", "1", "--baseline", str(path)]) == 1, \
+        "Benchmarks much slower than the baseline should make the runner fail"
+    assert "REGRESSION" in capsys.readouterr().out, "Regressions should be reported"
@@ -3,8 +3,9 @@ import numpy as np
 from unittest import mock
 
 from questing import Board
-from questing import Position
-from questing import GameElement, Unit, Enemy, Hero
+from questing.board import diamond_mask, diamond_offsets
+from questing import CellKind, Position
+from questing import GameElement, Unit, Enemy, Hero, Warrior
 
 
 def EMPTY_BOARDS():
@@ -218,6 +219,42 @@ def test_is_enemy_with_enemy(board, enemy):
 
     assert is_enemy == True, f"Game element at {position} is an enemy"
 
+def test_kinds(board, enemy, hero, game_element):
+    board.place(enemy, Position(0, 1))
+    board.place(hero, Position(2, 3))
+    board.place(game_element, Position(4, 4))
+
+    assert board.kinds[0, 1] == CellKind.ENEMY, "Position (0, 1) should contain an enemy"
+    assert board.kinds[2, 3] == CellKind.HERO, "Position (2, 3) should contain a hero"
+    assert board.kinds[4, 4] == CellKind.OTHER, "Position (4, 4) should contain some other element"
+    assert board.count(CellKind.EMPTY) == board.num_empty_slots, "The empty count should match the number of empty slots"
+    assert board.positions(CellKind.ENEMY) == [Position(0, 1)], "There should be an enemy at (0, 1)"
+
+    board.clear(Position(0, 1))
+
+    assert board.kinds[0, 1] == CellKind.EMPTY, "Position (0, 1) should be empty after clearing it"
+    assert board.count(CellKind.ENEMY) == 0, "There should be no enemies left"
+    with pytest.raises(ValueError):
+        board.kinds[0, 0] = CellKind.WALL
+
+
+def test_subscribe(board, unit):
+    listener = mock.MagicMock()
+    unit.move.return_value = True
+    board.subscribe(listener)
+
+    board.place(unit, Position(0, 0))
+    board.move(unit, Position(0, 1))
+    board.unsubscribe(listener)
+    board.clear(Position(0, 1))
+
+    listener.assert_has_calls([
+        mock.call(Position(0, 0), None, unit),
+        mock.call(Position(0, 0), unit, None),
+        mock.call(Position(0, 1), None, unit),
+    ])
+    assert listener.call_count == 3, "Listener should not be called after unsubscribing"
+
 
 def _create_board_with_enemies(width: int, height: int, *enemy_positions: Position):
     board = Board(width=width, height=height)
@@ -345,6 +382,65 @@ def test_has_enemies_in_range(board, position, distance, expected_result):
 
     assert result == expected_result, f"Expected result for board.has_enemies_in_range with distance of {distance}: {expected_result}. Actual result: {result}"
 
+@pytest.mark.parametrize("distance", [1, 2, 3, 5, 8])
+def test_has_enemies_in_range_matches_brute_force(distance):
+    rng = np.random.RandomState(distance)
+    width, height = 9, 7
+    enemy_positions = {Position(int(x), int(y)) for x, y in zip(rng.randint(width, size=6), rng.randint(height, size=6))}
+    board = _create_board_with_enemies(width, height, *enemy_positions)
+
+    for x in range(width):
+        for y in range(height):
+            pos = Position(x, y)
+            expected = any(e != pos and pos.distance(e) <= distance for e in enemy_positions)
+
+            assert board.has_enemies_in_range(pos, distance) == expected, \
+                f"Wrong result for board.has_enemies_in_range({pos}, {distance})"
+
+            in_range = sorted((e for e in enemy_positions if e != pos and pos.distance(e) <= distance),
+                              key=lambda e: (pos.distance(e), e))
+            assert board.enemies_in_range(pos, distance) == in_range, \
+                f"Wrong result for board.enemies_in_range({pos}, {distance})"
+
+def test_diamond_mask():
+    mask = diamond_mask(2)
+    expected = np.array([
+        [0, 0, 1, 0, 0],
+        [0, 1, 1, 1, 0],
+        [1, 1, 0, 1, 1],
+        [0, 1, 1, 1, 0],
+        [0, 0, 1, 0, 0],
+    ], dtype=bool)
+
+    assert (mask == expected).all(), "Diamond mask of distance 2 doesn't have the expected shape"
+    assert diamond_mask(2) is mask, "Diamond masks should be cached"
+
+def test_diamond_offsets():
+    offsets = diamond_offsets(3)
+    mask = diamond_mask(3)
+
+    assert sorted(offsets) == sorted((x - 3, y - 3) for x, y in zip(*np.nonzero(mask))), \
+        "Diamond offsets should match the diamond mask"
+    assert [abs(dx) + abs(dy) for dx, dy in offsets] == sorted(abs(dx) + abs(dy) for dx, dy in offsets), \
+        "Diamond offsets should go from the closest to the furthest"
+
+def test_enemy_queries():
+    enemy_positions = [Position(5, 5), Position(1, 1), Position(7, 2), Position(5, 6)]
+    board = _create_board_with_enemies(10, 10, *enemy_positions)
+    position = Position(5, 4)
+
+    assert board.num_enemies == 4, "There should be 4 enemies in the board"
+    assert board.enemies_in_range(position, 2) == [Position(5, 5), Position(5, 6)], \
+        f"Enemies (5, 5) and (5, 6) should be in range 2 of {position}"
+    assert board.count_enemies_in_range(position, 4) == 3, f"There should be 3 enemies in range 4 of {position}"
+    assert board.nearest_enemies(position, k=3) == [Position(5, 5), Position(5, 6), Position(7, 2)], \
+        f"Wrong nearest enemies to {position}"
+
+    board.clear(Position(5, 5))
+
+    assert board.num_enemies == 3, "There should be 3 enemies in the board after clearing one"
+    assert board.nearest_enemies(position) == [Position(5, 6)], f"Enemy at (5, 6) should be the closest to {position}"
+
 def _get_full_board(width, height):
     b = Board(width=width, height=height)
 
@@ -380,45 +476,172 @@ def test_get_empty_slot(board):
     empty_slots = board.empty_slots
 
     idx = np.random.randint(len(empty_slots))
+    rng = mock.MagicMock()
+    rng.integers.return_value = idx
 
-    with mock.patch("numpy.random.randint", return_value=idx):
-        result = board.get_empty_slot()
+    result = board.get_empty_slot(rng=rng)
 
     assert result == empty_slots[idx], f"The returned empty slot should have been the one at index {idx}: Position{empty_slots[idx]}"
 
 def test_create(hero, board):
     width = board.width
     height = board.height
-    board.place(hero, Position(0, 0))
     num_enemies = 3
     min_level = 1
     max_level = 5
-    # We'll be creating a board of the same width and height, so initially the empty slots will be the same
-    empty_slots = board.empty_slots
-    expected_enemy_positions = []
     enemies = []
 
-    def create_enemy(level):
-        enemy = mock.MagicMock(spec=Enemy)
-        enemy.name = f"Enemy {len(enemies) + 1}"
-        # Add the expected position and enemy to the lists, so that we can check later
-        expected_enemy_positions.append(empty_slots.pop(0))
-        enemies.append(enemy)
+    def create_enemies(levels, rng):
+        for level in levels:
+            enemy = mock.MagicMock(spec=Enemy)
+            enemy.name = f"Enemy {len(enemies) + 1}"
+            enemy.level = level
+            # Add the enemy to the list, so that we can check later
+            enemies.append(enemy)
 
-        return enemy
+        return enemies
 
-    with mock.patch("questing.Enemy.random_enemy", side_effect=create_enemy) as rand_enemy:
-        # For every enemy, there are two calls to np.random.randint
-        # The first one is to determine the empty slot index, while
-        # the second one is to determine the level of the enemy created.
-        with mock.patch("numpy.random.randint", side_effect=[0, 1, 0, 2, 0, 3]):
-            generated_board = Board.create(hero=hero, width=width, height=height, num_enemies=num_enemies, min_level=min_level, max_level=max_level)
+    with mock.patch("questing.Enemy.random_enemies", side_effect=create_enemies) as rand_enemies:
+        generated_board = Board.create(hero=hero, width=width, height=height, num_enemies=num_enemies, min_level=min_level, max_level=max_level)
 
     assert generated_board.width == width, f"Generated board should have a width of {width}"
     assert generated_board.height == height, f"Generated board should have a height of {height}"
     assert generated_board.get(Position(0, 0)) == hero, f"Hero should be placed in position (0, 0) in the board"
 
-    rand_enemy.assert_has_calls([mock.call(1), mock.call(2), mock.call(3)])
-    for idx, pos in enumerate(expected_enemy_positions):
+    rand_enemies.assert_called_once()
+    assert rand_enemies.call_args.kwargs["rng"] is not None, "Enemies should be created with a random generator"
+    assert len(enemies) == num_enemies, f"{num_enemies} enemies should have been created"
+    assert len({enemy.position for enemy in enemies}) == num_enemies, "Every enemy should be placed in a different position"
+    for enemy in enemies:
+        pos = enemy.position
+        assert min_level <= enemy.level <= max_level, f"Enemy level should be between {min_level} and {max_level}"
         assert generated_board.is_enemy(pos), f"There should be an enemy at position {pos}"
-        assert generated_board.get(pos) == enemies[idx], f"Enemy at position {pos} should be {enemies[idx].name}"
+        assert generated_board.get(pos) == enemy, f"Enemy at position {pos} should be {enemy.name}"
+    assert generated_board.num_empty_slots == width * height - num_enemies - 2, \
+        f"The board should have {width * height - num_enemies - 2} empty slots left"
+    assert generated_board.num_enemies == num_enemies, f"The board should have {num_enemies} enemies"
+
+def test_create_is_reproducible():
+    boards = [Board.create(hero=Warrior(name="Test"), width=8, height=8, num_enemies=20, rng=np.random.default_rng(3))
+              for _ in range(2)]
+
+    assert boards[0].positions(CellKind.ENEMY) == boards[1].positions(CellKind.ENEMY), \
+        "Boards created with the same seed should have enemies in the same positions"
+    for pos in boards[0].positions(CellKind.ENEMY):
+        assert str(boards[0][pos]) == str(boards[1][pos]), f"Boards created with the same seed should have the same enemy at {pos}"
+
+def test_empty_slots_are_updated(board, unit):
+    unit.move.return_value = True
+    origin = Position(0, 0)
+    destination = Position(1, 1)
+    expected_slots = board.width * board.height
+    board.place(unit, origin)
+
+    assert board.num_empty_slots == expected_slots - 1, "Placing an element should take one empty slot"
+    assert origin not in board.empty_slots, f"Position {origin} should not be empty after placing an element"
+
+    board.move(unit, destination)
+
+    assert board.num_empty_slots == expected_slots - 1, "Moving an element should not change the number of empty slots"
+    assert origin in board.empty_slots, f"Position {origin} should be empty after moving the element away"
+    assert destination not in board.empty_slots, f"Position {destination} should not be empty after moving the element"
+
+    board.clear(destination)
+    board.clear(destination)
+
+    assert board.num_empty_slots == expected_slots, "Clearing the same position twice should only free it once"
+    assert sorted(board.empty_slots) == sorted(Position(x, y) for x in range(board.width) for y in range(board.height))
+
+@pytest.mark.parametrize("num_enemies", [0, 10, 23, 100])
+def test_create_with_real_enemies(num_enemies):
+    width, height = 5, 5
+    hero = Warrior(name="Test")
+
+    board = Board.create(hero=hero, width=width, height=height, num_enemies=num_enemies)
+    expected_enemies = min(num_enemies, width * height - 2)
+
+    assert board.num_enemies == expected_enemies, f"The board should have {expected_enemies} enemies"
+    assert board.num_empty_slots == width * height - 2 - expected_enemies, "Wrong number of empty slots"
+    assert board.count(CellKind.ENEMY) == expected_enemies, f"The kinds grid should have {expected_enemies} enemies"
+    assert sorted(board.empty_slots) == sorted(board.positions(CellKind.EMPTY)), "Empty slots should match the kinds grid"
+    for pos in board.positions(CellKind.ENEMY):
+        assert board.get(pos).position == pos, f"Enemy at {pos} should know its position"
+
+def _reachable_brute_force(board, position, speed):
+    reached = {position: 0}
+    frontier = [position]
+
+    while frontier:
+        current = frontier.pop(0)
+        if reached[current] == speed:
+            continue
+        for step in [Position(current.x + 1, current.y), Position(current.x - 1, current.y),
+                     Position(current.x, current.y + 1), Position(current.x, current.y - 1)]:
+            if board.is_valid(step) and board.is_empty(step) and step not in reached:
+                reached[step] = reached[current] + 1
+                frontier.append(step)
+
+    return sorted(p for p in reached if p != position)
+
+def test_reachable_in_open_board():
+    board = Board(width=9, height=9)
+    hero = Warrior(name="Test")
+    board.place(hero, Position(4, 4))
+    hero.speed = 2
+
+    reachable = board.reachable(hero)
+
+    assert len(reachable) == 12, "A unit with speed 2 should reach 12 positions in an open board"
+    assert Position(4, 4) not in reachable, "The position of the unit shouldn't be included"
+    assert reachable == sorted(reachable), "Reachable positions should be sorted"
+
+@pytest.mark.parametrize("seed", range(10))
+def test_reachable_around_obstacles(seed):
+    board = Board.create(hero=Warrior(name="Test"), width=10, height=8, num_enemies=30, rng=np.random.default_rng(seed))
+    hero = board.get(Position(0, 0))
+
+    for speed in range(5):
+        hero.speed = speed
+        assert board.reachable(hero) == _reachable_brute_force(board, hero.position, speed), \
+            f"Reachable positions with speed {speed} should go around the enemies"
+
+def test_reachable_is_cached_until_nearby_changes():
+    board = Board(width=9, height=9)
+    hero = Warrior(name="Test")
+    board.place(hero, Position(4, 4))
+    hero.speed = 2
+    reachable = board.reachable(hero)
+
+    with mock.patch.object(board, "_compute_reachable", wraps=board._compute_reachable) as compute:
+        board.reachable(hero)
+        assert compute.call_count == 0, "The reachable positions should be cached"
+
+        board.place(Warrior(name="Far"), Position(8, 8))
+        board.reachable(hero)
+        assert compute.call_count == 0, "Changes out of reach shouldn't invalidate the cache"
+
+        board.place(Warrior(name="Close"), Position(4, 5))
+        new_reachable = board.reachable(hero)
+        assert compute.call_count == 1, "Changes within reach should invalidate the cache"
+
+    assert Position(4, 5) not in new_reachable and Position(4, 6) not in new_reachable, \
+        "The unit shouldn't be able to go through the new unit"
+    assert len(new_reachable) == len(reachable) - 2, "Only the positions behind the new unit should be lost"
+
+def test_reachable_cache_index():
+    board = Board(width=9, height=9)
+    units = [Warrior(name=f"Test {x}") for x in range(0, 9, 3)]
+
+    with mock.patch("questing.board.REACHABLE_CACHE_SIZE", 2):
+        for x, unit in zip(range(0, 9, 3), units):
+            board.place(unit, Position(x, 0))
+            unit.speed = 2
+            board.reachable(unit)
+
+    keys = set().union(*board._reachable_by_slot.values())
+    assert keys == set(board._reachable) == {(Position(3, 0), 2), (Position(6, 0), 2)}, \
+        "Only the cached sets should be indexed"
+
+    board.place(Warrior(name="Close"), Position(7, 1))
+    assert set().union(*board._reachable_by_slot.values()) == set(board._reachable) == {(Position(3, 0), 2)}, \
+        "Changes within reach should drop the cached sets from the index too"
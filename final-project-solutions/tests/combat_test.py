@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from questing import Apprentice, Archer, AttackKind, DefenseKind, Mage, Position, Rogue, Swordsman, Warrior
+from questing.combat import attack_kind, defense_kind, hit_power, resolve, resolve_table
+from questing.logger import quiet
+from questing.unit_table import UnitTable
+
+UNITS = [
+    lambda level: Warrior(name="Hero"),
+    lambda level: Rogue(name="Hero"),
+    lambda level: Mage(name="Hero"),
+    Archer.create,
+    Swordsman.create,
+    Apprentice.create,
+]
+
+
+@pytest.mark.parametrize("unit, attack, defense", [
+    (Warrior, AttackKind.MELEE, DefenseKind.ARMORED),
+    (Rogue, AttackKind.RANGED, DefenseKind.PLAIN),
+    (Mage, AttackKind.MAGIC, DefenseKind.BARRIER),
+    (Archer, AttackKind.RANGED, DefenseKind.PLAIN),
+    (Swordsman, AttackKind.MELEE, DefenseKind.ARMORED),
+    (Apprentice, AttackKind.MAGIC, DefenseKind.BARRIER),
+])
+def test_kinds(unit, attack, defense):
+    assert attack_kind(unit) == attack, f"{unit.__name__} should have {attack.name} attack"
+    assert defense_kind(unit) == defense, f"{unit.__name__} should have {defense.name} defense"
+    assert attack_kind(Warrior(name="Hero")) == AttackKind.MELEE, "Kinds should work with instances too"
+
+def test_kinds_of_unknown_classes():
+    with pytest.raises(ValueError):
+        attack_kind(Position)
+
+    with pytest.raises(ValueError):
+        defense_kind(Position)
+
+@pytest.mark.parametrize("kind, distance, expected", [
+    (AttackKind.MELEE, 0, 5), (AttackKind.MELEE, 1, 5), (AttackKind.MELEE, 2, None),
+    (AttackKind.RANGED, 1, 3), (AttackKind.RANGED, 2, 5), (AttackKind.RANGED, 3, 5), (AttackKind.RANGED, 4, None),
+    (AttackKind.MAGIC, 1, 5), (AttackKind.MAGIC, 3, 5), (AttackKind.MAGIC, 4, None),
+])
+def test_hit_power(kind, distance, expected):
+    power = hit_power(np.array([kind]), np.array([5]), np.array([3]), np.array([distance]))[0]
+
+    if expected is None:
+        assert np.isnan(power), f"{kind.name} attacks shouldn't reach a distance of {distance}"
+    else:
+        assert power == expected, f"{kind.name} attacks at a distance of {distance} should hit with {expected}"
+
+def test_barrier_breaks_over_several_hits():
+    result = resolve(kind=[AttackKind.MELEE] * 3, power=[2, 2, 2], attack_range=[0] * 3, distance=[1] * 3,
+                     target=[0] * 3, defense=[DefenseKind.BARRIER], health=[3], armor=[3])
+
+    assert result.health.tolist() == [0], "The barrier should absorb the first 3 points of damage"
+    assert result.armor.tolist() == [0], "The barrier should be broken"
+    assert result.destroyed.tolist() == [False, False, True], "Only the last attack should destroy the target"
+
+def test_input_arrays_are_not_modified():
+    health, armor = np.array([5.0]), np.array([1.0])
+
+    resolve(kind=[AttackKind.MELEE], power=[3], attack_range=[0], distance=[1], target=[0],
+            defense=[DefenseKind.BARRIER], health=health, armor=armor)
+
+    assert health.tolist() == [5.0] and armor.tolist() == [1.0], "resolve shouldn't modify its inputs"
+
+@pytest.mark.parametrize("seed", range(5))
+def test_same_as_attacking_one_by_one(seed):
+    rng = np.random.default_rng(seed)
+    num_units, num_attacks = 20, 100
+
+    with quiet():
+        units = [UNITS[idx](level) for idx, level in zip(rng.integers(len(UNITS), size=num_units).tolist(),
+                                                          rng.integers(1, 6, size=num_units).tolist())]
+        for unit in units:
+            unit.position = Position(*rng.integers(4, size=2).tolist())
+
+        defense = [defense_kind(unit) for unit in units]
+        health = [unit.health for unit in units]
+        armor = [getattr(unit, "armor", 0) for unit in units]
+        attackers = rng.integers(num_units, size=num_attacks)
+        # Few targets, so that they take many hits each
+        targets = rng.integers(5, size=num_attacks)
+
+        result = resolve(kind=[attack_kind(units[a]) for a in attackers], power=[units[a].power for a in attackers],
+                         attack_range=[getattr(units[a], "attack_range", 0) for a in attackers],
+                         distance=[units[a].position.distance(units[t].position) for a, t in zip(attackers, targets)],
+                         target=targets, defense=defense, health=health, armor=armor)
+
+        destroyed = [units[a].attack(units[t]) for a, t in zip(attackers, targets)]
+
+    assert result.destroyed.tolist() == destroyed, "Every attack should have the same outcome"
+    assert result.health.tolist() == [unit.health for unit in units], "Health should be the same"
+    assert result.armor.tolist() == [getattr(unit, "armor", 0) for unit in units], "Armor should be the same"
+
+def test_resolve_table():
+    table = UnitTable()
+    rows = table.add(kinds=[0, 1, 2, 2], levels=[3, 3, 3, 1])
+
+    with quiet():
+        views = [table[row] for row in rows]
+        enemies = [enemy_class.create(level=level) for enemy_class, level in
+                   [(Archer, 3), (Swordsman, 3), (Apprentice, 3), (Apprentice, 1)]]
+
+        for idx, position in enumerate([Position(0, 0), Position(0, 1), Position(1, 1), Position(3, 1)]):
+            views[idx].position = enemies[idx].position = position
+
+        attackers, targets = [0, 1, 2, 3, 0, 0], [1, 0, 1, 2, 2, 3]
+        result = resolve_table(table, attackers, targets)
+        destroyed = [enemies[a].attack(enemies[t]) for a, t in zip(attackers, targets)]
+
+    assert result.destroyed.tolist() == destroyed, "Every attack should have the same outcome"
+    for view, enemy in zip(views, enemies):
+        assert view.health == enemy.health, "The table should be updated with the new health"
+        assert getattr(view, "armor", 0) == getattr(enemy, "armor", 0), "The table should be updated with the new armor"
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from questing import Archer, Board, Position, Wall, Warrior
+from questing.distance_field import DistanceField
+from questing.logger import quiet
+
+
+def test_distances():
+    passable = np.ones((4, 3), dtype=bool)
+    passable[1, 0:2] = False
+    field = DistanceField(passable, sources=[Position(0, 0)])
+
+    assert field.distance(Position(0, 0)) == 0, "Sources are at a distance of 0"
+    assert field.distance(Position(0, 2)) == 2, "Distances should be Manhattan distances when nothing is in the way"
+    assert field.distance(Position(2, 0)) == 6, "Obstacles should be walked around"
+    assert field.distance(Position(1, 0)) is None, "Obstacles don't have a distance"
+
+def test_unreachable():
+    passable = np.ones((3, 3), dtype=bool)
+    passable[1, :] = False
+    field = DistanceField(passable, sources=[Position(0, 0)])
+
+    assert field.distance(Position(2, 2)) is None, "Positions that can't reach the source don't have a distance"
+    assert field.next_step(Position(2, 2)) is None, "There is no next step when the source can't be reached"
+    assert field.as_array()[2].tolist() == [-1, -1, -1], "Unreachable positions should be -1 in the array"
+
+def test_next_step():
+    field = DistanceField(np.ones((3, 3), dtype=bool), sources=[Position(2, 2)])
+
+    assert field.next_step(Position(0, 0)) == Position(0, 1), "Moving up should be preferred"
+    assert field.next_step(Position(0, 2)) == Position(1, 2), "The next step should get closer to the source"
+    assert field.next_step(Position(2, 2)) is None, "There is no next step from the source"
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_repairs(seed):
+    rng = np.random.default_rng(seed)
+    passable = rng.random((12, 9)) < 0.75
+    sources = [Position(11, 8)]
+    passable[11, 8] = True
+    field = DistanceField(passable, sources=sources)
+
+    for _ in range(200):
+        x, y = rng.integers(12).item(), rng.integers(9).item()
+        passable[x, y] = not passable[x, y]
+        field.set_passable(Position(x, y), passable[x, y])
+
+        expected = DistanceField(passable, sources=sources).as_array()
+        assert np.array_equal(field.as_array(), expected), "Repaired distances should be the same as recomputing them"
+
+def test_vectorized_search(monkeypatch):
+    passable = np.random.default_rng(0).random((30, 20)) < 0.7
+    passable[0, 0] = True
+    expected = DistanceField(passable, sources=[Position(0, 0)]).as_array()
+
+    monkeypatch.setattr("questing.distance_field.VECTORIZED_BFS_SIZE", 0)
+
+    assert np.array_equal(DistanceField(passable, sources=[Position(0, 0)]).as_array(), expected), \
+        "Both searches should compute the same distances"
+
+def test_board_distance_to_exit():
+    with quiet():
+        board = Board.create(hero=Warrior(name="Hero"), width=6, height=6, num_enemies=0, rng=np.random.default_rng(0))
+
+        assert board.distance_to_exit(Position(0, 0)) == 10, "The hero should be 10 steps away from the exit"
+        assert board.next_step_towards_exit(Position(0, 0)) == Position(0, 1), "The hero should move up first"
+
+        board.place(Archer.create(level=1), Position(0, 1))
+
+        assert board.next_step_towards_exit(Position(0, 0)) == Position(1, 0), "The hero should go around the archer"
+
+        for y in range(1, 6):
+            board.place(Wall(), Position(1, y))
+
+        assert board.distance_to_exit(Position(0, 0)) == 10, "The hero can still go through (1, 0)"
+
+        board.place(Archer.create(level=1), Position(1, 0))
+
+        assert board.distance_to_exit(Position(0, 0)) is None, "The hero shouldn't be able to reach the exit"
+
+        board.clear(Position(0, 1))
+
+        assert board.distance_to_exit(Position(0, 0)) is None, "The hero is still blocked by the walls"
+
+        board.clear(Position(1, 3))
+
+        assert board.distance_to_exit(Position(0, 0)) == 10, "The hero should be able to get through the gap"
+
+def test_board_distance_to_moved_exit():
+    with quiet():
+        board = Board.create(hero=Warrior(name="Hero"), width=6, height=6, num_enemies=0, rng=np.random.default_rng(0))
+
+        assert board.distance_to_exit(Position(0, 0)) == 10, "The hero should be 10 steps away from the exit"
+
+        exit_portal = board.get(Position(5, 5))
+        board.clear(Position(5, 5))
+        board.place(exit_portal, Position(0, 3))
+
+        assert board.distance_to_exit(Position(0, 0)) == 3, "Distances should follow the exit"
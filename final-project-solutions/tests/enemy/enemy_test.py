@@ -8,10 +8,22 @@ def test_create_random_enemy():
     enemy_mock = mock.MagicMock(spec=Enemy)
     enemy_class_mock.create.return_value = enemy_mock
     expected_classes = [Archer, Swordsman, Apprentice]
-    with mock.patch("numpy.random.choice", return_value=enemy_class_mock) as np_mock:
-        enemy = Enemy.random_enemy(level=3)
+    rng = mock.MagicMock()
+    rng.choice.return_value = enemy_class_mock
 
-    np_mock.assert_called_once_with(expected_classes)
+    enemy = Enemy.random_enemy(level=3, rng=rng)
+
+    rng.choice.assert_called_once_with(expected_classes)
     enemy_class_mock.create.assert_called_once_with(level=3)
     assert enemy == enemy_mock, "The result of [EnemyClass].create have been returned"
 
+
+def test_create_random_enemies():
+    levels = [1, 3, 2, 2]
+
+    enemies = Enemy.random_enemies(levels)
+
+    assert len(enemies) == len(levels), f"{len(levels)} enemies should have been created"
+    for enemy, level in zip(enemies, levels):
+        assert isinstance(enemy, (Archer, Swordsman, Apprentice)), f"{enemy} should be an Archer, Swordsman or Apprentice"
+        assert enemy.level == level, f"Enemy level should be {level}, but it was {enemy.level}"
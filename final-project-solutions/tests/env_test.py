@@ -0,0 +1,126 @@
+import pytest
+import numpy as np
+
+from questing import CellKind, GameActions, GameStatus, Mage, Position
+from questing.env import QuestingEnv
+from questing.logger import quiet
+from questing.vector import ACTIONS
+
+
+def _encode_by_hand(game):
+    """Encodes the board position by position, which is what the environment avoids"""
+    board = game.board
+    observation = np.zeros((len(QuestingEnv.CHANNELS), board.width, board.height), dtype=np.int32)
+    # Views of unit tables aren't instances of the enemy classes, but they have the same short text
+    codes = {"A": 1, "S": 2, "M": 3}
+
+    for x in range(board.width):
+        for y in range(board.height):
+            element = board.get(Position(x, y))
+            kind = board.kinds[x, y]
+
+            if kind == CellKind.HERO:
+                observation[0, x, y] = 1
+                observation[4, x, y] = np.ceil(max(element.health, 0))
+            elif kind == CellKind.EXIT:
+                observation[1, x, y] = 1
+            elif kind == CellKind.ENEMY:
+                observation[2, x, y] = codes[element.short_text]
+                observation[3, x, y] = element.level
+                observation[4, x, y] = np.ceil(element.health)
+
+    return observation
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_observations_match_the_board(compact):
+    env = QuestingEnv(hero_cls=Mage, width=8, height=6, num_enemies=20, compact=compact)
+    observation, info = env.reset(seed=0)
+    rng = np.random.default_rng(0)
+
+    assert observation.shape == env.observation_shape, "Observations should have one grid per channel"
+
+    for _ in range(30):
+        assert (observation == _encode_by_hand(env.game)).all(), "The observation should encode the board"
+
+        available = np.flatnonzero(info["action_mask"])
+        if not len(available):
+            break
+
+        observation, _, terminated, _, info = env.step(int(rng.choice(available)))
+
+def test_compact_and_regular_boards_are_encoded_the_same():
+    observations = [QuestingEnv(num_enemies=30, compact=compact).reset(seed=3)[0] for compact in (False, True)]
+
+    assert (observations[0] == observations[1]).all(), "The same game should have the same observation"
+
+def test_reset_is_reproducible():
+    env = QuestingEnv()
+    first, _ = env.reset(seed=1)
+    env.reset()
+    again, _ = env.reset(seed=1)
+
+    assert (first == again).all(), "Resetting with the same seed should start the same game"
+
+def test_action_mask():
+    env = QuestingEnv(num_enemies=30)
+    _, info = env.reset(seed=2)
+    available = env.game.available_actions()
+
+    assert info["action_mask"].tolist() == [action in available for action in ACTIONS], \
+        "The mask should have the available actions"
+
+def test_unavailable_action_does_nothing():
+    env = QuestingEnv(num_enemies=0)
+    observation, _ = env.reset(seed=0)
+    after, reward, terminated, truncated, info = env.step(ACTIONS.index(GameActions.MOVE_DOWN))
+
+    assert not info["success"], "Moving out of the board should fail"
+    assert (after == observation).all() and reward == 0, "Unavailable actions shouldn't change anything"
+
+@pytest.mark.parametrize("action", [-1, len(ACTIONS)])
+def test_actions_out_of_range_do_nothing(action):
+    env = QuestingEnv(width=2, height=2, num_enemies=0)
+    observation, _ = env.reset(seed=0)
+    after, reward, terminated, truncated, info = env.step(action)
+
+    assert not info["success"], f"Action {action} isn't an action"
+    assert (after == observation).all() and reward == 0, "Actions out of range shouldn't change anything"
+    assert info["status"] == GameStatus.PLAYING and not terminated, "Actions out of range shouldn't finish the game"
+
+def test_attack_targets_the_closest_enemy():
+    env = QuestingEnv(num_enemies=60, max_level=1)
+    env.reset(seed=4)
+
+    with quiet():
+        while not env.action_mask()[ACTIONS.index(GameActions.ATTACK)]:
+            env.step(int(np.flatnonzero(env.action_mask())[0]))
+
+    target = env.game.attack_targets()[0]
+    health = env.game.board.get(target).health
+    _, _, _, _, info = env.step(ACTIONS.index(GameActions.ATTACK))
+
+    enemy = env.game.board.get(target)
+    assert info["success"], "The attack should be performed"
+    assert enemy is None or enemy.health < health or env.game.hero.position == target, "The closest enemy should be attacked"
+
+def test_win_and_truncation():
+    env = QuestingEnv(width=3, height=3, num_enemies=0, max_steps=4)
+    env.reset(seed=0)
+    rewards = []
+
+    for action in (GameActions.MOVE_UP, GameActions.MOVE_RIGHT, GameActions.MOVE_UP, GameActions.EXIT, GameActions.EXIT):
+        _, reward, terminated, truncated, info = env.step(ACTIONS.index(action))
+        rewards.append(reward)
+
+    assert rewards == [0, 0, 0, QuestingEnv.WIN_REWARD, 0], "Only the step that wins the game should be rewarded"
+    assert terminated and not truncated and info["status"] == GameStatus.WON, "The game should be won"
+
+    env.reset()
+    for _ in range(4):
+        _, _, terminated, truncated, _ = env.step(ACTIONS.index(GameActions.MOVE_UP))
+
+    assert truncated and not terminated, "The game should be cut short after max_steps"
+
+def test_step_needs_reset():
+    with pytest.raises(RuntimeError):
+        QuestingEnv().step(0)
@@ -1,11 +1,15 @@
 import pytest
+import numpy as np
 
 from unittest import mock
 
 from questing import Board
 from questing import Game, GameStatus, GameActions
-from questing import Hero
-from questing import Position
+from questing.game import ACTION_BITS
+from questing import Archer, Hero, Mage, Rogue, Warrior
+from questing import CellKind, Position
+from questing.logger import quiet
+from questing.sim import random_policy
 
 @pytest.fixture
 def hero():
@@ -55,7 +59,15 @@ def test_game_creation_sets_board(hero, board_cls, board):
     game = get_game(hero=hero, board_cls=board_cls, width=board_width, height=board_height, num_enemies=num_enemies, min_level=min_level, max_level=max_level)
 
     assert game.board == board, f"Game board should be set"
-    board_cls.create.assert_called_once_with(hero=hero, width=board_width, height=board_height, num_enemies=num_enemies, min_level=min_level, max_level=max_level)
+    board_cls.create.assert_called_once_with(hero=hero, width=board_width, height=board_height, num_enemies=num_enemies, min_level=min_level, max_level=max_level, rng=game.rng, compact=False)
+
+def test_game_creation_with_rng(hero, board_cls):
+    rng = np.random.default_rng(0)
+
+    game = Game(hero=hero, board_cls=board_cls, width=4, height=4, num_enemies=4, rng=rng)
+
+    assert game.rng is rng, "Game should use the random generator provided"
+    assert board_cls.create.call_args.kwargs["rng"] is rng, "The board should be created with the game random generator"
 
 def test_game_starts_in_playing_status(hero, board_cls):
     game = get_game(hero=hero, board_cls=board_cls)
@@ -158,6 +170,57 @@ def test_available_actions_with_exit_portal(game, board, hero):
 
     assert GameActions.EXIT in available_actions, f"GameActions.EXIT should be in the available actions"
 
+def test_attack_targets(game, board, hero):
+    hero.attack_range = 2
+    targets = [Position(0, 1), Position(1, 1)]
+    board.enemies_in_range.return_value = targets
+
+    result = game.attack_targets()
+
+    assert result == targets, "The attack targets should be the enemies in range of the hero"
+    board.enemies_in_range.assert_called_once_with(hero.position, 2)
+
+def test_attack_targets_with_game_finished(game, board):
+    game.status = GameStatus.GAME_OVER
+
+    assert game.attack_targets() == [], "There should be no attack targets when the game is not in PLAYING status"
+
+def test_available_actions_are_cached(game, board, hero):
+    board.is_valid.return_value = True
+    board.has_enemies_in_range.return_value = False
+
+    first = game.available_actions()
+    second = game.available_actions()
+
+    assert first == second, "Available actions should not change if nothing changes"
+    board.has_enemies_in_range.assert_called_once_with(hero.position, 1)
+
+    hero.position = Position(1, 1)
+    game.available_actions()
+
+    assert board.has_enemies_in_range.call_count == 2, "Available actions should be recomputed when the hero moves"
+
+def test_available_actions_cache_is_invalidated_by_board_changes():
+    hero = Rogue(name="Test")
+    game = Game(hero=hero, width=8, height=8, num_enemies=0, rng=np.random.default_rng(0))
+    enemy = Archer.create(level=1)
+
+    assert GameActions.ATTACK not in game.available_actions(), "There are no enemies to attack"
+
+    game.board.place(enemy, Position(5, 5))
+
+    assert GameActions.ATTACK not in game.available_actions(), "Enemies far from the hero don't affect the available actions"
+
+    game.board.place(Archer.create(level=1), Position(0, 1))
+
+    assert GameActions.MOVE_UP not in game.available_actions(), "The hero can't move into an enemy"
+    assert GameActions.ATTACK in game.available_actions(), "The hero should be able to attack the new enemy"
+
+    game.board.clear(Position(0, 1))
+
+    assert game.available_actions() == [GameActions.MOVE_UP, GameActions.MOVE_RIGHT], \
+        "The hero should be able to move up again after the enemy is removed"
+
 # Tests for the "do" method
 
 @pytest.fixture(params=[s for s in GameStatus if s != GameStatus.PLAYING])
@@ -338,3 +401,243 @@ def test_available_actions_occupied_slot(game, board):
 
     assert GameActions.MOVE_UP not in available_actions, f"GameActions.MOVE_UP should not be in the available actions"
     board.is_valid.assert_any_call(up_position)
+
+# Tests for snapshots
+
+def _state(game):
+    """Everything that can change while playing a game"""
+    board = game.board
+    cells = [(x, y, id(board.get(Position(x, y))) if board.units is None else str(board.get(Position(x, y))))
+             for x in range(board.width) for y in range(board.height)]
+    units = [(str(unit), unit.position, unit.health, getattr(unit, "armor", None))
+             for unit in [game.hero] + [board.get(p) for p in board.positions(CellKind.ENEMY)]]
+
+    return (game.status, cells, units, sorted(board.empty_slots), board.num_enemies, board.kinds.tobytes(),
+            game.available_actions())
+
+def _play(game, rng, steps):
+    for _ in range(steps):
+        decision = random_policy(game, rng)
+        if decision is None:
+            break
+        game.do(*decision)
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("compact", [False, True])
+def test_snapshot_restore(seed, compact):
+    rng = np.random.default_rng(seed)
+
+    with quiet():
+        game = Game(hero=Rogue(name="Test"), width=6, height=6, num_enemies=12, rng=rng, compact=compact, enemy_phase=True)
+        _play(game, rng, 3)
+        state = _state(game)
+        snapshot = game.snapshot()
+
+        for _ in range(5):
+            _play(game, rng, 20)
+            game.restore(snapshot)
+
+            assert _state(game) == state, "Restoring a snapshot should bring back the state of the game"
+
+def test_restored_game_plays_the_same():
+    rng = np.random.default_rng(4)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng)
+        snapshot = game.snapshot()
+        _play(game, np.random.default_rng(0), 50)
+        final = _state(game)
+
+        game.restore(snapshot)
+        _play(game, np.random.default_rng(1), 50)
+        game.restore(snapshot)
+        _play(game, np.random.default_rng(0), 50)
+
+    assert _state(game) == final, "A restored game should play exactly like the original one"
+
+def test_nested_snapshots():
+    rng = np.random.default_rng(1)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng)
+        first = game.snapshot()
+        first_state = _state(game)
+        _play(game, rng, 5)
+        second = game.snapshot()
+        second_state = _state(game)
+        _play(game, rng, 5)
+
+        game.restore(second)
+        assert _state(game) == second_state, "The second snapshot should be restored"
+
+        game.restore(first)
+        assert _state(game) == first_state, "The first snapshot should be restored"
+
+        with pytest.raises(ValueError):
+            game.restore(second)
+
+def test_discard_snapshot():
+    rng = np.random.default_rng(1)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng)
+        snapshot = game.snapshot()
+        _play(game, rng, 5)
+        game.discard(snapshot)
+        _play(game, rng, 5)
+
+    assert game._journal == [], "No changes should be journaled without snapshots"
+    with pytest.raises(ValueError):
+        game.restore(snapshot)
+
+def test_snapshot_journal_only_has_the_changes():
+    rng = np.random.default_rng(2)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=200, height=200, num_enemies=1000, rng=rng)
+        game.snapshot()
+        game.do(game.available_actions()[0])
+
+    assert len(game._journal) <= 3, "Only the positions and units that changed should be saved"
+
+# Tests for undo and redo
+
+def _play_recording(game, rng, steps):
+    """Plays a game, returning the states before every action and after the last one"""
+    states = [_state(game)]
+
+    for _ in range(steps):
+        decision = random_policy(game, rng)
+        if decision is None:
+            break
+        game.do(*decision)
+        states.append(_state(game))
+
+    return states
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("hero_cls", [Warrior, Mage])
+def test_undo_redo(seed, hero_cls):
+    rng = np.random.default_rng(seed)
+
+    with quiet():
+        game = Game(hero=hero_cls(name="Test"), width=6, height=6, num_enemies=12, rng=rng, enemy_phase=True, undo_limit=None)
+        states = _play_recording(game, rng, 30)
+        steps = len(states) - 1
+
+        for undone in range(1, steps + 1):
+            assert game.undo() == 1, "Every action should be undone"
+            assert _state(game) == states[-1 - undone], f"Undoing {undone} actions should bring back the state before them"
+
+        assert game.undo() == 0, "There should be nothing left to undo"
+        assert game.redo(steps) == steps, "Every undone action should be redone"
+        assert _state(game) == states[-1], "Redoing the actions should bring back the final state"
+
+def test_undo_limit():
+    rng = np.random.default_rng(4)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng, undo_limit=3)
+        states = _play_recording(game, rng, 10)
+        assert len(states) == 11, "The game should last at least 10 actions"
+        assert len(game._journal) <= 3 * 3, "The journal should only keep the changes of the last actions"
+
+        assert game.undo(5) == 3, "Only the last undo_limit actions can be undone"
+        assert _state(game) == states[-4], "The state before the last 3 actions should be restored"
+
+def test_undo_disabled():
+    rng = np.random.default_rng(3)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng)
+        _play_recording(game, rng, 5)
+
+    assert game.undo() == 0, "Actions can't be undone without undo_limit"
+    assert game._journal == [], "No changes should be journaled without undo_limit"
+
+def test_new_action_drops_redo():
+    rng = np.random.default_rng(0)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng, undo_limit=None)
+        _play_recording(game, rng, 5)
+        game.undo(2)
+        _play_recording(game, rng, 1)
+
+    assert game.redo() == 0, "Undone actions can't be redone after performing a new one"
+
+def test_failed_move_keeps_history():
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=5, height=5, num_enemies=0, undo_limit=1)
+        start = game.hero.position
+
+        assert game.do(GameActions.MOVE_UP), "The hero should be able to move up"
+        game.hero.speed = 0
+        assert not game.do(GameActions.MOVE_UP), "The hero can't move without speed"
+
+        assert game.undo() == 1, "A failed move shouldn't push the last action out of the history"
+        assert game.hero.position == start, "The hero should be back in the initial position"
+
+        game = Game(hero=Warrior(name="Test"), width=5, height=5, num_enemies=0, undo_limit=None)
+        game.do(GameActions.MOVE_UP)
+        game.undo()
+        game.hero.speed = 0
+        assert not game.do(GameActions.MOVE_UP), "The hero can't move without speed"
+
+        assert game.redo() == 1, "A failed move shouldn't drop the actions that can be redone"
+
+def test_restore_snapshot_truncates_history():
+    rng = np.random.default_rng(0)
+
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=15, rng=rng, undo_limit=None)
+        states = _play_recording(game, rng, 2)
+        snapshot = game.snapshot()
+        _play_recording(game, rng, 3)
+        game.undo()
+        game.restore(snapshot)
+
+        assert game.redo() == 0, "Undone actions can't be redone after restoring a snapshot"
+        assert game.undo(5) == 2, "Only the actions before the snapshot can be undone"
+        assert _state(game) == states[0], "Undoing every action should bring back the initial state"
+
+# Tests for the masks of available actions
+
+def test_action_bits():
+    bits = [ACTION_BITS[action] for action in GameActions]
+
+    assert bits == [1 << idx for idx in range(len(GameActions))], "Every action should have its own bit"
+
+@pytest.mark.parametrize("hero_cls", [Warrior, Rogue, Mage])
+def test_available_actions_mask(hero_cls):
+    rng = np.random.default_rng(0)
+
+    with quiet():
+        game = Game(hero=hero_cls(name="Test"), width=6, height=6, num_enemies=12, rng=rng)
+
+        while True:
+            mask = game.available_actions_mask()
+            actions = game.available_actions()
+
+            assert [action for action in GameActions if mask & ACTION_BITS[action]] == sorted(actions, key=list(GameActions).index), \
+                "The mask should have the bits of the available actions"
+
+            if not actions:
+                break
+
+            action, target = random_policy(game, rng)
+            game.do_masked(ACTION_BITS[action], target)
+
+    assert game.available_actions_mask() == 0, "Nothing is available when the game is finished"
+
+def test_do_masked(game, board, hero):
+    board.is_valid.return_value = True
+    board.is_empty.return_value = True
+    board.has_enemies_in_range.return_value = False
+    board.move.return_value = True
+
+    assert game.do_masked(ACTION_BITS[GameActions.MOVE_UP]), "The action should be performed"
+    board.move.assert_called_once_with(unit=hero, destination=Position(0, 1))
+
+    with pytest.raises(ValueError):
+        game.do_masked(ACTION_BITS[GameActions.MOVE_UP] | ACTION_BITS[GameActions.MOVE_DOWN])
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from questing import Board, Game, Mage, Swordsman, Warrior, instrumentation
+from questing.attack import MeleeAttack
+from questing.defense import ArmoredDefense
+from questing.env import QuestingEnv
+from questing.instrumentation import TARGETS, CallStats
+from questing.logger import quiet
+from questing.sim import simulate
+from questing.types import Position
+
+
+@pytest.fixture(autouse=True)
+def disabled():
+    instrumentation.disable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_disabled_has_no_overhead():
+    originals = {name: Board.__dict__[name] for name in ("move", "place", "has_enemies_in_range")}
+    original_take_damage = ArmoredDefense.__dict__["take_damage"]
+
+    instrumentation.enable()
+    assert instrumentation.is_enabled(), "The instrumentation should be enabled"
+    assert Board.__dict__["move"] is not originals["move"], "Methods should be replaced while enabled"
+
+    instrumentation.disable()
+    assert not instrumentation.is_enabled(), "The instrumentation should be disabled"
+    assert all(Board.__dict__[name] is method for name, method in originals.items()), \
+        "The original methods should be back after disabling"
+    assert ArmoredDefense.__dict__["take_damage"] is original_take_damage, "Overrides should be restored too"
+
+    with quiet():
+        simulate(2, seed=1, width=5, height=5, num_enemies=3)
+
+    assert all(call_stats.calls == 0 for call_stats in instrumentation.stats().values()), \
+        "Nothing should be counted while disabled"
+
+def test_stats():
+    with instrumentation.instrumented(), quiet():
+        stats = simulate(5, seed=1, width=6, height=6, num_enemies=5)
+
+    snapshot = instrumentation.stats()
+
+    assert set(snapshot) == {name for name, _, _ in TARGETS}, f"Every method should have statistics: {snapshot}"
+    assert snapshot["Game.do"].calls == stats.steps, f"Every step should be a call to Game.do: {snapshot['Game.do']}"
+    assert snapshot["Board.place"].calls > 0, "Elements should have been placed"
+
+    for name, call_stats in snapshot.items():
+        if call_stats.calls:
+            assert call_stats.total_ns > 0, f"Calls to {name} should take some time"
+            assert call_stats.avg_ns == call_stats.total_ns / call_stats.calls, f"Wrong average for {name}"
+            assert call_stats.p99_ns <= call_stats.total_ns, f"The p99 of {name} can't be more than the total"
+
+    assert not instrumentation.is_enabled(), "The instrumentation should be disabled after the block"
+
+    instrumentation.reset()
+    assert instrumentation.stats()["Game.do"] == CallStats(0, 0, 0.0, 0.0), "Stats should be empty after a reset"
+
+    env = QuestingEnv(width=6, height=6, num_enemies=5)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    steps = 0
+
+    with instrumentation.instrumented(), quiet():
+        for _ in range(20):
+            _, _, terminated, _, _ = env.step(int(rng.choice(np.flatnonzero(env.action_mask()))))
+            steps += 1
+            if terminated:
+                break
+
+    snapshot = instrumentation.stats()
+
+    assert snapshot["Game.do"].calls == steps, f"Every step of the env should be a call to Game.do: {snapshot['Game.do']}"
+    # The mask of the loop, the one checked by Game.do and the one of the info of every step
+    assert snapshot["Game.available_actions"].calls == 3 * steps, \
+        f"The masks of the available actions should be counted: {snapshot['Game.available_actions']}"
+
+def test_overrides_count_once():
+    warrior = Warrior(name="Warrior")
+    swordsman = Swordsman.create(level=10)
+    warrior.position, swordsman.position = Position(0, 0), Position(0, 1)
+
+    with instrumentation.instrumented(), quiet():
+        warrior.attack(swordsman)
+        swordsman.take_damage(1)
+        MeleeAttack.attack(warrior, swordsman)
+
+    snapshot = instrumentation.stats()
+
+    assert snapshot["Attack.attack"].calls == 2, f"Every attack should count once: {snapshot['Attack.attack']}"
+    # ArmoredDefense.take_damage calls Defense.take_damage, which is part of the same call
+    assert snapshot["Defense.take_damage"].calls == 3, \
+        f"The damage of every attack and the direct one should count once: {snapshot['Defense.take_damage']}"
+
+def test_nested_instrumented_block():
+    instrumentation.enable()
+
+    with instrumentation.instrumented(), quiet():
+        Game(hero=Mage(name="Mage"), width=5, height=5, num_enemies=2).available_actions()
+
+    assert instrumentation.is_enabled(), "The instrumentation should stay enabled if it was before the block"
+    assert instrumentation.stats()["Game.available_actions"].calls == 1, "The call should have been counted"
+    assert "Game.available_actions" in instrumentation.report(), "The report should list the methods"
+
+def test_histograms_are_bounded():
+    histogram = instrumentation._Histogram()
+    durations = np.random.default_rng(0).lognormal(mean=8, sigma=1, size=10_000).astype(np.int64) + 1
+
+    for duration in durations:
+        histogram.add(int(duration))
+
+    assert len(histogram.buckets) == instrumentation.NUM_BUCKETS, "The histogram shouldn't grow with the calls"
+    assert histogram.calls == len(durations) and histogram.total_ns == durations.sum(), \
+        "The number of calls and the total should be exact"
+    expected = np.percentile(durations, 99)
+    assert abs(histogram.percentile(99) - expected) <= 0.1 * expected, \
+        f"The p99 should be close to the real one: {histogram.percentile(99)} vs {expected}"
+    assert histogram.percentile(100) == durations.max(), "No percentile can be more than the longest call"
@@ -1,6 +1,8 @@
 import pytest
+from unittest import mock
 
-from questing import Logger
+from questing import Board, Logger
+from questing.logger import DEBUG, INFO, WARNING, FileSink, LoggingSink, MemorySink, Sink, quiet
 
 
 def test_log(capsys):
@@ -22,3 +24,103 @@ def test_log_multiple(capsys):
     out, _ = capsys.readouterr()
 
     assert expected_msg in out
+
+@pytest.fixture
+def restore_config():
+    config = Logger.enabled, Logger.min_level, Logger.sinks
+    yield
+    Logger.enabled, Logger.min_level, Logger.sinks = config
+
+def test_log_with_args(capsys):
+    logger = Logger()
+    expected_msg = f"[{logger.__class__.__name__}] Test message 1 2"
+
+    logger.log("Test message %s %s", 1, 2)
+    out, _ = capsys.readouterr()
+
+    assert expected_msg in out
+
+def test_log_with_callable(capsys):
+    logger = Logger()
+    expected_msg = f"[{logger.__class__.__name__}] Test message"
+
+    logger.log(lambda: "Test message")
+    out, _ = capsys.readouterr()
+
+    assert expected_msg in out
+
+def test_log_disabled(capsys, restore_config):
+    logger = Logger()
+    build_message = mock.MagicMock(return_value="Test message")
+    Logger.configure(enabled=False)
+
+    logger.log(build_message)
+    out, _ = capsys.readouterr()
+
+    assert out == "", "Nothing should be logged when logging is disabled"
+    build_message.assert_not_called()
+
+def test_log_below_level(capsys, restore_config):
+    logger = Logger()
+    Logger.configure(min_level=INFO)
+
+    logger.log("Debug message", level=DEBUG)
+    logger.log("Warning message", level=WARNING)
+    out, _ = capsys.readouterr()
+
+    assert "Debug message" not in out, "Messages below the configured level should not be logged"
+    assert "Warning message" in out, "Messages above the configured level should be logged"
+
+def test_memory_sink(capsys, restore_config):
+    logger = Logger(name="test")
+    sink = MemorySink(capacity=2)
+    Logger.configure(sinks=[sink])
+
+    for idx in range(3):
+        logger.log("Message %s", idx)
+    out, _ = capsys.readouterr()
+
+    assert out == "", "Nothing should be printed when using a memory sink"
+    assert list(sink.messages) == ["[test] Message 1", "[test] Message 2"], "Memory sink should keep the last messages"
+
+def test_file_sink(tmp_path, restore_config):
+    path = tmp_path / "log.txt"
+    logger = Logger(name="test")
+    sink = FileSink(str(path))
+    Logger.configure(sinks=[sink])
+
+    logger.log("Test message")
+    sink.close()
+
+    assert path.read_text() == "[test] Test message\n"
+
+def test_logging_sink(caplog, restore_config):
+    logger = Logger(name="test")
+    Logger.configure(sinks=[LoggingSink()])
+
+    with caplog.at_level(DEBUG, logger="questing"):
+        logger.log("Test message", level=WARNING)
+
+    assert caplog.record_tuples == [("questing.test", WARNING, "Test message")]
+
+def test_quiet(capsys):
+    logger = Logger()
+
+    with quiet():
+        logger.log("Test message")
+    logger.log("Another message")
+    out, _ = capsys.readouterr()
+
+    assert "Test message" not in out, "Nothing should be logged inside the quiet block"
+    assert "Another message" in out, "Logging should be enabled again after the quiet block"
+
+def test_min_level_does_not_shadow_level():
+    assert not hasattr(Board(3, 3), "level"), "The logging threshold shouldn't look like a level of the board"
+    assert Logger.min_level == DEBUG, "Every message should be logged by default"
+
+def test_sinks_need_emit():
+    class Silent(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        Silent()
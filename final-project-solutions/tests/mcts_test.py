@@ -0,0 +1,124 @@
+import pickle
+import time
+
+import pytest
+import numpy as np
+
+from questing import CellKind, Game, GameActions, GameStatus, Mage, Position, Warrior
+from questing.logger import quiet
+from questing.mcts import MCTSAgent
+from questing.sim import play_game, random_policy
+
+
+@pytest.fixture
+def game():
+    with quiet():
+        return Game(hero=Warrior(name="Test"), width=8, height=8, num_enemies=10, rng=np.random.default_rng(0))
+
+def _state(game):
+    board = game.board
+    units = [(str(unit), unit.position, unit.health, getattr(unit, "armor", None))
+             for unit in [game.hero] + [board.get(p) for p in board.positions(CellKind.ENEMY)]]
+
+    return game.status, board.kinds.tobytes(), units, sorted(board.empty_slots)
+
+def test_choose_returns_available_decision(game):
+    agent = MCTSAgent(rollouts=50, rng=np.random.default_rng(0))
+    action, target = agent.choose(game)
+
+    assert action in game.available_actions(), "The agent should choose an available action"
+    if action == GameActions.ATTACK:
+        assert target in game.attack_targets(), "Attacks should target an enemy in range"
+    assert agent.last_rollouts == 50, "The agent should play every rollout of its budget"
+
+def test_choose_leaves_the_game_untouched(game):
+    state = _state(game)
+    MCTSAgent(rollouts=50, rng=np.random.default_rng(0)).choose(game)
+
+    assert _state(game) == state, "The search shouldn't change the game"
+    assert game._snapshots == [] and game._journal == [], "The search shouldn't leave snapshots behind"
+
+def test_choose_keeps_the_undo_history():
+    rng = np.random.default_rng(0)
+
+    with quiet():
+        game = Game(hero=Mage(name="Test"), width=8, height=8, num_enemies=10, rng=rng, undo_limit=2)
+        game.do(*random_policy(game, rng))
+        game.do(*random_policy(game, rng))
+        MCTSAgent(rollouts=30, rng=rng).choose(game)
+
+        assert game.undo(2) == 2, "The actions performed before the search should still be undoable"
+        assert game.hero.position == Position(0, 0), "Undoing them should bring back the hero to the start"
+
+def test_choose_exit():
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=4, height=4, num_enemies=0, rng=np.random.default_rng(0))
+        game.do(GameActions.MOVE_UP)
+        game.do(GameActions.MOVE_RIGHT)
+        game.do(GameActions.MOVE_UP)
+        game.do(GameActions.MOVE_RIGHT)
+        game.do(GameActions.MOVE_UP)
+
+    assert GameActions.EXIT in game.available_actions(), "The exit should be within reach"
+    assert MCTSAgent(rollouts=30, rng=np.random.default_rng(0)).choose(game) == (GameActions.EXIT, None), "The agent should exit right away"
+
+def test_choose_without_actions(game):
+    game.status = GameStatus.WON
+
+    assert MCTSAgent(rollouts=10).choose(game) is None, "There is nothing to choose in a finished game"
+
+def test_time_budget(game):
+    agent = MCTSAgent(rollouts=None, time_budget_ms=30)
+    start = time.perf_counter()
+    agent.choose(game)
+    elapsed = time.perf_counter() - start
+
+    assert agent.last_rollouts > 0, "Some rollouts should be played within the time budget"
+    # Only checks that the search stops at all, as loaded machines can overshoot the budget by a lot
+    assert elapsed < 5, f"The search should stop after the time budget, it took {elapsed * 1000:.1f}ms"
+
+    agent = MCTSAgent(rollouts=20, time_budget_ms=60_000)
+    agent.choose(game)
+
+    assert agent.last_rollouts == 20, "The rollouts should stop the search before a long time budget"
+
+def test_evaluate_uses_the_distance_to_exit():
+    with quiet():
+        game = Game(hero=Warrior(name="Test"), width=4, height=4, num_enemies=0, rng=np.random.default_rng(0))
+
+    straight = MCTSAgent._evaluate(game)
+    assert 0 < straight < 0.5, "Games still being played should get less than winning ones"
+
+    game.board.distance_to_exit = lambda position: 20
+    assert MCTSAgent._evaluate(game) < straight, "Detours should make the hero look further from the exit"
+
+    game.board.distance_to_exit = lambda position: None
+    assert MCTSAgent._evaluate(game) == straight, "The straight distance should be used if the exit is blocked"
+
+def test_needs_a_budget():
+    with pytest.raises(ValueError):
+        MCTSAgent(rollouts=None, time_budget_ms=None)
+
+def test_parallel_rollouts(game):
+    with MCTSAgent(rollouts=41, workers=2, rng=np.random.default_rng(0)) as agent:
+        action, _ = agent.choose(game)
+
+        assert action in game.available_actions(), "The agent should choose an available action"
+        assert agent.last_rollouts == 41, "The rollouts should be shared among the workers"
+
+def test_agent_is_picklable():
+    agent = MCTSAgent(rollouts=10, workers=2)
+    copy = pickle.loads(pickle.dumps(agent))
+
+    assert copy.name == agent.name and copy.rollouts == agent.rollouts, "The copy should have the same settings"
+
+def test_agent_beats_random_policy():
+    agent = MCTSAgent(rollouts=30, rollout_depth=20, rollout_policy=random_policy)
+    seeds = np.random.SeedSequence(0).spawn(5)
+    settings = dict(hero_cls=Mage, width=6, height=6, num_enemies=8, max_steps=100)
+
+    with quiet():
+        mcts_wins = sum(play_game(seed, policy=agent, **settings).status == GameStatus.WON for seed in seeds)
+        random_wins = sum(play_game(seed, policy=random_policy, **settings).status == GameStatus.WON for seed in seeds)
+
+    assert mcts_wins > random_wins, f"The agent should win more games ({mcts_wins}) than the random policy ({random_wins})"
@@ -0,0 +1,192 @@
+import numpy as np
+import pytest
+
+from questing import Archer, Board, Position, Wall
+from questing.distance_field import DistanceField
+from questing.logger import quiet
+from questing.pathfinding import Pathfinder
+
+
+def _board(width, height, walls=(), rng=None, density=0.0):
+    board = Board(width=width, height=height)
+
+    with quiet():
+        for position in walls:
+            board.place(Wall(), Position(*position))
+
+        if rng is not None:
+            for x, y in zip(*np.nonzero(rng.random((width, height)) < density)):
+                board.place(Wall(), Position(x.item(), y.item()))
+
+    return board
+
+def _assert_valid(board, start, goal, path):
+    assert path[-1] == goal, "The path should end in the goal"
+    for previous, position in zip([start] + path, path):
+        assert previous.distance(position) == 1, "Every step should move to a neighbour"
+    for position in path[:-1]:
+        assert board.is_empty(position), "Paths should only go through empty positions"
+
+@pytest.fixture(params=Pathfinder.METHODS)
+def method(request):
+    return request.param
+
+def test_straight_path(method):
+    board = _board(5, 5)
+    path = board.find_path(Position(0, 0), Position(0, 4), method=method)
+
+    assert path == [Position(0, 1), Position(0, 2), Position(0, 3), Position(0, 4)], "The path should be a straight line"
+
+def test_path_around_walls(method):
+    board = _board(5, 5, walls=[(1, 0), (1, 1), (1, 2), (1, 3)])
+    path = board.find_path(Position(0, 0), Position(2, 0), method=method)
+
+    _assert_valid(board, Position(0, 0), Position(2, 0), path)
+    assert len(path) == 10, "The path should go around the walls"
+
+def test_no_path(method):
+    board = _board(5, 5, walls=[(1, y) for y in range(5)])
+
+    assert board.find_path(Position(0, 0), Position(4, 4), method=method) is None, "There shouldn't be any path"
+
+def test_max_length(method):
+    board = _board(5, 5)
+
+    assert board.find_path(Position(0, 0), Position(4, 4), method=method, max_length=7) is None, \
+        "Paths longer than max_length shouldn't be found"
+    assert len(board.find_path(Position(0, 0), Position(4, 4), method=method, max_length=8)) == 8, \
+        "Paths of max_length steps should be found"
+
+def test_occupied_start_and_goal(method):
+    board = _board(5, 5)
+
+    with quiet():
+        board.place(Archer.create(level=1), Position(0, 0))
+        board.place(Archer.create(level=1), Position(3, 0))
+
+    assert len(board.find_path(Position(0, 0), Position(3, 0), method=method)) == 3, \
+        "The start and the goal can be occupied"
+
+def test_off_board_positions(method):
+    board = _board(10, 10)
+
+    assert board.find_path(Position(0, 0), Position(10, 3), method=method) is None, "Goals off the board can't be reached"
+    assert board.find_path(Position(0, -1), Position(3, 3), method=method) is None, "Starts off the board have no path"
+    assert board.pathfinder.misses == 0, "Invalid queries shouldn't be cached"
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        _board(3, 3).find_path(Position(0, 0), Position(2, 2), method="dijkstra")
+
+@pytest.mark.parametrize("seed", range(20))
+def test_shortest_paths(seed):
+    rng = np.random.default_rng(seed)
+    board = _board(15, 12, rng=rng, density=0.3)
+    empty = board.empty_slots
+    distances = {}
+
+    for _ in range(10):
+        start, goal = (empty[idx] for idx in rng.choice(len(empty), size=2, replace=False))
+
+        if goal not in distances:
+            passable = board.kinds == 0
+            distances[goal] = DistanceField(passable, sources=[goal])
+
+        expected = distances[goal].distance(start)
+        astar = board.pathfinder.astar(start, goal)
+        jps = board.pathfinder.jps(start, goal)
+
+        if expected is None:
+            assert astar is None and jps is None, "There shouldn't be any path"
+            continue
+
+        _assert_valid(board, start, goal, astar)
+        _assert_valid(board, start, goal, jps)
+        assert len(astar) == expected, "A* should find a shortest path"
+        assert len(jps) == expected, "JPS should find paths as short as A*"
+
+def test_cache():
+    board = _board(10, 10)
+    first = board.find_path(Position(0, 0), Position(9, 9))
+    second = board.find_path(Position(0, 0), Position(9, 9))
+
+    assert first == second, "The cached path should be the same"
+    assert (board.pathfinder.hits, board.pathfinder.misses) == (1, 1), "The second query should hit the cache"
+
+    second.append(Position(0, 0))
+
+    assert board.find_path(Position(0, 0), Position(9, 9)) == first, "Changing a returned path shouldn't change the cache"
+
+def test_cache_is_lru():
+    board = _board(10, 10)
+    board.pathfinder.cache_size = 2
+
+    board.find_path(Position(0, 0), Position(1, 1))
+    board.find_path(Position(0, 0), Position(2, 2))
+    board.find_path(Position(0, 0), Position(1, 1))
+    board.find_path(Position(0, 0), Position(3, 3))
+    misses = board.pathfinder.misses
+
+    board.find_path(Position(0, 0), Position(1, 1))
+    assert board.pathfinder.misses == misses, "Recently used paths should be kept"
+
+    board.find_path(Position(0, 0), Position(2, 2))
+    assert board.pathfinder.misses == misses + 1, "The least recently used path should be dropped"
+
+def test_blocking_a_path_invalidates_it():
+    board = _board(10, 10)
+    path = board.find_path(Position(0, 0), Position(0, 9))
+    board.find_path(Position(5, 0), Position(5, 9))
+
+    with quiet():
+        board.place(Wall(), path[3])
+
+    new_path = board.find_path(Position(0, 0), Position(0, 9))
+    _assert_valid(board, Position(0, 0), Position(0, 9), new_path)
+    assert len(new_path) == 11, "The new path should go around the wall"
+
+    misses = board.pathfinder.misses
+    board.find_path(Position(5, 0), Position(5, 9))
+    assert board.pathfinder.misses == misses, "Paths away from the wall should stay in the cache"
+
+def test_freeing_a_position_invalidates_paths():
+    board = _board(10, 10, walls=[(0, 5)])
+
+    assert len(board.find_path(Position(0, 0), Position(0, 9))) == 11, "The path should go around the wall"
+    assert board.find_path(Position(0, 0), Position(0, 9), max_length=9) is None, "There shouldn't be a short path"
+
+    with quiet():
+        board.clear(Position(0, 5))
+
+    assert len(board.find_path(Position(0, 0), Position(0, 9))) == 9, "The path should go straight now"
+    assert len(board.find_path(Position(0, 0), Position(0, 9), max_length=9)) == 9, "A short path should be found now"
+
+def test_freeing_far_away_keeps_paths():
+    board = _board(20, 20, walls=[(15, 15)])
+    board.find_path(Position(0, 0), Position(0, 5))
+
+    with quiet():
+        board.clear(Position(15, 15))
+
+    misses = board.pathfinder.misses
+    board.find_path(Position(0, 0), Position(0, 5))
+    assert board.pathfinder.misses == misses, "Changes far from the path shouldn't invalidate it"
+
+def test_moving_within_the_bounding_box_keeps_paths():
+    board = _board(10, 10)
+    start, goal = Position(0, 0), Position(9, 9)
+    path = board.find_path(start, goal)
+    # Two neighbouring positions within the bounding box of the path, but not on it
+    first = next(Position(x, y) for x in range(1, 8) for y in range(1, 9)
+                 if Position(x, y) not in path and Position(x + 1, y) not in path)
+    second = Position(first.x + 1, first.y)
+
+    with quiet():
+        archer = Archer.create(level=1)
+        board.place(archer, first)
+        for _ in range(3):
+            assert board.move(archer, second) and board.move(archer, first), "The archer should move back and forth"
+
+    misses = board.pathfinder.misses
+    assert board.find_path(start, goal) == path, "The cached path should still be a shortest path"
+    assert board.pathfinder.misses == misses, "Freeing positions with no shorter detour shouldn't invalidate paths"
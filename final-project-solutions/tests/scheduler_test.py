@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from questing import Archer, Board, Game, GameActions, GameStatus, Position, Swordsman, Wall, Warrior
+from questing.logger import quiet
+from questing.scheduler import EnemyScheduler
+
+
+@pytest.fixture
+def board():
+    return Board(width=10, height=10)
+
+@pytest.fixture
+def hero(board):
+    hero = Warrior(name="Hero")
+    board.place(hero, Position(5, 5))
+    return hero
+
+def _place(board, enemy, position):
+    board.place(enemy, position)
+    return enemy
+
+def test_enemy_in_reach_attacks(board, hero):
+    archer = _place(board, Archer.create(level=1), Position(5, 7))
+    health = hero.health
+
+    with quiet():
+        acted = EnemyScheduler(board).run(hero)
+
+    assert acted == 1, "The archer should act"
+    assert hero.health < health, "The archer should attack the hero"
+    assert archer.position == Position(5, 7), "The archer shouldn't move when the hero is in range"
+
+def test_enemy_out_of_reach_moves_towards_the_hero(board, hero):
+    swordsman = _place(board, Swordsman.create(level=1), Position(8, 6))
+    health = hero.health
+
+    with quiet():
+        EnemyScheduler(board).run(hero)
+
+    assert hero.health == health, "The swordsman can't attack from that far"
+    # Swordsmen of level 1 have a speed of 2, and reduce the largest difference first
+    assert swordsman.position == Position(6, 6), "The swordsman should get closer to the hero"
+    assert board.get(Position(6, 6)) is swordsman, "The board should be updated"
+    assert board.is_empty(Position(8, 6)), "The old position should be empty"
+
+def test_enemy_stops_when_in_reach(board, hero):
+    swordsman = _place(board, Swordsman.create(level=1), Position(5, 7))
+    swordsman.speed = 3
+
+    with quiet():
+        EnemyScheduler(board).run(hero)
+
+    assert swordsman.position == Position(5, 6), "The swordsman should stop next to the hero"
+
+def test_blocked_enemy_stays(board, hero):
+    swordsman = _place(board, Swordsman.create(level=1), Position(5, 8))
+    board.place(Wall(), Position(5, 7))
+    scheduler = EnemyScheduler(board)
+
+    assert scheduler.step_towards(swordsman, hero.position) is None, "The swordsman can't get any closer"
+
+    with quiet():
+        scheduler.run(hero)
+
+    assert swordsman.position == Position(5, 8), "The swordsman should stay where it is"
+
+def test_enemies_outside_the_activity_radius_sleep(board, hero):
+    far = _place(board, Swordsman.create(level=1), Position(9, 9))
+    scheduler = EnemyScheduler(board, activity_radius=3)
+
+    assert scheduler.active_enemies(hero) == [], "Enemies far from the hero shouldn't be woken up"
+
+    with quiet():
+        assert scheduler.run(hero) == 0, "No enemy should act"
+
+    assert far.position == Position(9, 9), "The enemy shouldn't move"
+
+def test_phase_stops_when_the_hero_dies(board, hero):
+    for position in [Position(5, 6), Position(5, 4), Position(4, 5), Position(6, 5)]:
+        _place(board, Swordsman.create(level=5), position)
+
+    with quiet():
+        acted = EnemyScheduler(board).run(hero)
+
+    assert not hero.is_alive, "The hero should be destroyed"
+    assert acted < 4, "The enemies shouldn't keep attacking a destroyed hero"
+
+def test_game_enemy_phase():
+    hero = Warrior(name="Hero")
+    game = Game(hero=hero, width=10, height=10, num_enemies=0, rng=np.random.default_rng(0), enemy_phase=True)
+    swordsman = _place(game.board, Swordsman.create(level=1), Position(0, 2))
+    swordsman.speed = 1
+
+    with quiet():
+        assert game.do(GameActions.MOVE_RIGHT), "The hero should move"
+
+    assert swordsman.position == Position(0, 1), "The swordsman should move towards the hero after its move"
+
+    with quiet():
+        game.do(GameActions.MOVE_UP)
+
+    assert swordsman.position == Position(0, 1), "The swordsman should attack instead of moving"
+    assert hero.health < 10, "The swordsman should attack the hero"
+
+def test_game_over_in_the_enemy_phase():
+    hero = Warrior(name="Hero")
+    game = Game(hero=hero, width=10, height=10, num_enemies=0, rng=np.random.default_rng(0), enemy_phase=True)
+    _place(game.board, Swordsman.create(level=10), Position(1, 1))
+
+    with quiet():
+        while game.status == GameStatus.PLAYING:
+            game.do(GameActions.MOVE_UP if GameActions.MOVE_UP in game.available_actions() else GameActions.MOVE_DOWN)
+
+    assert game.status == GameStatus.GAME_OVER, "The hero should be killed by the enemy"
+
+def test_no_enemy_phase_by_default():
+    game = Game(hero=Warrior(name="Hero"), width=10, height=10, num_enemies=0, rng=np.random.default_rng(0))
+    swordsman = _place(game.board, Swordsman.create(level=1), Position(0, 3))
+
+    with quiet():
+        game.do(GameActions.MOVE_RIGHT)
+
+    assert game.scheduler is None, "There shouldn't be a scheduler"
+    assert swordsman.position == Position(0, 3), "Enemies shouldn't act"
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+
+from questing import GameStatus, Mage, Rogue, Warrior
+from questing.sim import GameResult, SimulationStats, greedy_policy, play_game, random_policy, simulate
+
+
+@pytest.fixture(params=[random_policy, greedy_policy])
+def policy(request):
+    return request.param
+
+@pytest.fixture(params=[Warrior, Rogue, Mage])
+def hero_cls(request):
+    return request.param
+
+def test_simulate(capsys, policy, hero_cls):
+    num_games = 20
+
+    stats = simulate(num_games, policy=policy, hero_cls=hero_cls, seed=1, width=6, height=6, num_enemies=5)
+    out, _ = capsys.readouterr()
+
+    assert out == "", "Nothing should be logged while simulating"
+    assert stats.games == num_games, f"{num_games} games should have been played"
+    assert stats.wins + stats.losses + stats.unfinished == num_games, "Every game should have an outcome"
+    assert stats.steps > 0, "Some steps should have been taken"
+
+def test_simulate_is_reproducible(policy):
+    stats1 = simulate(10, policy=policy, seed=42)
+    stats2 = simulate(10, policy=policy, seed=42)
+
+    assert stats1.statuses == stats2.statuses, "Simulations with the same seed should have the same outcome"
+    assert stats1.steps == stats2.steps, "Simulations with the same seed should take the same steps"
+
+def test_play_game_max_steps():
+    result = play_game(np.random.SeedSequence(0), policy=random_policy, max_steps=3)
+
+    assert result.steps <= 3, "The game should stop after the maximum number of steps"
+
+def test_greedy_policy_exits():
+    result = play_game(np.random.SeedSequence(0), policy=greedy_policy, num_enemies=0)
+
+    assert result.status == GameStatus.WON, "With no enemies, the greedy policy should always win"
+
+def test_stats_merge():
+    stats1 = SimulationStats()
+    stats1.add(GameResult(status=GameStatus.WON, steps=10, enemies_killed=2, hero_health=5))
+    stats2 = SimulationStats()
+    stats2.add(GameResult(status=GameStatus.GAME_OVER, steps=4, enemies_killed=1, hero_health=0))
+    stats2.add(GameResult(status=GameStatus.WON, steps=7, enemies_killed=0, hero_health=8))
+
+    stats = stats1.merge(stats2)
+
+    assert stats.games == 3, "Merged stats should have 3 games"
+    assert stats.wins == 2, "Merged stats should have 2 wins"
+    assert stats.losses == 1, "Merged stats should have 1 loss"
+    assert stats.mean_steps == 7, "Merged stats should have a mean of 7 steps"
+    assert stats.enemies_killed == 3, "Merged stats should have 3 enemies killed"
+    assert stats.win_rate == pytest.approx(2 / 3)
+
+def test_simulate_with_workers():
+    kwargs = dict(policy=greedy_policy, seed=7, chunk_size=4, width=6, height=6, num_enemies=5)
+
+    serial = simulate(10, workers=1, **kwargs)
+    parallel = simulate(10, workers=2, **kwargs)
+
+    assert parallel.games == 10, "10 games should have been played"
+    assert parallel.statuses == serial.statuses, "Parallel and serial simulations should have the same outcome"
+    assert parallel.steps == serial.steps, "Parallel and serial simulations should take the same steps"
+
+def test_chunks_dont_change_the_result():
+    kwargs = dict(policy=random_policy, seed=3, width=6, height=6, num_enemies=5)
+    expected = SimulationStats()
+
+    for game_seed in np.random.SeedSequence(3).spawn(9):
+        expected.add(play_game(game_seed, policy=random_policy, width=6, height=6, num_enemies=5))
+
+    for chunk_size in [None, 1, 4, 100]:
+        stats = simulate(9, chunk_size=chunk_size, **kwargs)
+
+        assert (stats.statuses, stats.steps) == (expected.statuses, expected.steps), \
+            f"Chunks of {chunk_size} games should play the same games"
+
+    parallel = simulate(9, workers=2, **kwargs)
+    assert (parallel.statuses, parallel.steps) == (expected.statuses, expected.steps), \
+        "Small runs spread across workers should play the same games"
+
+@pytest.mark.parametrize("arguments", [dict(workers=0), dict(workers=-1), dict(chunk_size=0), dict(chunk_size=-5)])
+def test_simulate_validates_arguments(arguments):
+    with pytest.raises(ValueError):
+        simulate(5, **arguments)
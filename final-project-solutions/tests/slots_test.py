@@ -0,0 +1,66 @@
+import pickle
+import tracemalloc
+
+import pytest
+
+from questing import Apprentice, Archer, ExitPortal, Mage, Position, Rogue, Swordsman, Wall, Warrior
+from questing.attack import MagicAttack, MeleeAttack, RangedAttack
+from questing.defense import ArmoredDefense, Barrier, Defense
+
+ENEMIES = [Archer, Swordsman, Apprentice]
+
+
+def _footprint(factory, count: int = 10000) -> float:
+    """Average number of bytes allocated by every object created by the factory"""
+    tracemalloc.start()
+
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(objects) == count
+    return (after - before) / count
+
+@pytest.mark.parametrize("element", [
+    Warrior(name="Hero"), Rogue(name="Hero"), Mage(name="Hero"),
+    Archer.create(level=1), Swordsman.create(level=1), Apprentice.create(level=1),
+    Wall(), ExitPortal(),
+    MeleeAttack(power=1), RangedAttack(power=1, attack_range=2), MagicAttack(power=1, attack_range=2),
+    Defense(health=1), ArmoredDefense(health=1, armor=1), Barrier(health=1, armor=1),
+])
+def test_no_instance_dict(element):
+    assert not hasattr(element, "__dict__"), f"{element.__class__.__name__} instances shouldn't have a dict"
+
+def test_attack_range_only_in_ranged_units():
+    assert not hasattr(Warrior(name="Hero"), "attack_range"), "Warriors shouldn't have an attack range"
+    assert not hasattr(Swordsman.create(level=1), "attack_range"), "Swordsmen shouldn't have an attack range"
+
+def test_arbitrary_attributes_are_rejected():
+    with pytest.raises(AttributeError):
+        Archer.create(level=1).speeed = 2
+
+@pytest.mark.parametrize("enemy_class", ENEMIES)
+def test_pickle(enemy_class):
+    enemy = enemy_class.create(level=2)
+    enemy.position = Position(1, 2)
+    enemy.take_damage(1)
+
+    copy = pickle.loads(pickle.dumps(enemy))
+
+    for attribute in ["name", "position", "health", "_original_health", "power", "speed", "level"]:
+        assert getattr(copy, attribute) == getattr(enemy, attribute), f"{attribute} should survive pickling"
+
+@pytest.mark.parametrize("enemy_class", ENEMIES)
+def test_memory_footprint(enemy_class):
+    # The same class, but with an instance dict, like the units used to be
+    dict_class = type(f"Dict{enemy_class.__name__}", (enemy_class,), {})
+    stats = enemy_class.stats(level=2)
+
+    slotted = _footprint(lambda: enemy_class(name="Enemy", level=2, **stats))
+    with_dict = _footprint(lambda: dict_class(name="Enemy", level=2, **stats))
+
+    assert slotted < 128, f"Units should take less than 128 bytes, but take {slotted}"
+    assert slotted < 0.8 * with_dict, f"Slots should save memory ({slotted} vs {with_dict} bytes per unit)"
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+
+from questing import Position
+from questing.spatial import BucketGrid, OccupancyGrid
+
+
+@pytest.fixture(params=[BucketGrid, OccupancyGrid])
+def index_cls(request):
+    return request.param
+
+def _random_grid(seed: int, width: int = 40, height: int = 30, num_positions: int = 60, bucket_size: int = 8,
+                 index_cls: type = BucketGrid):
+    rng = np.random.RandomState(seed)
+    grid = index_cls(width=width, height=height, bucket_size=bucket_size)
+    positions = {Position(int(x), int(y)) for x, y in zip(rng.randint(width, size=num_positions), rng.randint(height, size=num_positions))}
+
+    for pos in positions:
+        grid.add(pos)
+
+    return grid, positions
+
+def test_add_and_remove(index_cls):
+    grid = index_cls(width=10, height=10, bucket_size=4)
+    pos = Position(5, 6)
+
+    grid.add(pos)
+    grid.add(pos)
+
+    assert len(grid) == 1, "Adding the same position twice should only add it once"
+    assert pos in grid, f"Position {pos} should be in the index"
+
+    grid.remove(pos)
+    grid.remove(pos)
+
+    assert len(grid) == 0, "Removing the same position twice should only remove it once"
+    assert pos not in grid, f"Position {pos} should not be in the index"
+
+def test_add_many(index_cls):
+    grid = index_cls(width=10, height=10, bucket_size=4)
+    positions = [Position(1, 2), Position(9, 9), Position(1, 2), Position(5, 0)]
+
+    grid.add_many(positions)
+
+    assert len(grid) == 3, "Duplicated positions should only be added once"
+    assert sorted(grid) == sorted(set(positions)), "All the positions should be in the index"
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("distance", [0, 1, 3, 7, 20, 100])
+def test_in_range_matches_brute_force(seed, distance, index_cls):
+    grid, positions = _random_grid(seed, index_cls=index_cls)
+    center = Position(17, 11)
+    expected = sorted((p for p in positions if p != center and center.distance(p) <= distance),
+                      key=lambda p: (center.distance(p), p))
+
+    assert grid.in_range(center, distance) == expected, f"Wrong positions in range {distance} of {center}"
+    assert grid.count_in_range(center, distance) == len(expected), f"Wrong count in range {distance} of {center}"
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [1, 2, 5, 100])
+@pytest.mark.parametrize("center", [Position(0, 0), Position(17, 11), Position(39, 29)])
+def test_nearest_matches_brute_force(seed, k, center, index_cls):
+    grid, positions = _random_grid(seed, index_cls=index_cls)
+    expected = sorted((p for p in positions if p != center), key=lambda p: (center.distance(p), p))[:k]
+
+    assert grid.nearest(center, k) == expected, f"Wrong {k} nearest positions to {center}"
+
+def test_nearest_in_empty_grid(index_cls):
+    grid = index_cls(width=10, height=10)
+
+    assert grid.nearest(Position(1, 1), k=3) == [], "There are no nearest positions in an empty index"
+
+def test_occupancy_grid_add_arrays():
+    grid = OccupancyGrid(width=10, height=10, bucket_size=4)
+    grid.add(Position(1, 2))
+    grid.add_arrays(np.array([1, 9, 9, 5]), np.array([2, 9, 9, 0]))
+
+    assert len(grid) == 3, "Positions already in the index, or repeated, should only be added once"
+    assert sorted(grid) == [Position(1, 2), Position(5, 0), Position(9, 9)], "All the positions should be in the index"
+    assert grid._counts.sum() == 3, "Every position should be counted in its bucket"
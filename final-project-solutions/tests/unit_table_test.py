@@ -0,0 +1,140 @@
+import pytest
+import numpy as np
+
+from questing import Board, CellKind, Enemy, Game, GameStatus, Mage, Position, Warrior
+from questing.logger import quiet
+from questing.sim import greedy_policy
+from questing.unit_table import UnitTable, UnitView
+
+STATS = ["health", "armor", "power", "attack_range", "speed", "level", "short_text"]
+
+
+@pytest.fixture(params=list(enumerate(UnitTable.KINDS)))
+def kind(request):
+    return request.param
+
+@pytest.fixture(params=[1, 2, 5])
+def level(request):
+    return request.param
+
+def test_view_has_the_same_stats(kind, level):
+    kind_idx, enemy_class = kind
+    table = UnitTable()
+    row, = table.add(kinds=[kind_idx], levels=[level])
+
+    view = table[row]
+    enemy = enemy_class.create(level=level)
+
+    assert isinstance(view, Enemy), "Views should be enemies"
+    for stat in STATS:
+        assert getattr(view, stat, None) == getattr(enemy, stat, None), f"{stat} of the view should be the same as the enemy's"
+
+def test_view_behaves_like_the_enemy(kind, level):
+    kind_idx, enemy_class = kind
+    table = UnitTable()
+    view = table[table.add(kinds=[kind_idx], levels=[level])[0]]
+    enemy = enemy_class.create(level=level)
+    view.position = enemy.position = Position(0, 0)
+    target = Warrior(name="Target", position=Position(0, 1))
+    other_target = Warrior(name="Target", position=Position(0, 1))
+
+    with quiet():
+        for damage in [1, 2, 1.5, 3]:
+            assert view.take_damage(damage) == enemy.take_damage(damage), "Views should take damage like the enemy"
+            assert view.health == enemy.health, "Views should have the same health as the enemy after taking damage"
+            assert getattr(view, "armor", 0) == getattr(enemy, "armor", 0), "Views should have the same armor as the enemy"
+
+        view.heal()
+        enemy.heal()
+        view.attack(target)
+        enemy.attack(other_target)
+
+    assert view.health == enemy.health, "Views should heal like the enemy"
+    assert target.health == other_target.health, "Views should attack like the enemy"
+
+def test_view_position():
+    table = UnitTable()
+    view = table[table.add(kinds=[0], levels=[1])[0]]
+
+    assert view.position is None, "Views should have no position until they are placed"
+
+    view.position = Position(3, 4)
+
+    assert view.position == Position(3, 4), "View position should be stored in the table"
+    assert (table.x[view.row], table.y[view.row]) == (3, 4), "View position should be stored in the table"
+
+def test_views_are_equal():
+    table = UnitTable()
+    rows = table.add(kinds=[0, 1], levels=[1, 1])
+
+    assert table[rows[0]] == table[rows[0]], "Views of the same row should be equal"
+    assert table[rows[0]] != table[rows[1]], "Views of different rows should not be equal"
+    assert len({table[rows[0]], table[rows[0]]}) == 1, "Views of the same row should have the same hash"
+
+def test_table_grows():
+    table = UnitTable(capacity=2)
+
+    for _ in range(5):
+        table.add(kinds=[0, 1, 2], levels=[1, 2, 3])
+
+    assert len(table) == 15, "There should be 15 units in the table"
+    assert table[14].level == 3, "Last unit should be of level 3"
+    with pytest.raises(IndexError):
+        table.view(15)
+
+def test_table_memory():
+    table = UnitTable(capacity=10000)
+    table.add(kinds=np.zeros(10000, dtype=int), levels=np.ones(10000, dtype=int))
+
+    assert table.nbytes / len(table) < 64, "Every unit should take less than 64 bytes"
+
+def test_create_compact_board():
+    board = Board.create(hero=Warrior(name="Test"), width=10, height=10, num_enemies=30, rng=np.random.default_rng(0), compact=True)
+
+    assert len(board.units) == 30, "All the enemies should be in the unit table"
+    assert board.num_enemies == 30, "There should be 30 enemies in the board"
+    for pos in board.positions(CellKind.ENEMY):
+        assert isinstance(board[pos], UnitView), f"Enemy at {pos} should be a unit view"
+        assert board[pos].position == pos, f"Enemy at {pos} should know its position"
+
+    enemy = board[board.positions(CellKind.ENEMY)[0]]
+    board.clear(enemy.position)
+
+    assert board.num_enemies == 29, "There should be 29 enemies after clearing one"
+    assert board.unit_rows[enemy.position] == -1, "Cleared positions shouldn't have a row"
+    assert sorted(board.unit_rows[board.kinds == CellKind.ENEMY].tolist()) == sorted(set(range(30)) - {enemy.row}), \
+        "Every enemy should have its row in the grid"
+    assert not board.unit_rows.flags.writeable, "The grid of rows should be read-only"
+
+def test_compact_board_columns():
+    board = Board.create(hero=Warrior(name="Test"), width=10, height=8, num_enemies=30, rng=np.random.default_rng(0), compact=True)
+
+    for pos in board.positions(CellKind.ENEMY):
+        assert board[pos.x][pos.y] is not None, f"board[{pos.x}][{pos.y}] should return the enemy there"
+        assert board[pos.x][pos.y].position == pos, f"Enemy at {pos} should know its position"
+
+    assert len(board[0]) == 8 and len(list(board[0])) == 8, "Columns should have one element per row"
+    assert [element is None for element in board[3]] == [board.get(Position(3, y)) is None for y in range(8)], \
+        "Iterating a column should look up every position"
+    with pytest.raises(IndexError):
+        board[10]
+    with pytest.raises(IndexError):
+        board[0][8]
+    with pytest.raises(TypeError):
+        board[1:3]
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compact_game_plays_the_same(seed):
+    results = []
+
+    for compact in [False, True]:
+        game = Game(hero=Mage(name="Test"), width=8, height=8, num_enemies=20, rng=np.random.default_rng(seed), compact=compact)
+        rng = np.random.default_rng(seed)
+
+        with quiet():
+            while game.status == GameStatus.PLAYING:
+                game.do(*greedy_policy(game, rng))
+
+        results.append((game.status, game.hero.health, game.board.num_enemies))
+
+    assert results[0] == results[1], "Games with compact boards should play exactly like the regular ones"
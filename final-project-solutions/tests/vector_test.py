@@ -0,0 +1,148 @@
+import pytest
+import numpy as np
+
+from questing import CellKind, Game, GameActions, Mage, Rogue, Warrior
+from questing.logger import quiet
+from questing.sim import random_policy
+from questing.vector import ACTIONS, ATTACK, EXIT_ACTION, GAME_OVER, MOVE_UP, PLAYING, STATUSES, WON, VectorGame
+
+
+def _games(hero_cls, num_games=20, compact=False, **kwargs):
+    settings = dict(width=6, height=6, num_enemies=14)
+    settings.update(kwargs)
+
+    with quiet():
+        return [Game(hero=hero_cls(name="Test"), rng=np.random.default_rng(seed), compact=compact, **settings)
+                for seed in range(num_games)]
+
+def _assert_same(games, vector):
+    for idx, game in enumerate(games):
+        hero = game.hero
+
+        assert (vector.kinds[idx] == game.board.kinds).all(), f"The board of game {idx} should be the same"
+        assert (vector.hero_x[idx], vector.hero_y[idx]) == hero.position, f"The hero of game {idx} should be in the same position"
+        assert vector.hero_health[idx] == hero.health, f"The hero of game {idx} should have the same health"
+        assert vector.hero_armor[idx] == getattr(hero, "armor", 0), f"The hero of game {idx} should have the same armor"
+        assert STATUSES[vector.status[idx]] == game.status, f"Game {idx} should have the same status"
+
+        for position in game.board.positions(CellKind.ENEMY):
+            enemy = game.board.get(position)
+            assert vector.enemy_health[(idx, *position)] == enemy.health, f"Enemy {position} should have the same health"
+            assert vector.enemy_armor[(idx, *position)] == getattr(enemy, "armor", 0), f"Enemy {position} should have the same armor"
+
+        available = [ACTIONS[action] for action in np.flatnonzero(vector.available_actions()[idx])]
+        assert set(available) == set(game.available_actions()), f"Game {idx} should have the same actions available"
+
+@pytest.mark.parametrize("hero_cls", [Warrior, Rogue, Mage])
+@pytest.mark.parametrize("compact", [False, True])
+def test_step_is_the_same_as_game(hero_cls, compact):
+    games = _games(hero_cls, compact=compact)
+    vector = VectorGame.from_games(games)
+    rng = np.random.default_rng(0)
+
+    with quiet():
+        for _ in range(40):
+            actions = np.full(len(games), MOVE_UP)
+            targets = np.full((len(games), 2), -1)
+            results = []
+
+            for idx, game in enumerate(games):
+                action, target = random_policy(game, rng) or (GameActions.MOVE_UP, None)
+
+                # Attacks on enemies out of range are valid too
+                if action == GameActions.ATTACK and rng.random() < 0.3:
+                    enemies = game.board.positions(CellKind.ENEMY)
+                    target = enemies[int(rng.integers(len(enemies)))]
+
+                actions[idx] = ACTIONS.index(action)
+                targets[idx] = target if target is not None else (-1, -1)
+                results.append(game.do(action, target))
+
+            vector.step(actions, targets)
+
+            assert vector.results.tolist() == results, "Steps should return the same as Game.do"
+            _assert_same(games, vector)
+
+def test_step_attacks_the_closest_enemy():
+    games = _games(Rogue, num_games=50, num_enemies=25)
+    vector = VectorGame.from_games(games)
+    expected = [game.attack_targets()[0] if game.attack_targets() else (-1, -1) for game in games]
+
+    assert vector.attack_targets().tolist() == [list(target) for target in expected], "The closest enemy should be the target"
+
+    with quiet():
+        for game, target in zip(games, expected):
+            game.do(GameActions.ATTACK, target if target != (-1, -1) else None)
+
+    vector.step(np.full(len(games), ATTACK))
+    _assert_same(games, vector)
+
+def test_create():
+    vector = VectorGame.create(3, hero_cls=Mage, width=7, height=5, num_enemies=8, seed=3)
+    seeds = np.random.SeedSequence(3).spawn(3)
+
+    with quiet():
+        games = [Game(hero=Mage(name="Test"), width=7, height=5, num_enemies=8, rng=np.random.default_rng(seed), compact=True)
+                 for seed in seeds]
+
+    _assert_same(games, vector)
+
+def test_rewards_and_dones():
+    vector = VectorGame.create(2, width=2, height=2, num_enemies=0, seed=0)
+    vector.hero_speed[:] = 2
+    _, rewards, dones = vector.step([EXIT_ACTION, MOVE_UP])
+
+    assert rewards.tolist() == [VectorGame.WIN_REWARD, 0], "Winning should be rewarded"
+    assert dones.tolist() == [True, False], "Only the game won should be done"
+    assert vector.status.tolist() == [WON, PLAYING], "The first game should be won"
+
+    observations, rewards, dones = vector.step([MOVE_UP, EXIT_ACTION])
+    assert vector.results.tolist() == [False, True], "Nothing can be done in a finished game"
+    assert rewards.tolist() == [0, VectorGame.WIN_REWARD], "Games are only rewarded in the step that they finish"
+
+def test_losing():
+    games = _games(Warrior, num_games=1, width=3, height=1, num_enemies=1, max_level=1)
+    vector = VectorGame.from_games(games)
+    vector.hero_health[:] = 0.5
+    vector.hero_armor[:] = 0
+    vector.enemy_health[:] *= 100
+    _, rewards, dones = vector.step([ATTACK])
+
+    assert vector.status.tolist() == [GAME_OVER], "The hero should die from the retaliation"
+    assert rewards.tolist() == [VectorGame.LOSS_REWARD] and dones.tolist() == [True], "Losing should be penalised"
+
+def test_invalid_steps():
+    games = _games(Warrior, num_games=3)
+    vector = VectorGame.from_games(games)
+    before = vector.kinds.copy()
+    vector.step([len(ACTIONS), -1, ATTACK], targets=[(0, 0), (0, 0), (100, 100)])
+
+    assert not vector.results.any(), "Unknown actions and targets out of the board should fail"
+    assert (vector.kinds == before).all(), "Failed steps shouldn't change anything"
+
+def test_observations():
+    vector = VectorGame.create(4, seed=1)
+    observations = vector.observations()
+    channel = VectorGame.CHANNELS.index
+
+    assert observations.shape == (4, len(VectorGame.CHANNELS), 10, 10), "There should be a grid per game and channel"
+    assert (observations[:, channel("hero")].sum(axis=(1, 2)) == 1).all(), "There should be one hero per game"
+    assert (observations[:, channel("enemy_health")] > 0).sum() == (vector.kinds == CellKind.ENEMY).sum(), \
+        "Every enemy (and only enemies) should have health"
+    assert observations[:, channel("hero_health"), 0, 0].tolist() == vector.hero_health.tolist(), \
+        "The health of the hero should be in its position"
+
+def test_reset():
+    vector = VectorGame.create(3, seed=1)
+    vector.status[:] = GAME_OVER
+    vector.reset(np.array([True, False, True]))
+
+    assert vector.status.tolist() == [PLAYING, GAME_OVER, PLAYING], "Only the selected games should be reset"
+    assert (vector.hero_x[[0, 2]] == 0).all(), "The heroes of new games should start at (0, 0)"
+
+    with pytest.raises(ValueError):
+        VectorGame.from_games(_games(Warrior, num_games=1)).reset()
+
+def test_from_games_needs_the_same_size():
+    with pytest.raises(ValueError):
+        VectorGame.from_games(_games(Warrior, num_games=1) + _games(Warrior, num_games=1, width=5))